@@ -1,19 +1,21 @@
 from pkg_resources import DistributionNotFound, get_distribution
 
 from . import policy, utils, vulnerability_detection
-from .agent import Agent
+from .agent import Agent, AgentStore, AgentView, ContactBlock, StepContacts
 from .location import Location
 from .main import main
-from .model import BaseModel, ScheduledModel, StochasticModel
+from .model import (BaseModel, ContactProbabilityTable, EventTable,
+                    ScheduledModel, StochasticModel)
 from .policy import (AgentLockdown, AgentLockdownPolicy, AgentPolicy, CTPolicy,
                      EventLockdown, EventLockdownPolicy, EventPolicy,
                      FullLockdown, Machine, Policy, TestingBasedLockdown,
                      TestPolicy, TestResult, TestTube, VaccinationPolicy,
                      VaccineResult, VaccineType)
 from .read_file import (ReadAgents, ReadConfiguration, ReadEvents,
-                        ReadInteractions, ReadLocations, ReadOneTimeEvents,
-                        ReadProbabilisticInteractions, ReadVDConfiguration)
-from .simulate import Simulate
+                        ReadGroupInteractions, ReadInteractions, ReadLocations,
+                        ReadOneTimeEvents, ReadProbabilisticInteractions,
+                        ReadVDConfiguration, WorldBundle)
+from .simulate import BatchSimulate, Simulate
 from .vulnerability_detection import (VD, AgentVD, AgentVulnerability,
                                       BanditAlgos, ChunkAgentVulnerability,
                                       EarlyVulnerableAgent, EventVD,
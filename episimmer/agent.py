@@ -1,26 +1,42 @@
 from typing import Dict, List, Tuple, Union
 
+import numpy as np
+
+from .utils.time import Time
+
 
 class Agent():
     """
-    Class for an agent of the simulation.
+    Class for an agent of the simulation. If the agent is part of an :class:`AgentStore`, its state, infection
+    restrictions and protection flag are also written to the columns of the store whenever they change. If the agent
+    is part of an agents object, its contacts are kept in the :class:`StepContacts` of the agents object.
 
     Args:
         state: The state of the agent.
         info_dict: Information of each agent taken from the agents file.
+        store: The store holding the columns of all the agents
     """
-    def __init__(self, state: Union[str, None], info_dict: Dict[str, str]):
+    def __init__(self,
+                 state: Union[str, None],
+                 info_dict: Dict[str, str],
+                 store: Union['AgentStore', None] = None):
+        self.store: Union[AgentStore, None] = store
+        self.id: Union[int, None] = store.ids[
+            info_dict['Agent Index']] if store is not None else None
         self.state: Union[str, None] = state
         self.next_state: Union[str, None] = None
-        self.contact_list: List[Dict[str, str]] = []
+        self.step_contacts: Union[StepContacts, None] = None
+        self._contact_list: List[Dict[str, str]] = []
+        self.group_list: List[Dict[str, Union[str, List[str]]]] = []
         self.info: Dict[str, str] = info_dict
         self.index: str = info_dict['Agent Index']
         self.event_probabilities: List[float] = []
 
-        self.schedule_time_left: Union[int, None] = None
+        self.schedule_expiry: Union[int, None] = None
         self.can_receive_infection: float = 1.0
         self.can_contribute_infection: float = 1.0
         self.under_protection: bool = False
+        self.touched_agents: Union[Dict[str, 'Agent'], None] = None
 
         self.policy_dict: Dict[str, Dict[str, Union[List[object],
                                                     object]]] = {}
@@ -35,18 +51,124 @@ class Agent():
         """
         return str(self.index)
 
+    @property
+    def state(self) -> Union[str, None]:
+        return self._state
+
+    @state.setter
+    def state(self, state: Union[str, None]) -> None:
+        self._state = state
+        if self.store is not None:
+            self.store.state[self.id] = self.store.encode_state(state)
+
+    @property
+    def contact_list(self) -> List[Dict[str, str]]:
+        """
+        Information dictionaries of the contacts (interactions) of the agent in the current time step. If the contacts
+        are kept in a :class:`StepContacts`, the list is built from it and changes to the list are not seen by the
+        simulation, so contacts must be added with :meth:`add_contact`.
+        """
+        if self.step_contacts is None:
+            return self._contact_list
+        return self.step_contacts.get_contact_list(self.id)
+
+    @contact_list.setter
+    def contact_list(self, contact_list: List[Dict[str, str]]) -> None:
+        if self.step_contacts is None:
+            self._contact_list = contact_list
+        else:
+            self.step_contacts.set_contact_list(self.id, contact_list)
+
+    @property
+    def can_receive_infection(self) -> float:
+        return self._can_receive_infection
+
+    @can_receive_infection.setter
+    def can_receive_infection(self, p: float) -> None:
+        self._can_receive_infection = p
+        if self.store is not None:
+            self.store.can_receive_infection[self.id] = p
+
+    @property
+    def can_contribute_infection(self) -> float:
+        return self._can_contribute_infection
+
+    @can_contribute_infection.setter
+    def can_contribute_infection(self, p: float) -> None:
+        self._can_contribute_infection = p
+        if self.store is not None:
+            self.store.can_contribute_infection[self.id] = p
+
+    @property
+    def under_protection(self) -> bool:
+        return self._under_protection
+
+    @under_protection.setter
+    def under_protection(self, under_protection: bool) -> None:
+        self._under_protection = under_protection
+        if self.store is not None:
+            self.store.under_protection[self.id] = under_protection
+
+    @property
+    def schedule_time_left(self) -> Union[int, None]:
+        """
+        Number of remaining time steps for the agent to exist in its state, computed from the time step in which the
+        countdown expires. None if the agent has no running countdown.
+        """
+        if self.schedule_expiry is None:
+            return None
+        schedule_time_left = self.schedule_expiry - get_time_step()
+        if schedule_time_left <= 0:
+            return None
+        return schedule_time_left
+
+    @schedule_time_left.setter
+    def schedule_time_left(self, schedule_time_left: Union[int, None]) -> None:
+        if schedule_time_left is None:
+            self.schedule_expiry = None
+        else:
+            self.schedule_expiry = get_time_step() + schedule_time_left
+
+    def touch(self) -> None:
+        """
+        Records that an attribute of the agent that is reset at the beginning of every time step was changed, so that
+        only the changed agents are reset.
+        """
+        if self.touched_agents is not None:
+            self.touched_agents[self.index] = self
+
     def initialize_state(self,
                          state: str,
                          schedule_time_left: Union[int, None] = None) -> None:
         """
         Stores the state of the agent in the disease model. Also stores schedule time of agent if model is scheduled.
+        The schedule time is counted from before the first time step.
 
         Args:
             state : Current state of the agent in Disease Model
             schedule_time_left: Number of remaining time steps for an agent to exist in the state.
         """
         self.state = state
-        self.schedule_time_left = schedule_time_left
+        if schedule_time_left is None:
+            self.schedule_expiry = None
+        else:
+            self.schedule_expiry = get_time_step() - 1 + schedule_time_left
+
+    def reset(self) -> None:
+        """
+        Resets all the mutable attributes of the agent so that the same object can be reused in a new world.
+        """
+        self.state = None
+        self.next_state = None
+        self._contact_list = []
+        self.group_list = []
+        self.event_probabilities = []
+        self.schedule_expiry = None
+        self.can_receive_infection = 1.0
+        self.can_contribute_infection = 1.0
+        self.under_protection = False
+        self.policy_dict = {}
+        self.initialize_policy_dict()
 
     def initialize_policy_dict(self) -> None:
         """
@@ -89,7 +211,33 @@ class Agent():
         Args:
             contact_dict: Dictionary containing information for a single interaction.
         """
-        self.contact_list.append(contact_dict)
+        if self.step_contacts is None:
+            self._contact_list.append(contact_dict)
+            self.touch()
+        else:
+            self.step_contacts.add_contact_list(self.id, [contact_dict])
+
+    def get_contacts(self) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Returns the contacts (interactions) of the agent in the current time step.
+
+        Returns:
+            List of tuples of the index of the contact agent and the information dictionary of the interaction
+        """
+        if self.step_contacts is None:
+            return [(contact_dict['Interacting Agent Index'], contact_dict)
+                    for contact_dict in self._contact_list]
+        return self.step_contacts.get_contacts(self.id)
+
+    def add_group(self, group_info: Dict[str, Union[str, List[str]]]) -> None:
+        """
+        Adds a group interaction in which the agent can receive infection to the agents group_list.
+
+        Args:
+            group_info: Dictionary containing information for a single group interaction.
+        """
+        self.group_list.append(group_info)
+        self.touch()
 
     def add_event_result(self, p: float) -> None:
         """
@@ -99,20 +247,19 @@ class Agent():
             p: Probability of infection for attending an event
         """
         self.event_probabilities.append(p)
+        self.touch()
 
     def new_time_step(self) -> None:
         """
-        Resets all attributes of agent at the beginning of a time step of the simulation.
+        Resets all attributes of agent at the beginning of a time step of the simulation. The schedule time left is
+        computed from the time step in which the countdown expires, so it does not need to be updated.
         """
         self.can_receive_infection = 1.0
         self.can_contribute_infection = 1.0
         self.next_state = None
-        self.contact_list = []
+        self._contact_list = []
+        self.group_list = []
         self.event_probabilities = []
-        if self.schedule_time_left is not None:
-            self.schedule_time_left -= 1
-            if self.schedule_time_left <= 0:
-                self.schedule_time_left = None
 
     def update_state(self) -> None:
         """
@@ -142,6 +289,7 @@ class Agent():
             p: Probability of receiving infection
         """
         self.can_receive_infection = p
+        self.touch()
 
     def update_contribute_infection(self, p: float) -> None:
         """
@@ -151,9 +299,451 @@ class Agent():
             p: Probability of contributing to infection
         """
         self.can_contribute_infection = p
+        self.touch()
 
     def protect(self) -> None:
         """
         Sets the under_protection flag to True. This flag indicates that the Agent is under the protection of a vaccine.
         """
         self.under_protection = True
+
+
+class AgentStore():
+    """
+    Columnar store for the agents of a simulation. Agent indices are mapped to dense integer ids at load time and the
+    state, next state, schedule expiry time step, infection restrictions and protection flag of every agent are kept in
+    NumPy arrays indexed by these ids. States are stored as integer codes, with -1 denoting no state.
+
+    Args:
+        indices: Agent indices in the order of the agents file
+    """
+    NO_STATE: int = -1
+    NO_SCHEDULE: int = np.iinfo(np.int64).min
+
+    def __init__(self, indices: List[str]):
+        self.indices: List[str] = list(indices)
+        self.ids: Dict[str, int] = {
+            index: i
+            for i, index in enumerate(self.indices)
+        }
+        self.n: int = len(self.indices)
+        self.state_names: List[str] = []
+        self.state_codes: Dict[str, int] = {}
+
+        self.state: np.ndarray = np.empty(self.n, dtype=np.int32)
+        self.next_state: np.ndarray = np.empty(self.n, dtype=np.int32)
+        self.schedule_expiry: np.ndarray = np.empty(self.n, dtype=np.int64)
+        self.can_receive_infection: np.ndarray = np.empty(self.n)
+        self.can_contribute_infection: np.ndarray = np.empty(self.n)
+        self.under_protection: np.ndarray = np.empty(self.n, dtype=bool)
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Resets the columns of all the agents to their initial values for a new world.
+        """
+        self.state.fill(self.NO_STATE)
+        self.next_state.fill(self.NO_STATE)
+        self.schedule_expiry.fill(self.NO_SCHEDULE)
+        self.can_receive_infection.fill(1.0)
+        self.can_contribute_infection.fill(1.0)
+        self.under_protection.fill(False)
+
+    def encode_state(self, state: Union[str, None]) -> int:
+        """
+        Returns the integer code of a state. States are assigned codes in the order they are first seen.
+
+        Args:
+            state: Name of the state
+
+        Returns:
+            Integer code of the state
+        """
+        if state is None:
+            return self.NO_STATE
+        code = self.state_codes.get(state)
+        if code is None:
+            code = len(self.state_names)
+            self.state_codes[state] = code
+            self.state_names.append(state)
+        return code
+
+    def decode_state(self, code: int) -> Union[str, None]:
+        """
+        Returns the name of the state with the given integer code.
+
+        Args:
+            code: Integer code of the state
+
+        Returns:
+            Name of the state
+        """
+        if code == self.NO_STATE:
+            return None
+        return self.state_names[code]
+
+    def encode_schedule(self, schedule_expiry: Union[int, None]) -> int:
+        """
+        Returns the value stored in the schedule expiry column for a schedule expiry time step.
+
+        Args:
+            schedule_expiry: Time step in which the countdown of an agent expires
+
+        Returns:
+            Stored value of the schedule expiry
+        """
+        if schedule_expiry is None:
+            return self.NO_SCHEDULE
+        return schedule_expiry
+
+    def decode_schedule(self, value: int) -> Union[int, None]:
+        """
+        Returns the schedule expiry time step represented by a value of the schedule expiry column.
+
+        Args:
+            value: Stored value of the schedule expiry
+
+        Returns:
+            Time step in which the countdown of an agent expires
+        """
+        if value == self.NO_SCHEDULE:
+            return None
+        return int(value)
+
+
+class AgentView(Agent):
+    """
+    Agent whose state, next state, schedule expiry, infection restrictions and protection flag are views into the
+    columns of an :class:`AgentStore`. It can be used in place of :class:`Agent` by policies and user-defined
+    functions. Inherits :class:`Agent` class.
+
+    Args:
+        store: The store holding the columns of all the agents
+        info_dict: Information of each agent taken from the agents file.
+    """
+    def __init__(self, store: AgentStore, info_dict: Dict[str, str]):
+        super().__init__(None, info_dict, store)
+
+    @property
+    def state(self) -> Union[str, None]:
+        return self.store.decode_state(self.store.state[self.id])
+
+    @state.setter
+    def state(self, state: Union[str, None]) -> None:
+        self.store.state[self.id] = self.store.encode_state(state)
+
+    @property
+    def next_state(self) -> Union[str, None]:
+        return self.store.decode_state(self.store.next_state[self.id])
+
+    @next_state.setter
+    def next_state(self, state: Union[str, None]) -> None:
+        self.store.next_state[self.id] = self.store.encode_state(state)
+
+    @property
+    def schedule_expiry(self) -> Union[int, None]:
+        return self.store.decode_schedule(self.store.schedule_expiry[self.id])
+
+    @schedule_expiry.setter
+    def schedule_expiry(self, schedule_expiry: Union[int, None]) -> None:
+        self.store.schedule_expiry[self.id] = self.store.encode_schedule(
+            schedule_expiry)
+
+    @property
+    def can_receive_infection(self) -> float:
+        return float(self.store.can_receive_infection[self.id])
+
+    @can_receive_infection.setter
+    def can_receive_infection(self, p: float) -> None:
+        self.store.can_receive_infection[self.id] = p
+
+    @property
+    def can_contribute_infection(self) -> float:
+        return float(self.store.can_contribute_infection[self.id])
+
+    @can_contribute_infection.setter
+    def can_contribute_infection(self, p: float) -> None:
+        self.store.can_contribute_infection[self.id] = p
+
+    @property
+    def under_protection(self) -> bool:
+        return bool(self.store.under_protection[self.id])
+
+    @under_protection.setter
+    def under_protection(self, under_protection: bool) -> None:
+        self.store.under_protection[self.id] = under_protection
+
+
+class ContactBlock():
+    """
+    Block of contacts (interactions) kept as arrays of the ids of the receiving agents, the ids of the contact agents
+    and the information dictionaries of the interactions. Numeric columns of the interaction parameters are parsed
+    from the information dictionaries or taken from the blocks the block was built from when they are first needed,
+    and are then cached.
+
+    Args:
+        receivers: Ids of the agents the contacts belong to
+        senders: Ids of the contact agents
+        records: Information dictionaries of the contacts
+        columns: Numeric columns of interaction parameters that are already known
+        sources: Blocks whose concatenated contacts the contacts of the block were taken from
+        positions: Positions of the contacts of the block in the concatenated contacts of the sources
+    """
+    def __init__(self,
+                 receivers: np.ndarray,
+                 senders: np.ndarray,
+                 records: np.ndarray,
+                 columns: Union[Dict[str, np.ndarray], None] = None,
+                 sources: Union[List['ContactBlock'], None] = None,
+                 positions: Union[np.ndarray, None] = None):
+        self.receivers: np.ndarray = receivers
+        self.senders: np.ndarray = senders
+        self.records: np.ndarray = records
+        self.columns: Dict[
+            str, np.ndarray] = columns if columns is not None else {}
+        self.sources: List[
+            ContactBlock] = sources if sources is not None else []
+        self.positions: Union[np.ndarray, None] = positions
+
+    def __len__(self) -> int:
+        """
+        Returns the number of contacts of the block.
+
+        Returns:
+            Number of contacts
+        """
+        return len(self.receivers)
+
+    @staticmethod
+    def from_records(receivers: List[int], senders: List[int],
+                     records: List[Dict[str, str]]) -> 'ContactBlock':
+        """
+        Returns a block of contacts from lists of agent ids and information dictionaries.
+
+        Args:
+            receivers: Ids of the agents the contacts belong to
+            senders: Ids of the contact agents
+            records: Information dictionaries of the contacts
+
+        Returns:
+            Block of the contacts
+        """
+        record_array = np.empty(len(records), dtype=object)
+        record_array[:] = records
+        return ContactBlock(np.array(receivers, dtype=np.int64),
+                            np.array(senders, dtype=np.int64), record_array)
+
+    @staticmethod
+    def combine(blocks: List['ContactBlock'],
+                positions: np.ndarray) -> 'ContactBlock':
+        """
+        Returns a block of the contacts at the given positions of the concatenated contacts of several blocks.
+
+        Args:
+            blocks: Blocks of contacts
+            positions: Positions of the contacts in the concatenated contacts of the blocks
+
+        Returns:
+            Block of the selected contacts
+        """
+        if len(blocks) == 1:
+            receivers, senders, records = blocks[0].receivers, blocks[
+                0].senders, blocks[0].records
+        else:
+            receivers = np.concatenate([block.receivers for block in blocks])
+            senders = np.concatenate([block.senders for block in blocks])
+            records = np.concatenate([block.records for block in blocks])
+        return ContactBlock(receivers[positions],
+                            senders[positions],
+                            records[positions],
+                            sources=blocks,
+                            positions=positions)
+
+    def select(self, mask: np.ndarray) -> 'ContactBlock':
+        """
+        Returns a block of the contacts selected by a boolean mask.
+
+        Args:
+            mask: Boolean array over the contacts of the block
+
+        Returns:
+            Block of the selected contacts
+        """
+        return ContactBlock.combine([self], np.flatnonzero(mask))
+
+    def get_column(self, key: str) -> np.ndarray:
+        """
+        Returns the values of a numeric interaction parameter of all the contacts.
+
+        Args:
+            key: Name of the interaction parameter
+
+        Returns:
+            Array of the values of the parameter
+        """
+        column = self.columns.get(key)
+        if column is None:
+            if self.sources:
+                column = np.concatenate([
+                    block.get_column(key) for block in self.sources
+                ])[self.positions]
+            else:
+                column = np.fromiter(
+                    (float(record[key]) for record in self.records),
+                    dtype=float,
+                    count=len(self.records))
+            self.columns[key] = column
+        return column
+
+
+class StepContacts():
+    """
+    Contacts (interactions) of all the agents of an agents object in the current time step. Contacts are added in
+    :class:`ContactBlock` objects, which are merged into a single block sorted by the id of the receiving agent when
+    the contacts are used. Contacts of the same agent keep the order in which they were added, and the contacts of an
+    agent are a slice of the merged block given by the row pointers :attr:`indptr`. The contact lists of the agents
+    are built from these slices, and the contacts of all the agents can be filtered at once with :meth:`select`.
+
+    Args:
+        store: The store holding the columns of all the agents
+    """
+    def __init__(self, store: AgentStore):
+        self.store: AgentStore = store
+        self.indices: np.ndarray = np.empty(store.n, dtype=object)
+        self.indices[:] = store.indices
+        self.pending: List[ContactBlock] = []
+        self.block: ContactBlock = ContactBlock.from_records([], [], [])
+        self.indptr: np.ndarray = np.zeros(store.n + 1, dtype=np.int64)
+
+    def clear(self) -> None:
+        """
+        Removes all the contacts.
+        """
+        self.pending = []
+        self.block = ContactBlock.from_records([], [], [])
+        self.indptr.fill(0)
+
+    def add_block(self, block: ContactBlock) -> None:
+        """
+        Adds a block of contacts.
+
+        Args:
+            block: Block of contacts
+        """
+        if len(block):
+            self.pending.append(block)
+
+    def add_contact_list(self, agent_id: int,
+                         contact_list: List[Dict[str, str]]) -> None:
+        """
+        Adds contacts to an agent.
+
+        Args:
+            agent_id: Id of the agent
+            contact_list: Information dictionaries of the contacts
+        """
+        self.add_block(
+            ContactBlock.from_records([agent_id] * len(contact_list), [
+                self.store.ids[contact_dict['Interacting Agent Index']]
+                for contact_dict in contact_list
+            ], contact_list))
+
+    def get_block(self) -> ContactBlock:
+        """
+        Returns the block of all the contacts sorted by the id of the receiving agent, merging the blocks added since
+        the last call.
+
+        Returns:
+            Block of all the contacts
+        """
+        if self.pending:
+            blocks = [self.block] + self.pending
+            receivers = np.concatenate([block.receivers for block in blocks])
+            self.set_block(
+                ContactBlock.combine(blocks,
+                                     np.argsort(receivers, kind='stable')))
+        return self.block
+
+    def set_block(self, block: ContactBlock) -> None:
+        """
+        Sets the block of all the contacts, which must be sorted by the id of the receiving agent, and its row
+        pointers.
+
+        Args:
+            block: Block of all the contacts
+        """
+        self.pending = []
+        self.block = block
+        np.cumsum(np.bincount(block.receivers, minlength=self.store.n),
+                  out=self.indptr[1:])
+
+    def select(self, mask: np.ndarray) -> None:
+        """
+        Keeps only the contacts selected by a boolean mask over the contacts of the block returned by
+        :meth:`get_block`.
+
+        Args:
+            mask: Boolean array over the contacts
+        """
+        self.set_block(self.get_block().select(mask))
+
+    def get_contacts(self, agent_id: int) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Returns the contacts of an agent.
+
+        Args:
+            agent_id: Id of the agent
+
+        Returns:
+            List of tuples of the index of the contact agent and the information dictionary of the interaction
+        """
+        block = self.get_block()
+        start, end = self.indptr[agent_id], self.indptr[agent_id + 1]
+        return list(
+            zip(self.indices[block.senders[start:end]].tolist(),
+                block.records[start:end].tolist()))
+
+    def get_contact_list(self, agent_id: int) -> List[Dict[str, str]]:
+        """
+        Returns the information dictionaries of the contacts of an agent.
+
+        Args:
+            agent_id: Id of the agent
+
+        Returns:
+            List of information dictionaries of the contacts
+        """
+        block = self.get_block()
+        start, end = self.indptr[agent_id], self.indptr[agent_id + 1]
+        # Contacts of a line of a probabilistic interactions file share a dictionary without the agent indices
+        return [
+            record if 'Interacting Agent Index' in record else {
+                **record, 'Agent Index': self.store.indices[agent_id],
+                'Interacting Agent Index': contact_index
+            } for contact_index, record in zip(
+                self.indices[block.senders[start:end]].tolist(),
+                block.records[start:end].tolist())
+        ]
+
+    def set_contact_list(self, agent_id: int,
+                         contact_list: List[Dict[str, str]]) -> None:
+        """
+        Replaces the contacts of an agent.
+
+        Args:
+            agent_id: Id of the agent
+            contact_list: Information dictionaries of the new contacts
+        """
+        self.select(self.get_block().receivers != agent_id)
+        self.add_contact_list(agent_id, contact_list)
+
+
+def get_time_step() -> int:
+    """
+    Returns the current time step of the simulation, or 0 if no simulation is running.
+
+    Returns:
+        Current time step
+    """
+    time_step = Time.get_current_time_step()
+    return time_step if time_step is not None else 0
@@ -14,6 +14,12 @@ class Location():
         self.events: List[Dict[str, Union[float, str, List[str]]]] = []
         self.lock_down_state: bool = False
 
+    def reset(self) -> None:
+        """
+        Resets the location so that the same object can be reused in a new world.
+        """
+        self.new_time_step()
+
     def new_time_step(self) -> None:
         """
         Resets the lockdown state and events of the location at the start of each time step
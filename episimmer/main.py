@@ -1,21 +1,25 @@
 import os
 import os.path as osp
+import sys
 
-from episimmer.read_file import ReadConfiguration, ReadVDConfiguration
-from episimmer.utils.arg_parser import parse_args
-from episimmer.utils.module_handling import get_model, get_policy
+from episimmer.read_file import (ReadConfiguration, ReadVDConfiguration,
+                                 WorldBundle)
+from episimmer.utils.arg_parser import parse_args, parse_compile_args
+from episimmer.utils.module_handling import (get_model, get_policy,
+                                             get_scenarios)
 from episimmer.utils.statistics import write_stats
 from episimmer.vulnerability_detection.vd import VD
 from episimmer.world import World
 
 
-def get_world_obj(config_obj, example_path):
+def get_world_obj(config_obj, example_path, args=None):
     """
     Returns the world object for the simulation
 
     Args:
         config_obj: Config object populated with configuration from the config.txt file
         example_path: Path to directory with simulation files
+        args: Command-line arguments of the simulation. If not passed, the default arguments are used.
 
     Returns:
         World object
@@ -42,22 +46,43 @@ def get_world_obj(config_obj, example_path):
                       interactions_files_list,
                       probabilistic_interactions_files_list,
                       locations_filename, events_files_list,
-                      one_time_event_file)
+                      one_time_event_file, args)
 
     return world_obj
 
 
-@write_stats('stats.pickle', 'stats.txt')
 def main():
     """
-    Episimmer run begins here.
+    Episimmer run begins here. ``episimmer compile <example_path>`` compiles the input files of an example into a
+    binary world bundle, and ``episimmer <example_path>`` runs the simulation.
+    """
+    if len(sys.argv) > 1 and sys.argv[1] == 'compile':
+        compile_world_bundle()
+    else:
+        run()
+
+
+def compile_world_bundle():
+    """
+    Compiles the agents, locations, interactions and events files of an example into a binary world bundle.
+    """
+    args = parse_compile_args()
+    bundle_filename = WorldBundle.compile_example(args.example_path,
+                                                  args.edges)
+    print('World bundle written to {0}'.format(bundle_filename))
+
+
+@write_stats('stats.pickle', 'stats.txt')
+def run():
+    """
+    Runs the simulation, policy scenarios or vulnerability detection of an example.
     """
     args = parse_args()
 
     example_path = args.example_path
     vul_detect = args.vuldetect
     config_obj = ReadConfiguration(osp.join(example_path, 'config.txt'))
-    world_obj = get_world_obj(config_obj, example_path)
+    world_obj = get_world_obj(config_obj, example_path, args)
 
     if vul_detect:
         vd_config_filename = osp.join(example_path, 'vd_config.txt')
@@ -65,6 +90,9 @@ def main():
         vd_obj = VD(vd_config_obj, world_obj)
         vd_obj.run_vul_detection()
 
+    elif args.scenarios:
+        world_obj.simulate_scenarios(get_scenarios(example_path))
+
     else:
         world_obj.simulate_worlds()
 
@@ -1,10 +1,13 @@
-import random
+import math
 import warnings
+from bisect import bisect_right
 from functools import partial
 from inspect import signature
-from typing import Callable, Dict, List, Tuple, Union
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, Tuple, Union
 
 import numpy as np
+from scipy.sparse import csr_matrix
 
 from episimmer.agent import Agent
 from episimmer.location import Location
@@ -13,6 +16,524 @@ from episimmer.read_file import ReadAgents
 from .utils.time import Time
 
 
+class ContactProbabilityTable():
+    r"""
+    Class for specifying the probability of infection through an individual or probabilistic interaction as a table
+    over the state of the contact agent and, optionally, a numeric attribute of the interaction. An instance can be
+    passed to :meth:`StochasticModel.p_infection` or :meth:`ScheduledModel.p_infection` in place of the user-defined
+    function. The infection probabilities of all the agents are then computed at once every time step by a sparse
+    kernel instead of calling a function for every contact.
+
+    .. code-block:: python
+        :linenos:
+        :emphasize-lines: 1-3, 11
+
+        table = model.ContactProbabilityTable({'Infected': [0.05, 0.1, 0.2]},
+                                              attribute='Duration',
+                                              bins=[10, 30])
+
+        class UserModel(model.StochasticModel):
+            def __init__(self):
+                individual_types=['Susceptible','Infected','Recovered']
+                infected_states=['Infected']
+                state_proportion={'Susceptible':0.99, 'Infected':0.01, 'Recovered':0}
+                model.StochasticModel.__init__(self,individual_types,infected_states,state_proportion)
+                self.set_transition('Susceptible', 'Infected', self.p_infection(table))
+                self.set_transition('Infected', 'Recovered', self.p_standard(0.2))
+
+    Here a contact with an infected agent infects with a probability of 0.05 if the duration of the interaction is
+    less than 10, 0.1 if it is less than 30 and 0.2 otherwise. Contacts with agents in states missing from the table
+    do not infect.
+
+    Args:
+        table: Dictionary mapping contact agent states to the probability of infection. If an attribute is passed,
+               each state maps to a list of probabilities, one for each bin of the attribute.
+        attribute: Numeric interaction parameter used to select the probability of a state
+        bins: Increasing bin edges of the attribute. A value :math:`v` falls in bin :math:`i` if
+              :math:`bins[i-1] \leq v < bins[i]`.
+    """
+    edge_chunk_size: int = 2**20
+
+    def __init__(self,
+                 table: Dict[str, Union[float, List[float]]],
+                 attribute: Union[str, None] = None,
+                 bins: Union[List[float], None] = None):
+        if not isinstance(table, dict):
+            raise TypeError(
+                'A dictionary mapping states to probabilities must be passed')
+        if (attribute is None) != (bins is None):
+            raise TypeError(
+                'The attribute and its bins must be passed together')
+
+        num_bins = 1 if bins is None else len(bins) + 1
+        for state, probs in table.items():
+            if attribute is None:
+                probs = [probs]
+            if not isinstance(probs, list) or len(probs) != num_bins:
+                raise TypeError(
+                    'State {0} must be mapped to {1} probabilities'.format(
+                        state, num_bins))
+            for p in probs:
+                if not isinstance(p, (float, int)):
+                    raise TypeError(
+                        'Probabilities of infection must be integer or float values'
+                    )
+                if p < 0 or p > 1:
+                    raise ValueError(
+                        'Probabilities of infection must lie between 0 and 1')
+
+        self.table: Dict[str, Union[float, List[float]]] = table
+        self.attribute: Union[str, None] = attribute
+        self.bins: Union[List[float], None] = bins
+        self.ids: Dict[str, int] = {}
+        self.infection_prob: Union[np.ndarray, None] = None
+        self.computed_at: Union[Tuple[int, int], None] = None
+
+    def __call__(self, p_infected_states_list: Union[List[float], None],
+                 contact_agent: Agent, c_dict: Dict[str, str],
+                 current_time_step: int) -> float:
+        """
+        Returns the probability of infection through a single contact. This has the signature of the user-defined
+        function of p_infection and is used whenever the kernel has not been computed for the current time step.
+
+        Args:
+            p_infected_states_list: Not used by the table
+            contact_agent: The agent that the current agent is in contact with
+            c_dict: Dictionary defining the interaction
+            current_time_step: Current time step
+
+        Returns:
+            Probability of infection through the contact
+        """
+        probs = self.table.get(contact_agent.state)
+        if probs is None:
+            return 0.0
+        if self.attribute is None:
+            return probs
+        return probs[bisect_right(self.bins, float(c_dict[self.attribute]))]
+
+    def get_step_contacts(
+        self, agents_obj: ReadAgents
+    ) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the valid contacts of the current time step as the receiver, sender and attribute arrays of the
+        :class:`~episimmer.agent.StepContacts` of the agents object, without copying them. Agents are numbered by the
+        dense integer ids of the agent store.
+
+        Args:
+            agents_obj: An object of class :class:`~episimmer.read_file.ReadAgents` containing all agents
+
+        Returns:
+            Agent indices ordered by id, agent ids, contact agent ids and attribute values of the interactions
+        """
+        order, self.ids = agents_obj.get_agent_ids()
+        block = agents_obj.contacts.get_block()
+        weights = block.get_column(
+            self.attribute) if self.attribute is not None else np.empty(0)
+        return order, block.receivers, block.senders, weights
+
+    def get_agent_rows(self, agents_obj: ReadAgents,
+                       states: List[str]) -> np.ndarray:
+        """
+        Returns the row of the lookup table of every agent id, mapped from the column of state codes of the agent
+        store. Agents in states missing from the table and agents that are not part of the simulation are given the
+        last row.
+
+        Args:
+            agents_obj: An object of class :class:`~episimmer.read_file.ReadAgents` containing all agents
+            states: States of the rows of the lookup table
+
+        Returns:
+            Row of the lookup table of every agent id
+        """
+        store = agents_obj.store
+        # The extra last entry maps the code of no state to the last row
+        code_rows = np.full(len(store.state_names) + 1, len(states))
+        for row, state in enumerate(states):
+            if state in store.state_codes:
+                code_rows[store.state_codes[state]] = row
+        agent_rows = code_rows[store.state]
+        present = agents_obj.get_present_mask()
+        if present is not None:
+            agent_rows[~present] = len(states)
+        return agent_rows
+
+    def compute(self,
+                agents_obj: ReadAgents,
+                rng: Union[np.random.Generator, None] = None) -> None:
+        r"""
+        Computes the probability of infection through the valid contacts of every agent for the current time step.
+        The probability :math:`p` of each contact is looked up from the table using the state of the contact agent
+        and the bin of the attribute, and the probabilities are reduced per agent as
+        :math:`1 - \exp(\sum \log(1-p))` with a bincount over the receivers of the contacts. The contacts of the
+        memory-mapped edge files of the agents object are added to the sums with :meth:`get_edge_log_sums`.
+
+        Args:
+            agents_obj: An object of class :class:`~episimmer.read_file.ReadAgents` containing all agents
+            rng: Random number generator used to check whether the interactions of the edge files take place
+        """
+        order, receivers, senders, weights = self.get_step_contacts(agents_obj)
+
+        # Lookup table with a last row of zeros for the states missing from the table
+        states = list(self.table)
+        lut = np.zeros(
+            (len(states) + 1, 1 if self.bins is None else len(self.bins) + 1))
+        for row, state in enumerate(states):
+            lut[row] = self.table[state]
+        agent_rows = self.get_agent_rows(agents_obj, states)
+
+        with np.errstate(divide='ignore'):
+            log_not_inf = np.log1p(
+                -self.get_contact_probs(lut, agent_rows, senders, weights))
+        log_sums = np.zeros(len(order))
+        log_sums += np.bincount(receivers,
+                                weights=log_not_inf,
+                                minlength=len(order))
+        if agents_obj.edge_files:
+            log_sums += self.get_edge_log_sums(
+                agents_obj, lut, agent_rows,
+                rng if rng is not None else np.random.default_rng())
+        self.infection_prob = -np.expm1(log_sums)
+        self.computed_at = (Time.get_current_world(),
+                            Time.get_current_time_step())
+
+    def get_contact_probs(self, lut: np.ndarray, agent_rows: np.ndarray,
+                          indices: np.ndarray,
+                          weights: np.ndarray) -> np.ndarray:
+        """
+        Returns the probability of infection through each contact, looked up from the table using the state of the
+        contact agent and the bin of the attribute of the interaction.
+
+        Args:
+            lut: Lookup table of probabilities with a row for every state of the table and a last row of zeros
+            agent_rows: Row of the lookup table of every agent id
+            indices: Ids of the contact agents
+            weights: Attribute values of the interactions
+
+        Returns:
+            Probabilities of infection through the contacts
+        """
+        columns = 0 if self.bins is None else np.searchsorted(
+            self.bins, weights, side='right')
+        return lut[agent_rows[indices], columns]
+
+    def get_edge_log_sums(self, agents_obj: ReadAgents, lut: np.ndarray,
+                          agent_rows: np.ndarray,
+                          rng: np.random.Generator) -> np.ndarray:
+        r"""
+        Returns :math:`\sum \log(1-p)` over the valid contacts of every agent in the memory-mapped edge files of the
+        agents object. The edge files are processed in slices of :attr:`edge_chunk_size` edges, so the memory used
+        does not depend on the number of contacts. As for the other contacts, an interaction takes place if a uniform
+        draw is below the can_contribute_infection of the contact agent and the can_receive_infection of the agent,
+        and the agent is not under protection.
+
+        Args:
+            agents_obj: An object of class :class:`~episimmer.read_file.ReadAgents` containing all agents
+            lut: Lookup table of probabilities with a row for every state of the table and a last row of zeros
+            agent_rows: Row of the lookup table of every agent id
+            rng: Random number generator used to check whether the interactions take place
+
+        Returns:
+            Sum of the log probabilities of not being infected of every agent id
+        """
+        n = len(agent_rows)
+        can_contribute, can_receive = agents_obj.get_infection_restrictions()
+
+        log_sums = np.zeros(n)
+        for edges in agents_obj.edge_files:
+            for start in range(0, len(edges), self.edge_chunk_size):
+                chunk = edges[start:start + self.edge_chunk_size]
+                receivers = chunk['Agent Index']
+                senders = chunk['Interacting Agent Index']
+                r = rng.random(len(chunk))
+                valid = (r < can_receive[receivers]) & (
+                    r < can_contribute[senders])
+                weights = chunk[
+                    self.
+                    attribute][valid] if self.attribute is not None else None
+                with np.errstate(divide='ignore'):
+                    log_not_inf = np.log1p(-self.get_contact_probs(
+                        lut, agent_rows, senders[valid], weights))
+                log_sums += np.bincount(receivers[valid],
+                                        weights=log_not_inf,
+                                        minlength=n)
+        return log_sums
+
+    def get_batch_contacts(self, agents_obj: ReadAgents) -> List[csr_matrix]:
+        """
+        Returns the contacts of the current time step as sparse matrices, one for every bin of the attribute. The entry
+        in the row of an agent and the column of a contact agent is the number of interactions between them that fall
+        in the bin. Agents are numbered as in :meth:`get_step_contacts`, and the contacts of the memory-mapped edge
+        files of the agents object are included. All the contacts are assumed to take place, as no policy restricts
+        them in a batch of worlds.
+
+        Args:
+            agents_obj: An object of class :class:`~episimmer.read_file.ReadAgents` containing all agents
+
+        Returns:
+            Sparse contact matrices of the bins
+        """
+        order, receivers, senders, weights = self.get_step_contacts(agents_obj)
+
+        present = agents_obj.get_present_mask()
+        receivers, senders, weights = [receivers], [senders], [weights]
+        for edges in agents_obj.edge_files:
+            edge_receivers = edges['Agent Index']
+            edge_senders = edges['Interacting Agent Index']
+            valid = np.ones(len(edges), dtype=bool) if present is None else (
+                present[edge_receivers] & present[edge_senders])
+            receivers.append(edge_receivers[valid])
+            senders.append(edge_senders[valid])
+            if self.attribute is not None:
+                weights.append(edges[self.attribute][valid])
+        receivers = np.concatenate(receivers)
+        senders = np.concatenate(senders)
+
+        if self.bins is None:
+            columns = np.zeros(len(receivers), dtype=np.int64)
+        else:
+            columns = np.searchsorted(self.bins,
+                                      np.concatenate(weights),
+                                      side='right')
+        shape = (len(order), len(order))
+        return [
+            csr_matrix((np.ones(np.count_nonzero(columns == b)),
+                        (receivers[columns == b], senders[columns == b])),
+                       shape=shape) for b in range(len(self.bins or []) + 1)
+        ]
+
+    def compute_batch(self, states: np.ndarray, state_types: List[str],
+                      contacts: List[csr_matrix]) -> np.ndarray:
+        r"""
+        Returns the probability of infection through the contacts of every agent in a batch of worlds. For every state
+        of the table and bin of the attribute, the number of contacts of each agent with agents in the state is counted
+        in all the worlds at once with a product of the sparse contact matrix of the bin and the indicator matrix of
+        the state. The probabilities are then reduced as :math:`1 - \exp(\sum \log(1-p))`, as in :meth:`compute`.
+
+        Args:
+            states: Codes of the states of the agents with a row for every world, indexing state_types
+            state_types: Individual state types of the model
+            contacts: Sparse contact matrices of the bins returned by :meth:`get_batch_contacts`
+
+        Returns:
+            Probabilities of infection with a row for every world
+        """
+        log_sums = np.zeros(states.shape[::-1])
+        certain = np.zeros(states.shape[::-1], dtype=bool)
+        for state, probs in self.table.items():
+            if state not in state_types:
+                continue
+            in_state = (states == state_types.index(state)).T.astype(float)
+            for b, p in enumerate(probs if self.bins is not None else [probs]):
+                if p == 0:
+                    continue
+                counts = contacts[b] @ in_state
+                if p == 1:
+                    certain |= counts > 0
+                else:
+                    log_sums += counts * math.log1p(-p)
+
+        infection_prob = -np.expm1(log_sums)
+        infection_prob[certain] = 1.0
+        return infection_prob.T
+
+    def is_computed(self) -> bool:
+        """
+        Returns whether the kernel has been computed for the current time step.
+
+        Returns:
+            Boolean representing whether the infection probabilities of the current time step are available
+        """
+        return self.computed_at == (Time.get_current_world(),
+                                    Time.get_current_time_step())
+
+    def get_infection_prob(self, agent: Agent) -> float:
+        """
+        Returns the probability of infection of an agent through all its valid contacts in the current time step.
+
+        Args:
+            agent: Current agent object
+
+        Returns:
+            Probability of infection through the contacts of the agent
+        """
+        return float(self.infection_prob[self.ids[agent.index]])
+
+
+class EventTable():
+    r"""
+    Class for storing the events of all the locations in a time step as CSR arrays, with a row for every event holding
+    the dense integer ids of its agents. Whether the agents of the events can contribute or receive infection is
+    checked for all the events at once with :meth:`draw`. If the event contribute and receive functions of the model
+    are batch functions, the ambient infection of every event is computed with a segment sum of the contributions, and
+    the probabilities of not being infected through the events are reduced per agent as :math:`\exp(\sum \log(1-p))`
+    with :meth:`compute`, without calling any function for the individual agents.
+
+    Args:
+        locations: Collection of :class:`~episimmer.location.Location` objects
+        agents_obj: An object of class :class:`~episimmer.read_file.ReadAgents` containing all agents
+    """
+    def __init__(self, locations: Iterable[Location], agents_obj: ReadAgents):
+        self.agents_obj: ReadAgents = agents_obj
+        self.order, self.ids = agents_obj.get_agent_ids()
+        self.events: List[Dict[str, Union[float, str, List[str]]]] = []
+        self.locations: List[Location] = []
+        for location in locations:
+            for event_info in location.events:
+                self.events.append(event_info)
+                self.locations.append(location)
+
+        lengths = np.fromiter(
+            (len(event_info['Agents']) for event_info in self.events),
+            dtype=np.int64,
+            count=len(self.events))
+        self.indptr: np.ndarray = np.zeros(len(self.events) + 1,
+                                           dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        agent_indices = chain.from_iterable(event_info['Agents']
+                                            for event_info in self.events)
+        self.agent_ids: np.ndarray = np.fromiter(map(self.ids.__getitem__,
+                                                     agent_indices),
+                                                 dtype=np.int64,
+                                                 count=self.indptr[-1])
+        self.event_ids: np.ndarray = np.repeat(np.arange(len(self.events)),
+                                               lengths)
+        self.can_contrib: np.ndarray = np.zeros(len(self.agent_ids),
+                                                dtype=bool)
+        self.can_receive: np.ndarray = np.zeros(len(self.agent_ids),
+                                                dtype=bool)
+        self.not_infected_prob: np.ndarray = np.ones(len(self.order))
+        self.computed_at: Union[Tuple[int, int], None] = None
+
+    def draw(self,
+             rng: np.random.Generator,
+             susceptible_states: Union[List[str], None] = None) -> None:
+        """
+        Checks whether the events take place and whether their agents can contribute infection to the events or
+        receive infection from the events. An event takes place if a uniform draw is below its probability of
+        occurrence. An agent of an event that takes place can contribute infection if a uniform draw is below its
+        can_contribute_infection, and can receive infection if the same draw is below its can_receive_infection and
+        the agent is not under protection. All the draws are made at once, in the order of one draw for every event
+        followed by one draw for each of its agents. The agents that can do either are also saved in the lists of the
+        information dictionaries of the events.
+
+        Args:
+            rng: Random number generator used for the draws
+            susceptible_states: States in which agents can be infected. If passed, agents in other states do not
+                                receive infection from the events.
+        """
+        n_events = len(self.events)
+        r = rng.random(n_events + len(self.agent_ids))
+        prob_of_occur = np.fromiter(
+            (event_info['_prob_of_occur'] for event_info in self.events),
+            dtype=float,
+            count=n_events)
+        occurs = r[self.indptr[:-1] + np.arange(n_events)] < prob_of_occur
+        agent_r = r[np.arange(len(self.agent_ids)) + self.event_ids + 1]
+
+        can_contribute, can_receive = self.agents_obj.get_infection_restrictions(
+        )
+        occurs = occurs[self.event_ids]
+        self.can_contrib = occurs & (agent_r < can_contribute[self.agent_ids])
+        if susceptible_states is not None:
+            can_receive *= self.agents_obj.get_state_mask(susceptible_states)
+        self.can_receive = occurs & (agent_r < can_receive[self.agent_ids])
+
+        indices = np.array(self.order, dtype=object)
+        for e, event_info in enumerate(self.events):
+            start, end = self.indptr[e], self.indptr[e + 1]
+            agent_ids = self.agent_ids[start:end]
+            event_info['_can_contrib'] = indices[agent_ids[
+                self.can_contrib[start:end]]].tolist()
+            event_info['_can_receive'] = indices[agent_ids[
+                self.can_receive[start:end]]].tolist()
+
+    def get_states(self, agent_ids: np.ndarray) -> np.ndarray:
+        """
+        Returns the states of agents.
+
+        Args:
+            agent_ids: Ids of the agents
+
+        Returns:
+            Array of the state names of the agents
+        """
+        store = self.agents_obj.store
+        state_names = np.array(store.state_names + [None], dtype=object)
+        return state_names[store.state[agent_ids]]
+
+    def compute(self, contribute_fn: Callable, receive_fn: Callable,
+                active: np.ndarray) -> None:
+        r"""
+        Computes the probability of every agent not being infected through the events of the current time step with
+        batch event contribute and receive functions. The contributions of the agents that can contribute infection
+        are summed per event to give the ambient infections, and the probabilities :math:`p` of the agents that can
+        receive infection are reduced per agent as :math:`\exp(\sum \log(1-p))`. Probabilities greater than 1 are
+        treated as 1.
+
+        Args:
+            contribute_fn: Batch function returning the contributions of agents to the ambient infection of their
+                           events
+            receive_fn: Batch function returning the probabilities of agents receiving infection from the ambient
+                        infection of their events
+            active: Boolean array marking the events that are not in a location under lockdown
+        """
+        current_time_step = Time.get_current_time_step()
+        can_contrib = self.can_contrib & active[self.event_ids]
+        can_receive = self.can_receive & active[self.event_ids]
+
+        event_ids = self.event_ids[can_contrib]
+        states = self.get_states(self.agent_ids[can_contrib])
+        contributions = contribute_fn(states, event_ids, self.events,
+                                      self.locations, current_time_step)
+        contributions = np.broadcast_to(np.asarray(contributions, dtype=float),
+                                        event_ids.shape)
+        ambient_infection = np.zeros(len(self.events))
+        ambient_infection += np.bincount(event_ids,
+                                         weights=contributions,
+                                         minlength=len(self.events))
+
+        event_ids = self.event_ids[can_receive]
+        agent_ids = self.agent_ids[can_receive]
+        p = receive_fn(self.get_states(agent_ids),
+                       ambient_infection[event_ids], event_ids, self.events,
+                       self.locations, current_time_step)
+        p = np.broadcast_to(np.asarray(p, dtype=float), event_ids.shape)
+        with np.errstate(divide='ignore'):
+            log_not_inf = np.log1p(-np.minimum(p, 1.0))
+        log_sums = np.zeros(len(self.order))
+        log_sums += np.bincount(agent_ids,
+                                weights=log_not_inf,
+                                minlength=len(self.order))
+        self.not_infected_prob = np.exp(log_sums)
+        self.computed_at = (Time.get_current_world(), current_time_step)
+
+    def is_computed(self) -> bool:
+        """
+        Returns whether the probabilities of not being infected through the events have been computed for the current
+        time step.
+
+        Returns:
+            Boolean representing whether the probabilities of the current time step are available
+        """
+        return self.computed_at == (Time.get_current_world(),
+                                    Time.get_current_time_step())
+
+    def get_not_infected_prob(self, agent: Agent) -> float:
+        """
+        Returns the probability of an agent not being infected through all the events it attended in the current time
+        step.
+
+        Args:
+            agent: Current agent object
+
+        Returns:
+            Probability of not being infected through the events of the agent
+        """
+        i = self.ids.get(agent.index)
+        return 1.0 if i is None else float(self.not_infected_prob[i])
+
+
 class BaseModel():
     """
     Base class for disease models in Episimmer.
@@ -28,8 +549,15 @@ class BaseModel():
         self.state_proportion: Dict[str, Union[float, int]] = {}
         self.receive_fn: Union[Callable, None] = None
         self.contribute_fn: Union[Callable, None] = None
+        self.batch_receive: bool = False
+        self.batch_contribute: bool = False
+        self.event_table: Union[EventTable, None] = None
         self.external_prev_fn: Callable = lambda x, y: 0.0
+        self.external_prevalence: bool = False
         self.symptomatic_states: List[str] = []
+        self.rng: np.random.Generator = np.random.default_rng()
+        self.batch_rngs: Union[List[np.random.Generator], None] = None
+        self.contact_tables: List[ContactProbabilityTable] = []
 
         self.infectious_colors: List[str] = ['red', 'pink', 'orange', 'purple']
         self.normal_colors: List[str] = [
@@ -73,6 +601,229 @@ class BaseModel():
         """
         raise NotImplementedError
 
+    def compile_transitions(self) -> Dict[str, np.ndarray]:
+        """
+        Returns the transitions of the current time step that do not depend on the agent, as cumulative transition
+        probabilities over the individual state types for each source state. Agents in these source states are moved
+        in bulk with :meth:`find_next_states` instead of :meth:`find_next_state`. By default, no source state is
+        compiled.
+
+        Returns:
+            Dictionary mapping source states to cumulative transition probabilities
+        """
+        return {}
+
+    def get_infection_fns(
+            self) -> Union[Dict[str, List[Union[Callable, None]]], None]:
+        """
+        Returns the interaction functions of the :meth:`p_infection` transitions of every source state that has one.
+        None is returned if the transitions of the model cannot be inspected, for example when a transition is not
+        built from one of the templates of the model. By default, the transitions cannot be inspected.
+
+        Returns:
+            Dictionary mapping source states to the interaction functions of their p_infection transitions
+        """
+        return None
+
+    def get_susceptible_states(self) -> Union[List[str], None]:
+        """
+        Returns the states in which agents can be infected, which are the source states of the :meth:`p_infection`
+        transitions. The interactions, group interactions and events of agents in other states cannot change their
+        next state. None is returned if these states cannot be derived from the transitions of the model.
+
+        Returns:
+            List of states in which agents can be infected
+        """
+        infection_fns = self.get_infection_fns()
+        if infection_fns is None:
+            return None
+        return list(infection_fns)
+
+    def get_infectious_states(self) -> Union[List[str], None]:
+        """
+        Returns the states of the contact agents through which an individual, probabilistic or group interaction can
+        infect. These can only be derived if the interaction function of every :meth:`p_infection` transition is a
+        :class:`ContactProbabilityTable`, in which case they are the states with a non-zero probability in any of the
+        tables. Otherwise, None is returned.
+
+        Returns:
+            List of states of the contact agents through which an interaction can infect
+        """
+        infection_fns = self.get_infection_fns()
+        if infection_fns is None:
+            return None
+
+        states = []
+        for fns in infection_fns.values():
+            for fn in fns:
+                if not isinstance(fn, ContactProbabilityTable):
+                    return None
+                for state, probs in fn.table.items():
+                    if np.any(probs) and state not in states:
+                        states.append(state)
+        return states
+
+    def get_idle_states(self) -> Union[List[str], None]:
+        """
+        Returns the states in which the next state of an agent is its current state with certainty in the current time
+        step, unless the agent is exposed to infection through an interaction, group interaction or event. None is
+        returned if these states cannot be derived from the transitions of the model. By default, they cannot be
+        derived.
+
+        Returns:
+            List of idle states
+        """
+        return None
+
+    def get_absorbing_states(self) -> Union[List[str], None]:
+        """
+        Returns the states that agents can only leave through infection, in every time step. None is returned if these
+        states cannot be derived from the transitions of the model. By default, they cannot be derived.
+
+        Returns:
+            List of absorbing states
+        """
+        return None
+
+    def find_next_states(self, state: str, cum_probs: np.ndarray,
+                         num_agents: int) -> List[str]:
+        """
+        Returns the next states of a number of agents in the same source state with a single vectorized categorical
+        draw.
+
+        Args:
+            state: The source state of the agents
+            cum_probs: Cumulative transition probabilities over the individual state types
+            num_agents: Number of agents in the source state
+
+        Returns:
+            The new state of each agent
+        """
+        targets = self.individual_state_types + [state]
+        draws = np.searchsorted(cum_probs,
+                                self.rng.random(num_agents),
+                                side='right')
+        return [targets[i] for i in draws]
+
+    def initialize_batch_states(
+            self, num_worlds: int,
+            num_agents: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the initial states and schedule times left of the agents in a batch of worlds. States are coded by
+        their index in the individual state types and a schedule time left of NaN denotes no schedule.
+
+        Args:
+            num_worlds: Number of worlds in the batch
+            num_agents: Number of agents in every world
+
+        Returns:
+            State codes and schedule times left with a row for every world
+        """
+        raise NotImplementedError
+
+    def find_next_batch_states(
+            self, states: np.ndarray, schedule_time_left: np.ndarray,
+            infection_probs: Dict['ContactProbabilityTable',
+                                  np.ndarray]) -> None:
+        """
+        Finds the next states and schedule times left of the agents in a batch of worlds and updates the arrays in
+        place.
+
+        Args:
+            states: State codes with a row for every world
+            schedule_time_left: Schedule times left with a row for every world
+            infection_probs: Probabilities of infection of the agents through the contacts of the current time step for
+                             every contact probability table of the model
+        """
+        raise NotImplementedError
+
+    def draw_batch(
+            self, worlds: np.ndarray,
+            draw: Callable[[np.random.Generator, int],
+                           np.ndarray]) -> np.ndarray:
+        """
+        Returns random draws for a number of agents in a batch of worlds. The draws of the agents of each world are
+        taken from the generator of that world, so the outcome of a world does not depend on the other worlds of its
+        batch. If no generators of the worlds are set, all the draws are taken from the generator of the model.
+
+        Args:
+            worlds: Sorted row of the world of every agent
+            draw: Function returning a number of draws from a generator
+
+        Returns:
+            Draw of each agent
+        """
+        if self.batch_rngs is None:
+            return draw(self.rng, len(worlds))
+        counts = np.bincount(worlds, minlength=len(self.batch_rngs)).tolist()
+        return np.concatenate(
+            [draw(rng, count) for rng, count in zip(self.batch_rngs, counts)])
+
+    def draw_batch_uniforms(self, worlds: np.ndarray) -> np.ndarray:
+        """
+        Returns uniform draws for a number of agents in a batch of worlds with :meth:`draw_batch`.
+
+        Args:
+            worlds: Sorted row of the world of every agent
+
+        Returns:
+            Uniform draw of each agent
+        """
+        return self.draw_batch(worlds, lambda rng, size: rng.random(size))
+
+    def draw_batch_categories(self, cum_probs: np.ndarray,
+                              worlds: np.ndarray) -> np.ndarray:
+        """
+        Returns the indices of the categories drawn for a number of agents in a batch of worlds from cumulative
+        probabilities with a single vectorized draw. Draws beyond the last cumulative probability fall in the last
+        category.
+
+        Args:
+            cum_probs: Cumulative probabilities of the categories
+            worlds: Sorted row of the world of every agent
+
+        Returns:
+            Index of the category of each agent
+        """
+        draws = np.searchsorted(cum_probs,
+                                self.draw_batch_uniforms(worlds),
+                                side='right')
+        return np.minimum(draws, len(cum_probs) - 1)
+
+    def set_rng(self, rng: np.random.Generator) -> None:
+        """
+        Sets the random number generator used for all the random draws of the model. The simulation sets the generator
+        of the current world before the states of the agents are initialized.
+
+        Args:
+            rng: Random number generator of the current world
+        """
+        self.rng = rng
+
+    def set_batch_rngs(self, rngs: Union[List[np.random.Generator],
+                                         None]) -> None:
+        """
+        Sets the random number generators of the worlds of a batch, which are used for the random draws of the worlds
+        in :meth:`initialize_batch_states` and :meth:`find_next_batch_states`.
+
+        Args:
+            rngs: Random number generator of every world of the batch, or None to take the draws from the generator
+                  of the model
+        """
+        self.batch_rngs = rngs
+
+    def compute_contact_tables(self, agents_obj: ReadAgents) -> None:
+        """
+        Computes the infection probabilities of all the agents for every
+        :class:`ContactProbabilityTable` passed to a p_infection transition of the model. This is called once every
+        time step after all the valid interactions have been saved.
+
+        Args:
+            agents_obj: An object of class :class:`~episimmer.read_file.ReadAgents` containing all agents
+        """
+        for table in self.contact_tables:
+            table.compute(agents_obj, self.rng)
+
     def set_state_color(self, state: str, infectious: bool) -> None:
         """
         Sets the state color based on whether the state is infectious or not.
@@ -122,7 +873,41 @@ class BaseModel():
                                 Time.get_current_time_step())
             agent.add_event_result(p)
 
-    def set_event_contribution_fn(self, fn: Callable) -> None:
+    def update_events_infection(self, event_table: EventTable,
+                                agents_obj: ReadAgents) -> None:
+        """
+        Updates the agents with the infection probabilities of all the events of the current time step that are not
+        in a location under lockdown. If the event contribute and receive functions are batch functions, the
+        probabilities are computed for all the events at once by the event table. Otherwise,
+        :meth:`update_event_infection` is called for every event.
+
+        Args:
+            event_table: Events of the current time step
+            agents_obj: An object of class :class:`~episimmer.read_file.ReadAgents` containing all agents
+        """
+        active = np.fromiter((not location.lock_down_state
+                              for location in event_table.locations),
+                             dtype=bool,
+                             count=len(event_table.locations))
+        if not self.batch_contribute and not self.batch_receive:
+            for e in np.flatnonzero(active):
+                self.update_event_infection(event_table.events[e],
+                                            event_table.locations[e],
+                                            agents_obj)
+            return
+
+        if not active.any():
+            return
+        if not (self.batch_contribute and self.batch_receive):
+            raise TypeError(
+                'The event contribute and receive functions must either both be batch functions or both be '
+                'functions of a single agent.')
+        event_table.compute(self.contribute_fn, self.receive_fn, active)
+        self.event_table = event_table
+
+    def set_event_contribution_fn(self,
+                                  fn: Callable,
+                                  batch: bool = False) -> None:
         r"""
         Sets the event contribute function specifying the contribution of an agent to the ambient infection of an event.
         It must be set to a Callable function with four parameters : agent, event_info, location and time_step. agent
@@ -147,16 +932,44 @@ class BaseModel():
                     .
                     self.set_event_contribution_fn(event_contribute_fn)
 
+        If batch is True, the function is called once every time step for all the agents of all the events that can
+        contribute infection. It must then be a Callable with five parameters : states, event_ids, events, locations
+        and time_step. states and event_ids are arrays with the state of every contributing agent and the position of
+        its event in events, the list of information dictionaries of all the events. locations is the list of the
+        locations of the events. It must return an array with the contribution of every agent.
+
+        .. code-block:: python
+            :linenos:
+            :emphasize-lines: 9
+
+            def event_contribute_fn(states,event_ids,events,locations,current_time_step):
+                return np.where(states=='Infected',1.0,0.0)
+
+            class UserModel(model.StochasticModel):
+                def __init__(self):
+                    .
+                    .
+                    .
+                    self.set_event_contribution_fn(event_contribute_fn, batch=True)
+
         Args:
             fn: User-defined function used to determine the contribution of an agent to an ambient infection
+            batch: Whether the function is a batch function
         """
-        if not callable(fn) or len(signature(fn).parameters) != 4:
+        if batch:
+            if not callable(fn) or len(signature(fn).parameters) != 5:
+                raise TypeError(
+                    'The batch event contribution function must be set to a Callable with the following five '
+                    'parameters : states, event_ids, events, locations and time_step.'
+                )
+        elif not callable(fn) or len(signature(fn).parameters) != 4:
             raise TypeError(
                 'The event contribution function must be set to a Callable with the following four parameters : '
                 'agent, event_info, location and time_step.')
         self.contribute_fn = fn
+        self.batch_contribute = batch
 
-    def set_event_receive_fn(self, fn: Callable) -> None:
+    def set_event_receive_fn(self, fn: Callable, batch: bool = False) -> None:
         r"""
         Sets the event receive function specifying the probability of infection for an agent from the ambient infection
         of an event. It must be set to a Callable function with four parameters : agent, ambient_infection, event_info,
@@ -182,14 +995,44 @@ class BaseModel():
                     .
                     self.set_event_receive_fn(event_receive_fn)
 
+        If batch is True, the function is called once every time step for all the agents of all the events that can
+        receive infection. It must then be a Callable with six parameters : states, ambient_infection, event_ids,
+        events, locations and time_step. states, ambient_infection and event_ids are arrays with the state of every
+        receiving agent, the ambient infection of its event and the position of its event in events, the list of
+        information dictionaries of all the events. locations is the list of the locations of the events. It must
+        return an array with the probability of infection of every agent.
+
+        .. code-block:: python
+            :linenos:
+            :emphasize-lines: 10
+
+            def event_receive_fn(states,ambient_infection,event_ids,events,locations,current_time_step):
+                beta=0.001
+                return ambient_infection*beta
+
+            class UserModel(model.StochasticModel):
+                def __init__(self):
+                    .
+                    .
+                    .
+                    self.set_event_receive_fn(event_receive_fn, batch=True)
+
         Args:
             fn: User-defined function used to determine the probability of an agent receiving an ambient infection
+            batch: Whether the function is a batch function
         """
-        if not callable(fn) or len(signature(fn).parameters) != 5:
+        if batch:
+            if not callable(fn) or len(signature(fn).parameters) != 6:
+                raise TypeError(
+                    'The batch event receive function must be set to a Callable with the following six parameters '
+                    ': states, ambient_infection, event_ids, events, locations and time_step.'
+                )
+        elif not callable(fn) or len(signature(fn).parameters) != 5:
             raise TypeError(
                 'The event receive function must be set to a Callable with the following four parameters : '
                 'agent, event_info, location and time_step.')
         self.receive_fn = fn
+        self.batch_receive = batch
 
     def set_external_prevalence_fn(self, fn: Callable) -> None:
         r"""
@@ -226,6 +1069,7 @@ class BaseModel():
                 'The external prevalence function must be set to a Callable with the following two parameters : '
                 'agent and time_step.')
         self.external_prev_fn = fn
+        self.external_prevalence = True
 
     def states_checker(self, states: List[str]) -> bool:
         """
@@ -289,6 +1133,52 @@ class BaseModel():
             )
         self.symptomatic_states = states
 
+    def get_group_not_infected_prob(self, fn: Callable,
+                                    p_infected_states_list: Union[List[float],
+                                                                  None],
+                                    group_info: Dict[str, Union[str,
+                                                                List[str]]],
+                                    agent: Agent,
+                                    agents: Dict[str, Agent]) -> float:
+        r"""
+        Returns the probability of an agent not being infected through a group interaction. This is the same as
+        expanding the group into contacts with all the other agents of the group that can contribute infection,
+        :math:`\prod_{j \neq i} (1 - p_j)`, where :math:`p_j` is the value of the user-defined function for the
+        contact agent :math:`j` with the group information as the interaction information. The values of the function
+        are computed once per group and function, and each agent of the group then excludes its own value, so a group
+        of :math:`k` agents costs :math:`O(k)` rather than :math:`O(k^2)`.
+
+        Args:
+            fn: User-defined function defining the probability of infection based on interactions
+            p_infected_states_list: List of probabilities that can be used in the user-defined function fn
+            group_info: Dictionary containing the information and agents of a group interaction
+            agent: Current agent object
+            agents: A dictionary mapping from agent indices to agent objects
+
+        Returns:
+            Probability of not being infected through the group interaction
+        """
+        cache = group_info.setdefault('_p_not_inf', {})
+        key = (fn, id(p_infected_states_list))
+        if key not in cache:
+            p_not_inf = {}
+            for index in group_info['_can_contrib']:
+                p_not_inf[index] = 1 - fn(p_infected_states_list,
+                                          agents[index], group_info,
+                                          Time.get_current_time_step())
+            log_sum = sum(math.log(p) for p in p_not_inf.values() if p > 0)
+            zeros = sum(1 for p in p_not_inf.values() if p <= 0)
+            cache[key] = (log_sum, zeros, p_not_inf)
+
+        log_sum, zeros, p_not_inf = cache[key]
+        own_p_not_inf = p_not_inf.get(agent.index)
+        if own_p_not_inf is not None:
+            if own_p_not_inf > 0:
+                log_sum -= math.log(own_p_not_inf)
+            else:
+                zeros -= 1
+        return 0.0 if zeros > 0 else math.exp(log_sum)
+
     def get_final_infection_prob(self, fn: Union[Callable, None],
                                  p_infected_states_list: Union[List[float],
                                                                None],
@@ -299,33 +1189,43 @@ class BaseModel():
 
         * Interactions (Individual and Probabilistic)
 
+        * Group Interactions
+
         * Events (Regular and One-Time)
 
         * External Prevalence
 
         Args:
             fn: User-defined function defining the probability of infection based on individual/probabilistic
-                interactions
+                interactions and group interactions
             p_infected_states_list: List of probabilities that can be used in the user-defined function fn
             agent: Current agent object
             agents: A dictionary mapping from agent indices to agent objects
         """
-        if agent.contact_list and fn is None:
+        if fn is None and (agent.get_contacts() or agent.group_list):
             raise TypeError(
                 'The environment has one-to-one interactions but a function to handle them has not been '
                 'passed. A callable must be passed as parameter to the dependent function.'
             )
 
         p_not_inf = 1
-        for c_dict in agent.contact_list:
-            contact_index = c_dict['Interacting Agent Index']
-            contact_agent = agents[contact_index]
+        if isinstance(fn, ContactProbabilityTable) and fn.is_computed():
+            p_not_inf = 1 - fn.get_infection_prob(agent)
+        else:
+            for contact_index, c_dict in agent.get_contacts():
+                contact_agent = agents[contact_index]
+
+                p_not_inf *= (1 - fn(p_infected_states_list, contact_agent,
+                                     c_dict, Time.get_current_time_step()))
 
-            p_not_inf *= (1 - fn(p_infected_states_list, contact_agent, c_dict,
-                                 Time.get_current_time_step()))
+        for group_info in agent.group_list:
+            p_not_inf *= self.get_group_not_infected_prob(
+                fn, p_infected_states_list, group_info, agent, agents)
 
         for p in agent.event_probabilities:
             p_not_inf *= (1 - p)
+        if self.event_table is not None and self.event_table.is_computed():
+            p_not_inf *= self.event_table.get_not_infected_prob(agent)
         return (1 - p_not_inf) + self.external_prev_fn(
             agent, Time.get_current_time_step())
 
@@ -471,13 +1371,75 @@ class StochasticModel(BaseModel):
             prob_list.append(cum_prob)
 
         for agent in agents.values():
-            r = random.random()
+            r = self.rng.random()
             for indx, value in enumerate(prob_list):
                 if r < value:
                     state = list(self.state_proportion.keys())[indx]
                     agent.initialize_state(state)
                     break
 
+    def initialize_batch_states(
+            self, num_worlds: int,
+            num_agents: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the initial states of the agents in a batch of worlds drawn from the state proportions. Agents in a
+        stochastic model have no schedule.
+
+        Args:
+            num_worlds: Number of worlds in the batch
+            num_agents: Number of agents in every world
+
+        Returns:
+            State codes and schedule times left with a row for every world
+        """
+        self.state_proportion_checker()
+
+        codes = np.array([
+            self.individual_state_types.index(state)
+            for state in self.state_proportion
+        ])
+        cum_probs = np.cumsum(list(self.state_proportion.values()))
+        worlds = np.repeat(np.arange(num_worlds), num_agents)
+        states = codes[self.draw_batch_categories(cum_probs, worlds)]
+        return states.reshape(num_worlds, num_agents), np.full(
+            (num_worlds, num_agents), np.nan)
+
+    def find_next_batch_states(
+            self, states: np.ndarray, schedule_time_left: np.ndarray,
+            infection_probs: Dict[ContactProbabilityTable,
+                                  np.ndarray]) -> None:
+        """
+        Finds the next states of the agents in a batch of worlds with one vectorized draw per source state. As in
+        :meth:`find_next_state`, the transition probabilities of the source state are added up in the order of the
+        individual state types and the first state whose cumulative probability exceeds the draw is chosen.
+
+        Args:
+            states: State codes with a row for every world
+            schedule_time_left: Schedule times left with a row for every world
+            infection_probs: Probabilities of infection of the agents through the contacts of the current time step for
+                             every contact probability table of the model
+        """
+        current_states = states.copy()
+        for code, s1 in enumerate(self.individual_state_types):
+            worlds, agents = np.nonzero(current_states == code)
+            if not len(worlds):
+                continue
+
+            r = self.draw_batch_uniforms(worlds)
+            p = np.zeros(len(worlds))
+            undecided = np.ones(len(worlds), dtype=bool)
+            for new_code, s2 in enumerate(self.individual_state_types):
+                fn = self.transmission_prob[s1][s2]
+                if fn.func == self.full_p_standard:
+                    p += fn.args[0]
+                elif fn.func == self.full_p_function:
+                    p += fn.args[0](Time.get_current_time_step())
+                else:
+                    p += infection_probs[fn.args[0]][worlds, agents]
+                chosen = undecided & (r < p)
+                states[worlds[chosen], agents[chosen]] = new_code
+                undecided &= ~chosen
+
     def find_next_state(self, agent: Agent,
                         agents: Dict[str, Agent]) -> Tuple[str, None]:
         """
@@ -492,7 +1454,7 @@ class StochasticModel(BaseModel):
             The new state of the agent
         """
         scheduled_time = None
-        r = random.random()
+        r = self.rng.random()
         p = 0
         for new_state in self.individual_state_types:
             p += self.transmission_prob[agent.state][new_state](agent, agents)
@@ -501,6 +1463,116 @@ class StochasticModel(BaseModel):
 
         return agent.state, scheduled_time
 
+    def compile_transitions(self) -> Dict[str, np.ndarray]:
+        """
+        Compiles the source states whose transitions are all :meth:`p_standard` or :meth:`p_function` transitions
+        into cumulative transition probabilities for the current time step. Source states with a :meth:`p_infection`
+        transition are left for per-agent evaluation. No source state is compiled if :meth:`find_next_state` is
+        overridden, so that the overriding method is called for every agent.
+
+        Returns:
+            Dictionary mapping source states to cumulative transition probabilities
+        """
+        if type(self).find_next_state is not StochasticModel.find_next_state:
+            return {}
+
+        compiled = {}
+        for s1 in self.individual_state_types:
+            probs = []
+            for s2 in self.individual_state_types:
+                fn = self.transmission_prob[s1][s2]
+                if not isinstance(fn, partial):
+                    break
+                if fn.func == self.full_p_standard:
+                    probs.append(fn.args[0])
+                elif fn.func == self.full_p_function:
+                    probs.append(fn.args[0](Time.get_current_time_step()))
+                else:
+                    break
+            else:
+                compiled[s1] = np.cumsum(probs)
+
+        return compiled
+
+    def get_infection_fns(
+            self) -> Union[Dict[str, List[Union[Callable, None]]], None]:
+        """
+        Returns the interaction functions of the :meth:`p_infection` transitions of every source state that has one.
+        None is returned if :meth:`find_next_state` is overridden or a transition is not built from
+        :meth:`p_standard`, :meth:`p_function` or :meth:`p_infection`.
+
+        Returns:
+            Dictionary mapping source states to the interaction functions of their p_infection transitions
+        """
+        if type(self).find_next_state is not StochasticModel.find_next_state:
+            return None
+
+        infection_fns = {}
+        for s1, transitions in self.transmission_prob.items():
+            for fn in transitions.values():
+                if not isinstance(fn, partial):
+                    return None
+                if fn.func == self.full_p_infection:
+                    infection_fns.setdefault(s1, []).append(fn.args[0])
+                elif fn.func not in (self.full_p_standard,
+                                     self.full_p_function):
+                    return None
+        return infection_fns
+
+    def get_idle_states(self) -> Union[List[str], None]:
+        """
+        Returns the states whose :meth:`p_standard` and :meth:`p_function` transitions to other states all have a
+        probability of 0 in the current time step. Agents in these states can only leave them through a
+        :meth:`p_infection` transition, so states with a p_infection transition are not idle if an external
+        prevalence function is set. None is returned if the transitions of the model cannot be inspected.
+
+        Returns:
+            List of idle states
+        """
+        infection_fns = self.get_infection_fns()
+        if infection_fns is None:
+            return None
+
+        idle_states = []
+        for s1 in self.individual_state_types:
+            if s1 in infection_fns and self.external_prevalence:
+                continue
+            for s2, fn in self.transmission_prob[s1].items():
+                if s2 == s1 or fn.func == self.full_p_infection:
+                    continue
+                if fn.func == self.full_p_standard:
+                    p = fn.args[0]
+                else:
+                    p = fn.args[0](Time.get_current_time_step())
+                if p != 0:
+                    break
+            else:
+                idle_states.append(s1)
+        return idle_states
+
+    def get_absorbing_states(self) -> Union[List[str], None]:
+        """
+        Returns the states whose transitions to other states are all :meth:`p_infection` transitions or
+        :meth:`p_standard` transitions with a probability of 0. None is returned if the transitions of the model cannot
+        be inspected.
+
+        Returns:
+            List of absorbing states
+        """
+        if self.get_infection_fns() is None:
+            return None
+
+        absorbing_states = []
+        for s1 in self.individual_state_types:
+            for s2, fn in self.transmission_prob[s1].items():
+                if s2 == s1 or fn.func == self.full_p_infection:
+                    continue
+                if fn.func != self.full_p_standard or fn.args[0] != 0:
+                    break
+            else:
+                absorbing_states.append(s1)
+        return absorbing_states
+
     def full_p_standard(self, p: float, agent: Agent,
                         agents: Dict[str, Agent]) -> float:
         """
@@ -620,7 +1692,7 @@ class StochasticModel(BaseModel):
 
         Args:
             fn: User-defined function defining the probability of infection based on individual/probabilistic
-                interactions
+                interactions and group interactions
             p_infected_states_list: List of probabilities that can be used in the user-defined function fn
             agent: Current agent object
             agents: A dictionary mapping from agent indices to agent objects
@@ -715,6 +1787,9 @@ class StochasticModel(BaseModel):
                 'A list has been passed but there is no user-defined function passed to use it'
             )
 
+        if isinstance(fn, ContactProbabilityTable):
+            self.contact_tables.append(fn)
+
         return partial(self.full_p_infection, fn, p_infected_states_list)
 
 
@@ -932,18 +2007,132 @@ class ScheduledModel(BaseModel):
             prob_list.append(cum_prob)
 
         for agent in agents.values():
-            r = random.random()
+            r = self.rng.random()
             for indx, value in enumerate(prob_list):
                 if r < value:
                     state = list(self.state_proportion.keys())[indx]
                     try:
-                        schedule_time_left = random.randint(
-                            0, int(self.state_mean[state]))
+                        schedule_time_left = int(
+                            self.rng.integers(0,
+                                              int(self.state_mean[state]),
+                                              endpoint=True))
                     except:
                         schedule_time_left = None
                     agent.initialize_state(state, schedule_time_left)
                     break
 
+    def initialize_batch_states(
+            self, num_worlds: int,
+            num_agents: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the initial states of the agents in a batch of worlds drawn from the state proportions, and their
+        schedule times left drawn uniformly up to the mean of their state. Agents in states without a mean have no
+        schedule.
+
+        Args:
+            num_worlds: Number of worlds in the batch
+            num_agents: Number of agents in every world
+
+        Returns:
+            State codes and schedule times left with a row for every world
+        """
+        self.state_proportion_checker()
+
+        codes = np.array([
+            self.individual_state_types.index(state)
+            for state in self.state_proportion
+        ])
+        cum_probs = np.cumsum(list(self.state_proportion.values()))
+        worlds = np.repeat(np.arange(num_worlds), num_agents)
+        states = codes[self.draw_batch_categories(cum_probs, worlds)]
+        schedule_time_left = np.full(len(states), np.nan)
+        for code, state in enumerate(self.individual_state_types):
+            if self.state_mean[state] is None:
+                continue
+            in_state = states == code
+            mean = int(self.state_mean[state])
+            schedule_time_left[in_state] = self.draw_batch(
+                worlds[in_state], lambda rng, size: rng.integers(
+                    0, mean, size=size, endpoint=True))
+        return states.reshape(num_worlds,
+                              num_agents), schedule_time_left.reshape(
+                                  num_worlds, num_agents)
+
+    def find_next_batch_states(
+            self, states: np.ndarray, schedule_time_left: np.ndarray,
+            infection_probs: Dict[ContactProbabilityTable,
+                                  np.ndarray]) -> None:
+        """
+        Finds the next states and schedule times left of the agents without a running countdown in a batch of worlds,
+        with vectorized draws per source state. As in :meth:`full_scheduled` and :meth:`full_p_infection`, a new state
+        is chosen from the proportions of the transition, agents of a p_infection transition that are not infected
+        stay in their state, and the schedule time left of every agent is drawn for its new state.
+
+        Args:
+            states: State codes with a row for every world
+            schedule_time_left: Schedule times left with a row for every world
+            infection_probs: Probabilities of infection of the agents through the contacts of the current time step for
+                             every contact probability table of the model
+        """
+        due_states = np.where(np.isnan(schedule_time_left), states, -1)
+        for code, state in enumerate(self.individual_state_types):
+            worlds, agents = np.nonzero(due_states == code)
+            if not len(worlds):
+                continue
+
+            fn = self.state_transition_fn[state]
+            new_states = fn.args[0]
+            codes = np.array([
+                self.individual_state_types.index(new_state)
+                for new_state in new_states
+            ])
+            new_codes = codes[self.draw_batch_categories(
+                np.cumsum(list(new_states.values())), worlds)]
+            if fn.func == self.full_p_infection:
+                r = self.draw_batch_uniforms(worlds)
+                new_codes[r >= infection_probs[fn.args[1]][worlds,
+                                                           agents]] = code
+            states[worlds, agents] = new_codes
+
+            for new_code in np.unique(new_codes).tolist():
+                chosen = new_codes == new_code
+                schedule_time_left[
+                    worlds[chosen],
+                    agents[chosen]] = self.find_batch_scheduled_times(
+                        self.individual_state_types[new_code], worlds[chosen])
+
+    def find_batch_scheduled_times(self, state: str,
+                                   worlds: np.ndarray) -> np.ndarray:
+        """
+        Returns the scheduled times of transition for a number of agents of a batch of worlds entering a state, drawn
+        as in :meth:`find_scheduled_time`. NaN denotes no schedule.
+
+        Args:
+            state: The state for which the scheduled times are returned
+            worlds: Sorted row of the world of every agent entering the state
+
+        Returns:
+            The scheduled times of transition of the agents
+        """
+        if self.state_fn[state] is not None:
+            times = [
+                self.state_fn[state](Time.get_current_time_step())
+                for _ in range(len(worlds))
+            ]
+            return np.array([np.nan if t is None else t for t in times],
+                            dtype=float)
+
+        mean = self.state_mean[state]
+        vary = self.state_vary[state]
+        if mean is None or vary is None:
+            return np.full(len(worlds), np.nan)
+        return np.maximum(
+            0,
+            np.trunc(
+                self.draw_batch(
+                    worlds,
+                    lambda rng, size: rng.normal(mean, np.sqrt(vary), size))))
+
     def find_scheduled_time(self, state: str) -> int:
         """
         Returns the scheduled time of transition for a state.
@@ -960,8 +2149,8 @@ class ScheduledModel(BaseModel):
             if mean is None or vary is None:
                 scheduled_time = None
             else:
-                scheduled_time = max(
-                    0, int(np.random.normal(mean, np.sqrt(vary))))
+                scheduled_time = max(0,
+                                     int(self.rng.normal(mean, np.sqrt(vary))))
 
         else:
 
@@ -998,7 +2187,7 @@ class ScheduledModel(BaseModel):
         """
         new_state = None
         p = 0
-        r = random.random()
+        r = self.rng.random()
         for state in state_dict.keys():
             p += state_dict[state]
             if r < p:
@@ -1006,6 +2195,77 @@ class ScheduledModel(BaseModel):
                 break
         return new_state
 
+    def get_infection_fns(
+            self) -> Union[Dict[str, List[Union[Callable, None]]], None]:
+        """
+        Returns the interaction functions of the :meth:`p_infection` transitions of every state that has one. None is
+        returned if :meth:`find_next_state` is overridden or a transition is not built from :meth:`scheduled` or
+        :meth:`p_infection`.
+
+        Returns:
+            Dictionary mapping states to the interaction functions of their p_infection transitions
+        """
+        if type(self).find_next_state is not ScheduledModel.find_next_state:
+            return None
+
+        infection_fns = {}
+        for state, fn in self.state_transition_fn.items():
+            if not isinstance(fn, partial):
+                return None
+            if fn.func == self.full_p_infection:
+                infection_fns[state] = [fn.args[1]]
+            elif fn.func != self.full_scheduled:
+                return None
+        return infection_fns
+
+    def get_idle_states(self) -> Union[List[str], None]:
+        """
+        Returns the states that agents without a running countdown stay in with certainty in the current time step,
+        unless they are exposed to infection. These are the states with a :meth:`scheduled` transition that can only
+        lead back to the state, and the states with a :meth:`p_infection` transition that do not schedule the agents
+        that are not infected. States with a p_infection transition are not idle if an external prevalence function is
+        set. None is returned if the transitions of the model cannot be inspected.
+
+        Returns:
+            List of idle states
+        """
+        infection_fns = self.get_infection_fns()
+        if infection_fns is None:
+            return None
+
+        idle_states = []
+        for state, fn in self.state_transition_fn.items():
+            if fn.func == self.full_p_infection:
+                unscheduled = self.state_fn[state] is None and (
+                    self.state_mean[state] is None
+                    or self.state_vary[state] is None)
+                if unscheduled and not self.external_prevalence:
+                    idle_states.append(state)
+            elif all(p == 0 or new_state == state
+                     for new_state, p in fn.args[0].items()):
+                idle_states.append(state)
+        return idle_states
+
+    def get_absorbing_states(self) -> Union[List[str], None]:
+        """
+        Returns the states with a :meth:`p_infection` transition, which agents that are not infected stay in, and the
+        states with a :meth:`scheduled` transition that can only lead back to the state. None is returned if the
+        transitions of the model cannot be inspected.
+
+        Returns:
+            List of absorbing states
+        """
+        if self.get_infection_fns() is None:
+            return None
+
+        absorbing_states = []
+        for state, fn in self.state_transition_fn.items():
+            if fn.func == self.full_p_infection or all(
+                    p == 0 or new_state == state
+                    for new_state, p in fn.args[0].items()):
+                absorbing_states.append(state)
+        return absorbing_states
+
     def full_scheduled(self, new_states: Dict[str, float], agent: Agent,
                        agents: Dict[str, Agent]) -> Tuple[str, int]:
         """
@@ -1084,7 +2344,7 @@ class ScheduledModel(BaseModel):
         Args:
             new_states: A dictionary mapping states to proportions an agent from the current state can transition to
             fn: User-defined function defining the probability of infection based on individual/probabilistic
-                interactions
+                interactions and group interactions
             p_infected_states_list: List of probabilities that can be used in the user-defined function fn
             agent: Current agent object
             agents: A dictionary mapping from agent indices to agent objects
@@ -1094,7 +2354,7 @@ class ScheduledModel(BaseModel):
         """
 
         new_state = self.choose_one_state(new_states)
-        r = random.random()
+        r = self.rng.random()
         if r >= self.get_final_infection_prob(fn, p_infected_states_list,
                                               agent, agents):
             new_state = agent.state
@@ -1151,7 +2411,7 @@ class ScheduledModel(BaseModel):
         Args:
             new_states: A dictionary mapping states to proportions an agent from the current state can transition to
             fn: User-defined function defining the probability of infection based on individual/probabilistic
-                interactions
+                interactions and group interactions
             p_infected_states_list: List of probabilities that can be used in the user-defined function fn
 
         Returns:
@@ -1197,5 +2457,8 @@ class ScheduledModel(BaseModel):
                 'A list has been passed but there is no user-defined function passed to use it'
             )
 
+        if isinstance(fn, ContactProbabilityTable):
+            self.contact_tables.append(fn)
+
         return partial(self.full_p_infection, new_states, fn,
                        p_infected_states_list)
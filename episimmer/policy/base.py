@@ -1,5 +1,7 @@
 from typing import Dict, Union, ValuesView
 
+import numpy as np
+
 from episimmer.agent import Agent
 from episimmer.location import Location
 from episimmer.model import BaseModel
@@ -14,6 +16,17 @@ class Policy():
     """
     def __init__(self, policy_type: str):
         self.policy_type: str = policy_type
+        self.rng: np.random.Generator = np.random.default_rng()
+
+    def set_rng(self, rng: np.random.Generator) -> None:
+        """
+        Sets the random number generator used for all the random draws of the policy. The simulation sets the
+        generator of the current world before the policy is reset.
+
+        Args:
+            rng: Random number generator of the current world
+        """
+        self.rng = rng
 
     def reset(self, agents: ValuesView[Agent], locations: ValuesView[Location],
               model: BaseModel, policy_index: int) -> None:
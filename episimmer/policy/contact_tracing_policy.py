@@ -173,9 +173,8 @@ class CTPolicy(AgentPolicy):
             policy_index: Policy index passed to differentiate policies
         """
         for agent_index in agents.keys():
-            for contact_dict in agents[agent_index].contact_list:
-                interacting_agent_index = contact_dict[
-                    'Interacting Agent Index']
+            for interacting_agent_index, _ in agents[agent_index].get_contacts(
+            ):
                 if self.attribute is None or agents[
                         interacting_agent_index].info[
                             self.attribute] in self.value_list:
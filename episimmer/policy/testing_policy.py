@@ -1,10 +1,11 @@
 import copy
 import json
-import random
 from collections import deque
 from functools import partial
 from typing import Callable, Deque, Dict, List, Union, ValuesView
 
+import numpy as np
+
 from episimmer.agent import Agent
 from episimmer.location import Location
 from episimmer.model import BaseModel
@@ -240,28 +241,31 @@ class Machine():
         self.testtubes.append(testtube)
         self.machine_cost += self.cost
 
-    def run_tests(self, infected_states: List[str], time_step: int) -> None:
+    def run_tests(self, infected_states: List[str], time_step: int,
+                  rng: np.random.Generator) -> None:
         """
         Runs the tests for each testtube in the machine.
 
         Args:
             infected_states: Infected states of the disease model
             time_step: Current time step
+            rng: Random number generator of the current world
         """
         self.available = False
         self.start_step = time_step
 
         for testtube in self.testtubes:
-            self.run_single_test(testtube, infected_states)
+            self.run_single_test(testtube, infected_states, rng)
 
-    def run_single_test(self, testtube: TestTube,
-                        infected_states: List[str]) -> None:
+    def run_single_test(self, testtube: TestTube, infected_states: List[str],
+                        rng: np.random.Generator) -> None:
         """
         Runs a single test for a testtube in the machine and saves the result for that testtube.
 
         Args:
             testtube: Instance of :class:`TestTube`
             infected_states: Infected states of the disease model
+            rng: Random number generator of the current world
         """
         result = 'Negative'
 
@@ -272,10 +276,10 @@ class Machine():
                 break
 
         if result == 'Negative':
-            if random.random() > self.true_negative_rate:
+            if rng.random() > self.true_negative_rate:
                 result = 'Positive'
         else:
-            if random.random() > self.true_positive_rate:
+            if rng.random() > self.true_positive_rate:
                 result = 'Negative'
 
         testtube.set_result(result)
@@ -675,9 +679,13 @@ class TestPolicy(AgentPolicy):
         # Assign agents to testtubes and populate ready queue
         for agent in agents_to_test:
             if len(self.cur_testtubes) > 0:
-                cur_list = random.sample(
-                    self.cur_testtubes,
-                    min(num_testtubes_per_agent, len(self.cur_testtubes)))
+                cur_list = [
+                    self.cur_testtubes[i]
+                    for i in self.rng.choice(len(self.cur_testtubes),
+                                             min(num_testtubes_per_agent,
+                                                 len(self.cur_testtubes)),
+                                             replace=False)
+                ]
 
                 for testtube in cur_list:
                     testtube.register_agent(agent, time_step)
@@ -712,7 +720,7 @@ class TestPolicy(AgentPolicy):
 
         """
         agents_copy = copy.copy(list(agents.values()))
-        random.shuffle(agents_copy)
+        self.rng.shuffle(agents_copy)
 
         # Get agents for test
         agents_to_test = []
@@ -809,7 +817,7 @@ class TestPolicy(AgentPolicy):
 
         """
         agents_copy = copy.copy(list(agents.values()))
-        random.shuffle(agents_copy)
+        self.rng.shuffle(agents_copy)
 
         # Get agents for test
         agents_to_test = []
@@ -930,7 +938,7 @@ class TestPolicy(AgentPolicy):
         """
         for machine in self.machine_list:
             if not machine.is_empty() and not machine.is_running():
-                machine.run_tests(model.infected_states, time_step)
+                machine.run_tests(model.infected_states, time_step, self.rng)
 
     def populate_results_in_machine(self, time_step: int) -> None:
         """
@@ -1,8 +1,9 @@
 import copy
-import random
 from functools import partial
 from typing import Callable, Dict, List, Union, ValuesView
 
+import numpy as np
+
 from episimmer.agent import Agent
 from episimmer.location import Location
 from episimmer.model import BaseModel
@@ -56,6 +57,7 @@ class VaccineType():
         dosage: Number of doses of the vaccine, applies only for multi-dose vaccine
         interval: List specifying minimum days to pass before the administration of the next dose, for each dose of a
                   multi-dose vaccine
+        rng: Random number generator used to inject the vaccine
     """
     def __init__(self,
                  name: str,
@@ -63,7 +65,8 @@ class VaccineType():
                  decay: Union[List[int], int],
                  efficacy: float,
                  dosage: Union[int, None] = None,
-                 interval: Union[List[int], None] = None):
+                 interval: Union[List[int], None] = None,
+                 rng: Union[np.random.Generator, None] = None):
 
         self.vaccine_name: str = name
         self.vaccine_cost: int = cost
@@ -71,6 +74,8 @@ class VaccineType():
         self.efficacy: float = efficacy
         self.dosage: Union[int, None] = dosage
         self.interval: Union[List[int], None] = interval
+        self.rng: np.random.Generator = rng if rng is not None else np.random.default_rng(
+        )
 
     def vaccinate(self,
                   agent: Agent,
@@ -107,7 +112,7 @@ class VaccineType():
         Returns:
             Result of vaccination (Successful or Unsuccessful)
         """
-        if random.random() < self.efficacy:
+        if self.rng.random() < self.efficacy:
             return 'Successful'
         else:
             return 'Unsuccessful'
@@ -215,7 +220,8 @@ class VaccinationPolicy(AgentPolicy):
                                           vaccine['decay'],
                                           vaccine['efficacy'],
                                           vaccine.get('dose', 0),
-                                          vaccine.get('interval', []))
+                                          vaccine.get('interval',
+                                                      []), self.rng)
                 self.vaccines.append(vaccine_obj)
 
     def add_vaccines(self,
@@ -341,7 +347,7 @@ class VaccinationPolicy(AgentPolicy):
             value_list: List of attribute values of agents
         """
         agents_copy = copy.copy(list(agents))
-        random.shuffle(agents_copy)
+        self.rng.shuffle(agents_copy)
         curr_agents_to_vaccinate = self.num_agents_to_vaccinate
 
         for agent in agents_copy:
@@ -351,7 +357,8 @@ class VaccinationPolicy(AgentPolicy):
             if attribute is None or agent.info[attribute] in value_list:
                 if agent.get_policy_state(
                         'Vaccination') is None and self.vaccines:
-                    current_vaccine = random.choice(self.vaccines)
+                    current_vaccine = self.vaccines[self.rng.integers(
+                        len(self.vaccines))]
                     result = current_vaccine.vaccinate(agent, time_step)
                     self.results.append(result)
                     self.vaccines.remove(current_vaccine)
@@ -414,7 +421,7 @@ class VaccinationPolicy(AgentPolicy):
             value_list: List of attribute values of agents
         """
         agents_copy = copy.copy(list(agents))
-        random.shuffle(agents_copy)
+        self.rng.shuffle(agents_copy)
         curr_agents_to_vaccinate = self.num_agents_to_vaccinate
 
         for agent in agents_copy:
@@ -427,7 +434,8 @@ class VaccinationPolicy(AgentPolicy):
 
                 if agent.get_policy_state(
                         'Vaccination') is None and self.vaccines:
-                    current_vaccine = random.choice(self.vaccines)
+                    current_vaccine = self.vaccines[self.rng.integers(
+                        len(self.vaccines))]
                     result = current_vaccine.vaccinate(agent, time_step)
                     self.results.append(result)
                     self.vaccines.remove(current_vaccine)
@@ -1,15 +1,18 @@
-import copy
 import json
+import math
+import os
 import os.path as osp
 import random
 import re
-from csv import DictReader
-from typing import Dict, List, Tuple, Union
+import weakref
+from csv import DictReader, reader
+from typing import Dict, FrozenSet, List, Tuple, Union
 
 import numpy as np
 
-from .agent import Agent
+from .agent import Agent, AgentStore, AgentView, ContactBlock, StepContacts
 from .location import Location
+from .utils.file_cache import FileCache
 
 
 class ReadConfiguration():
@@ -36,6 +39,8 @@ class ReadConfiguration():
         self.event_info_keys: str = ''
         self.events_files_list_list: List[str] = []
         self.one_time_event_file: str = ''
+        self.group_interactions_files_list_list: List[str] = ['']
+        self.bundle: Union[WorldBundle, None] = None
 
         self.read_config_file()
 
@@ -67,6 +72,12 @@ class ReadConfiguration():
         self.events_files_list_list = (self.get_value_config(
             f.readline())).split(',')
         self.one_time_event_file = self.get_value_config(f.readline())
+
+        # Optional line for group interactions
+        line = f.readline()
+        if line.strip() != '':
+            self.group_interactions_files_list_list = (
+                self.get_value_config(line)).split(',')
         f.close()
 
         if 'Agent Index' not in self.agent_info_keys.split(':'):
@@ -113,6 +124,27 @@ class ReadConfiguration():
                 raise Exception(
                     'Event definition does not contain parameter \'Agents\'')
 
+        bundle_filename = osp.join(self.example_path,
+                                   WorldBundle.bundle_filename)
+        if osp.isfile(bundle_filename):
+            self.bundle = WorldBundle(bundle_filename)
+
+    def get_bundled_file(
+            self, filename: str) -> Union[Tuple[str, List[List[str]]], None]:
+        """
+        Returns the information keys and the rows of values of a file if it is stored in the world bundle of the
+        example.
+
+        Args:
+            filename: Path of the file
+
+        Returns:
+            The information keys and the rows of the file, or None if the file cannot be loaded from a bundle
+        """
+        if self.bundle is None:
+            return None
+        return self.bundle.get_file(filename)
+
     def get_value_config(self, line: str) -> str:
         """
         Gets the value between the brackets <> in a line of the config file.
@@ -238,6 +270,26 @@ class ReadConfiguration():
 
         return interactions_files_list, events_files_list, probabilistic_interactions_files_list
 
+    def get_group_interaction_files_list(self) -> List[List[str]]:
+        """
+        Gets the lists of all the paths to the group interaction files from the optional group interaction files
+        lists of the config file.
+
+        Returns:
+            List of group interaction files
+        """
+        if self.group_interactions_files_list_list == ['']:
+            return []
+
+        group_interaction_files_obj = [
+            ReadFilesList(osp.join(self.example_path, files_list))
+            for files_list in self.group_interactions_files_list_list
+        ]
+        return [
+            list(map(lambda x: osp.join(self.example_path, x), obj.file_list))
+            for obj in group_interaction_files_obj
+        ]
+
 
 class ReadVDConfiguration():
     """
@@ -341,6 +393,180 @@ class ReadFilesList():
         f.close()
 
 
+class WorldBundle():
+    """
+    Class for reading the binary world bundle of an example. The bundle stores the rows of the agents, locations,
+    interactions and events files as integer codes into a single string table, so that the files can be loaded without
+    any line splitting. The bundle is created with ``episimmer compile <example_path>`` and is detected by
+    :class:`ReadConfiguration`. Files modified after the bundle was compiled are read from their text files instead.
+
+    Args:
+        filename: Name of the bundle file
+    """
+    bundle_filename: str = 'world_bundle.npz'
+
+    def __init__(self, filename: str):
+        self.filename: str = filename
+        self.example_path: str = osp.dirname(filename)
+        self.files: Dict[str, Dict[str, Union[str, int]]] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        self.strings: np.ndarray = np.empty(0, dtype=object)
+
+        self.read_bundle_file()
+
+    def read_bundle_file(self) -> None:
+        """
+        Reads the file table, the codes of all the files and the string table of the bundle. The bundle is only
+        opened once, and the rows of a file are looked up from the arrays kept in memory when they are requested.
+        """
+        with np.load(self.filename) as data:
+            self.files = json.loads(data['files'].tobytes().decode('utf-8'))
+            self.codes = {
+                entry['array']: data[entry['array']]
+                for entry in self.files.values()
+            }
+            text = data['text'].tobytes().decode('utf-8')
+            offsets = data['offsets'].tolist()
+
+        self.strings = np.array(
+            [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)],
+            dtype=object)
+
+    def get_file(self,
+                 filename: str) -> Union[Tuple[str, List[List[str]]], None]:
+        """
+        Returns the information keys and the rows of values of a file stored in the bundle.
+
+        Args:
+            filename: Path of the file
+
+        Returns:
+            The information keys and the rows of the file, or None if the file is not in the bundle or was modified
+            after the bundle was compiled
+        """
+        entry = self.files.get(
+            osp.normpath(osp.relpath(filename, self.example_path)))
+        if entry is None:
+            return None
+        if osp.isfile(
+                filename) and os.stat(filename).st_mtime_ns != entry['mtime']:
+            return None
+
+        return entry['keys'], self.strings[self.codes[entry['array']]].tolist()
+
+    @staticmethod
+    def compile_example(example_path: str, edges: bool = False) -> str:
+        """
+        Validates the information keys of the agents, locations, interactions and events files of an example against
+        its config file and writes the rows of all the files into a binary world bundle in the example directory.
+
+        Args:
+            example_path: Path of the directory containing the simulation files
+            edges: If True, a binary edge file is also written next to every interactions file with
+                   :meth:`ReadInteractions.write_edge_file`
+
+        Returns:
+            Path of the bundle file
+        """
+        config_obj = ReadConfiguration(osp.join(example_path, 'config.txt'))
+        agents_filename, interactions_files_list_filename, \
+            events_files_list_filename, locations_filename, \
+            _, probabilistic_interactions_files_list_filename = config_obj.get_file_paths(example_path)
+        interactions_files_list, events_files_list, _ = config_obj.get_file_names_list(
+            example_path, interactions_files_list_filename,
+            events_files_list_filename,
+            probabilistic_interactions_files_list_filename)
+
+        sources = {agents_filename: ('Agent', config_obj.agent_info_keys)}
+        if locations_filename is not None:
+            sources[locations_filename] = ('Location',
+                                           config_obj.location_info_keys)
+        for files_list in interactions_files_list:
+            for filename in files_list:
+                if not filename.endswith('.npy'):
+                    sources[filename] = ('Interaction',
+                                         config_obj.interaction_info_keys)
+        for files_list in events_files_list:
+            for filename in files_list:
+                sources[filename] = ('Event', config_obj.event_info_keys)
+
+        string_codes = {}
+        files = {}
+        arrays = {}
+        for i, (filename, (kind, config_keys)) in enumerate(sources.items()):
+            info_keys, rows = WorldBundle.read_text_file(filename)
+            if info_keys != config_keys:
+                raise Exception(
+                    'Error! {0} parameters of {1} do not match the config.txt file'
+                    .format(kind, filename))
+            if kind == 'Agent':
+                column = info_keys.split(':').index('Agent Index')
+                agent_indices = [row[column] for row in rows]
+
+            codes = np.empty((len(rows), len(info_keys.split(':'))),
+                             dtype=np.int32)
+            for j, row in enumerate(rows):
+                codes[j] = [
+                    string_codes.setdefault(value, len(string_codes))
+                    for value in row
+                ]
+
+            array_name = 'file_{0}'.format(i)
+            arrays[array_name] = codes
+            files[osp.normpath(osp.relpath(filename, example_path))] = {
+                'keys': info_keys,
+                'mtime': os.stat(filename).st_mtime_ns,
+                'array': array_name
+            }
+
+        strings = list(string_codes)
+        offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+        np.cumsum([len(string) for string in strings], out=offsets[1:])
+        text = ''.join(strings).encode('utf-8')
+
+        bundle_filename = osp.join(example_path, WorldBundle.bundle_filename)
+        with open(bundle_filename, 'wb') as f:
+            np.savez(f,
+                     files=np.frombuffer(json.dumps(files).encode('utf-8'),
+                                         dtype=np.uint8),
+                     text=np.frombuffer(text, dtype=np.uint8),
+                     offsets=offsets,
+                     **arrays)
+
+        if edges:
+            for filename, (kind, _) in sources.items():
+                if kind == 'Interaction':
+                    ReadInteractions.write_edge_file(filename, agent_indices)
+
+        return bundle_filename
+
+    @staticmethod
+    def read_text_file(filename: str) -> Tuple[str, List[List[str]]]:
+        """
+        Reads the information keys and the rows of values of an agents, locations, interactions or events file
+        (either a txt or csv file).
+
+        Args:
+            filename: Path of the file
+
+        Returns:
+            The information keys and the rows of the file
+        """
+        if filename.endswith('.csv'):
+            with open(filename, 'r') as read_obj:
+                csv_reader = reader(read_obj)
+                info_keys = ':'.join(next(csv_reader))
+                rows = [row for row in csv_reader if row]
+        else:
+            get_value = BaseReadFile().get_value
+            with open(filename, 'r') as f:
+                n = int(get_value(f.readline()))
+                info_keys = get_value(f.readline())
+                rows = [get_value(f.readline()).split(':') for i in range(n)]
+
+        return info_keys, rows
+
+
 class BaseReadFile():
     """
     Base class for reading agents, locations, interactions and events from a file.
@@ -373,14 +599,27 @@ class ReadAgents(BaseReadFile):
         filename: Name of the file containing agent information.
         config_obj: An object of class :class:`~episimmer.read_file.ReadConfiguration` containing the simulation
                     configurations.
+        columnar: If True, the agents are :class:`~episimmer.agent.AgentView` objects that keep their attributes
+                  only in the NumPy arrays of the :class:`~episimmer.agent.AgentStore` of the agents object
     """
-    def __init__(self, filename: str, config_obj: ReadConfiguration):
+    def __init__(self,
+                 filename: str,
+                 config_obj: ReadConfiguration,
+                 columnar: bool = False):
         super().__init__()
         self.filename: str = filename
         self.config_obj: ReadConfiguration = config_obj
+        self.columnar: bool = columnar
         self.n: Union[int, None] = None
         self.parameter_keys: List[str] = []
         self.agents: Dict[str, Agent] = {}
+        self.parsed_agents: Dict[str, Agent] = {}
+        self.store: AgentStore = AgentStore([])
+        self.present: np.ndarray = np.ones(0, dtype=bool)
+        self.contacts: StepContacts = StepContacts(self.store)
+        self.edge_files: List[np.ndarray] = []
+        self.groups: List[Dict[str, Union[str, List[str]]]] = []
+        self.touched_agents: Dict[str, Agent] = {}
 
         self.read_agents_file()
 
@@ -389,7 +628,20 @@ class ReadAgents(BaseReadFile):
         Reads the agents file (either a txt or csv file) and generates a dictionary mapping agent indices to
         :class:`~episimmer.agent.Agent` objects with the information from the file.
         """
-        if self.filename.endswith('.txt'):
+        bundled = self.config_obj.get_bundled_file(
+            self.filename) if self.config_obj is not None else None
+        if bundled is not None:
+            agent_info_keys, rows = bundled
+            if agent_info_keys != self.config_obj.agent_info_keys:
+                raise Exception(
+                    'Error! Agent Information parameters do not match the config.txt file'
+                )
+
+            self.n = len(rows)
+            self.parameter_keys = agent_info_keys.split(':')
+            self.create_agents([self.create_info_dict(row) for row in rows])
+
+        elif self.filename.endswith('.txt'):
             f = open(self.filename, 'r')
             self.n = int(self.get_value(f.readline()))
             agent_info_keys = self.get_value(f.readline())
@@ -400,13 +652,13 @@ class ReadAgents(BaseReadFile):
 
             self.parameter_keys = agent_info_keys.split(':')
 
+            info_dicts = []
             for i in range(self.n):
-                info_dict = self.create_info_dict(
-                    self.get_value(f.readline()).split(':'))
-                state = None  # config_obj.default_state
-                agent = Agent(state, info_dict)
-                self.agents[agent.index] = agent
+                info_dicts.append(
+                    self.create_info_dict(
+                        self.get_value(f.readline()).split(':')))
             f.close()
+            self.create_agents(info_dicts)
 
         elif self.filename.endswith('.csv'):
             with open(self.filename, 'r') as read_obj:
@@ -423,11 +675,211 @@ class ReadAgents(BaseReadFile):
 
                 self.parameter_keys = csv_dict_reader.fieldnames
 
-                for i in range(self.n):
-                    info_dict = dict(csv_list[i])
-                    state = None  # config_obj.default_state
-                    agent = Agent(state, info_dict)
-                    self.agents[agent.index] = agent
+                self.create_agents([dict(info) for info in csv_list])
+
+    def create_agents(self, info_dicts: List[Dict[str, str]]) -> None:
+        """
+        Generates the agents from their information dictionaries. The agent indices are mapped to dense integer ids of
+        an :class:`~episimmer.agent.AgentStore`, which keeps the states, infection restrictions and protection flags
+        of all the agents in NumPy arrays. If the columnar backend is enabled, views into the store are generated
+        instead of agents that write their attributes to the store. The contacts of the agents are kept in the
+        :class:`~episimmer.agent.StepContacts` of the agents object.
+
+        Args:
+            info_dicts: List of information dictionaries of the agents
+        """
+        self.store = AgentStore(
+            dict.fromkeys(info_dict['Agent Index']
+                          for info_dict in info_dicts))
+        self.present = np.ones(self.store.n, dtype=bool)
+        self.contacts = StepContacts(self.store)
+        for info_dict in info_dicts:
+            if self.columnar:
+                agent = AgentView(self.store, info_dict)
+            else:
+                state = None  # config_obj.default_state
+                agent = Agent(state, info_dict, self.store)
+            agent.touched_agents = self.touched_agents
+            agent.step_contacts = self.contacts
+            self.agents[agent.index] = agent
+        self.parsed_agents = dict(self.agents)
+
+    def reset(self) -> None:
+        """
+        Restores all the agents read from the agents file and resets their mutable attributes. This allows a single
+        parsed agents file to be reused across worlds without any file I/O.
+        """
+        self.agents = dict(self.parsed_agents)
+        self.edge_files = []
+        self.groups = []
+        self.store.reset()
+        self.present.fill(True)
+        self.contacts.clear()
+        for agent in self.agents.values():
+            agent.reset()
+        self.touched_agents.clear()
+
+    def remove_agent(self, index: str) -> None:
+        """
+        Removes an agent from the simulation until the agents are reset.
+
+        Args:
+            index: Index of the agent
+        """
+        agent = self.agents.pop(index)
+        self.present[agent.id] = False
+
+    def new_time_step(self) -> None:
+        """
+        Removes the contacts of the previous time step and resets the attributes of the agents that were changed in
+        it. Agents record themselves as changed when groups, events or infection restrictions are added to them.
+        """
+        self.contacts.clear()
+        for agent in self.touched_agents.values():
+            agent.new_time_step()
+        self.touched_agents.clear()
+
+    def add_contact_block(self, block: ContactBlock) -> None:
+        """
+        Adds a block of contacts to the contacts of the current time step. Contacts of agents that are not part of the
+        simulation or with such agents are left out.
+
+        Args:
+            block: Block of contacts
+        """
+        present = self.get_present_mask()
+        if present is not None:
+            block = block.select(present[block.receivers]
+                                 & present[block.senders])
+        self.contacts.add_block(block)
+
+    def get_contact_block(self, records: List[Dict[str, str]]) -> ContactBlock:
+        """
+        Returns the block of the contacts of information dictionaries with the agent indices of the interactions.
+        Interactions with agents that are not in the agents file are left out.
+
+        Args:
+            records: Information dictionaries of the interactions
+
+        Returns:
+            Block of the contacts
+        """
+        ids = self.store.ids
+        receivers = np.fromiter((ids.get(info_dict.get('Agent Index'), -1)
+                                 for info_dict in records),
+                                dtype=np.int64,
+                                count=len(records))
+        senders = np.fromiter(
+            (ids.get(info_dict['Interacting Agent Index'], -1)
+             for info_dict in records),
+            dtype=np.int64,
+            count=len(records))
+        record_array = np.empty(len(records), dtype=object)
+        record_array[:] = records
+        valid = (receivers >= 0) & (senders >= 0)
+        return ContactBlock(receivers[valid], senders[valid],
+                            record_array[valid])
+
+    def add_edge_file_contacts(self) -> None:
+        """
+        Adds the interactions of the memory-mapped edge files to the contacts of the current time step and removes the
+        edge files, so that the interactions are seen by user-defined interaction functions and policies like those
+        of interactions files. Integral values of the interaction parameters are written without a decimal point.
+        """
+        order = self.store.indices
+        for edges in self.edge_files:
+            keys = edges.dtype.names
+            records = []
+            for record in edges.tolist():
+                contact_dict = {}
+                for key, value in zip(keys, record):
+                    if key in ('Agent Index', 'Interacting Agent Index'):
+                        contact_dict[key] = order[value]
+                    elif float(value).is_integer():
+                        contact_dict[key] = str(int(value))
+                    else:
+                        contact_dict[key] = repr(value)
+                records.append(contact_dict)
+            record_array = np.empty(len(records), dtype=object)
+            record_array[:] = records
+            columns = {
+                key: np.array(edges[key], dtype=float)
+                for key in keys
+                if key not in ('Agent Index', 'Interacting Agent Index')
+            }
+            self.add_contact_block(
+                ContactBlock(
+                    np.array(edges['Agent Index'], dtype=np.int64),
+                    np.array(edges['Interacting Agent Index'], dtype=np.int64),
+                    record_array, columns))
+        self.edge_files = []
+
+    def get_agent_ids(self) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Returns the dense integer ids of the agents in the agent store.
+
+        Returns:
+            Agent indices ordered by id and dictionary mapping from agent indices to ids
+        """
+        return self.store.indices, self.store.ids
+
+    def get_present_mask(self) -> Union[np.ndarray, None]:
+        """
+        Returns whether the agent of every id is part of the simulation. Agents removed with :meth:`remove_agent` are
+        tracked without going through the agents, which is only done if agents were removed from the agents dictionary
+        directly.
+
+        Returns:
+            Boolean array over the agent ids, or None if all the agents are part of the simulation
+        """
+        if len(self.agents) == self.store.n:
+            return None
+        if np.count_nonzero(self.present) != len(self.agents):
+            self.present.fill(False)
+            self.present[np.fromiter(
+                (agent.id for agent in self.agents.values()),
+                dtype=np.int64,
+                count=len(self.agents))] = True
+        return self.present
+
+    def get_infection_restrictions(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the can_contribute_infection and can_receive_infection of every agent id from the columns of the agent
+        store. The value of can_receive_infection is 0 for agents under protection, and both values are 0 for agents
+        that are not part of the simulation.
+
+        Returns:
+            can_contribute_infection and can_receive_infection of every agent id
+        """
+        can_contribute = self.store.can_contribute_infection.copy()
+        can_receive = np.where(self.store.under_protection, 0.0,
+                               self.store.can_receive_infection)
+        present = self.get_present_mask()
+        if present is not None:
+            can_contribute[~present] = 0.0
+            can_receive[~present] = 0.0
+        return can_contribute, can_receive
+
+    def get_state_mask(self, states: List[str]) -> np.ndarray:
+        """
+        Returns whether every agent id belongs to an agent of the simulation in one of the given states, from the
+        column of state codes of the agent store.
+
+        Args:
+            states: List of states
+
+        Returns:
+            Boolean array over the agent ids
+        """
+        codes = [
+            self.store.state_codes[state] for state in states
+            if state in self.store.state_codes
+        ]
+        mask = np.isin(self.store.state, codes)
+        present = self.get_present_mask()
+        if present is not None:
+            mask &= present
+        return mask
 
     def create_info_dict(self, info_list: List[str]) -> Dict[str, str]:
         """
@@ -451,98 +903,179 @@ class ReadInteractions(BaseReadFile):
     Class for reading and storing individual interaction information from the interactions file.
     Inherits :class:`BaseReadFile` class.
 
+    An interactions file can also be a binary edge file (a npy file written by :meth:`write_edge_file`). Edge files
+    are memory-mapped and added to the ``edge_files`` of the agents object instead of the contacts of the agents, and
+    their interactions are only seen by :class:`~episimmer.model.ContactProbabilityTable` kernels. The simulation adds
+    them to the contacts with :meth:`ReadAgents.add_edge_file_contacts` when they must be seen otherwise.
+
     Args:
         filename: Name of the file containing individual interaction information.
         config_obj: An object of class :class:`ReadConfiguration` containing the simulation
                     configurations.
         agents_obj: An object of class :class:`ReadAgents` containing agent information
+        read: If False, the file is not read when the object is created
     """
-    def __init__(self, filename: str, config_obj: ReadConfiguration,
-                 agents_obj: ReadAgents):
+    def __init__(self,
+                 filename: str,
+                 config_obj: ReadConfiguration,
+                 agents_obj: Union[ReadAgents, None],
+                 read: bool = True):
         super().__init__()
         self.filename: str = filename
         self.config_obj: ReadConfiguration = config_obj
-        self.agents_obj: ReadAgents = agents_obj
+        self.agents_obj: Union[ReadAgents, None] = agents_obj
         self.no_interactions: int = 0
         self.parameter_keys: List[str] = []
 
-        self.read_interactions_file()
+        if read:
+            self.read_interactions_file()
 
     def read_interactions_file(self) -> None:
         """
         Reads the interaction file (either a txt or csv file) and adds contact information from the interactions file
-        to the :class:`~episimmer.agent.Agent` objects.
+        to the contacts of the agents object. The parsed interactions are stored in the :class:`FileCache` along with
+        their contact blocks, so that interaction files repeating across time steps and worlds are only tokenized
+        once.
         """
         if self.filename == '' or self.filename is None:
             return
 
-        if self.filename.endswith('.txt'):
-            f = open(self.filename, 'r')
-            self.no_interactions = int(self.get_value(f.readline()))
-            interaction_info_keys = self.get_value(f.readline())
-            if interaction_info_keys != self.config_obj.interaction_info_keys:
+        if self.filename.endswith('.npy'):
+            self.read_edge_file()
+            return
+
+        contents = FileCache.load('Interactions', self.filename,
+                                  self.parse_interactions_file)
+
+        interaction_info_keys, records, blocks = contents
+        if interaction_info_keys != self.config_obj.interaction_info_keys:
+            if self.filename.endswith('.csv'):
                 raise Exception(
-                    'Error! Interaction parameters do not match the config.txt file'
+                    'Error! Interaction Information parameters do not match the config.txt file'
                 )
-            self.parameter_keys = interaction_info_keys.split(':')
+            raise Exception(
+                'Error! Interaction parameters do not match the config.txt file'
+            )
+        self.parameter_keys = interaction_info_keys.split(':')
+        self.no_interactions = len(records)
 
-            for i in range(self.no_interactions):
-                parameter_list = (self.get_value(f.readline())).split(':')
-                agent_index, info_dict = self.get_interaction(parameter_list)
-                if agent_index is not None and info_dict is not None:
-                    self.agents_obj.agents[agent_index].add_contact(info_dict)
+        # The agent ids of the interactions are only looked up the first time the file is read into the agents
+        block = blocks.get(self.agents_obj.store)
+        if block is None:
+            block = self.agents_obj.get_contact_block(records)
+            blocks[self.agents_obj.store] = block
+        self.agents_obj.add_contact_block(block)
 
-            f.close()
+    def read_edge_file(self) -> None:
+        """
+        Memory-maps the binary edge file and adds it to the edge files of the agents object. The edges are not copied
+        into memory, so the pages of the file are shared by all the worker processes reading it.
+        """
+        edges = np.load(self.filename, mmap_mode='r')
+        if ':'.join(
+                edges.dtype.names) != self.config_obj.interaction_info_keys:
+            raise Exception(
+                'Error! Interaction parameters do not match the config.txt file'
+            )
+        self.parameter_keys = list(edges.dtype.names)
+        self.no_interactions = len(edges)
+        self.agents_obj.edge_files.append(edges)
 
-        elif self.filename.endswith('.csv'):
-            with open(self.filename, 'r') as read_obj:
-                csv_dict_reader = DictReader(read_obj)
-                csv_list = list(csv_dict_reader)
-                self.no_interactions = len(csv_list)
+    @staticmethod
+    def write_edge_file(filename: str, agent_indices: List[str]) -> str:
+        """
+        Converts an interactions file (either a txt or csv file) into a binary edge file with the same name and a npy
+        extension. Each edge is a fixed-width record holding the ids of the two agents and the values of the other
+        interaction parameters, which must be numeric. Agents are numbered by their order in the agents file, and the
+        edges are sorted by the id of the receiving agent. Interactions with agents not in the agents file are dropped.
 
-                interaction_info_keys = ':'.join(csv_dict_reader.fieldnames)
-                if interaction_info_keys != self.config_obj.interaction_info_keys:
-                    raise Exception(
-                        'Error! Interaction Information parameters do not match the config.txt file'
-                    )
-                self.parameter_keys = csv_dict_reader.fieldnames
+        Args:
+            filename: Name of the interactions file
+            agent_indices: Agent indices in the order of the agents file
 
-                for i in range(self.no_interactions):
-                    info_dict = dict(csv_list[i])
-                    if (info_dict['Agent Index']
-                            in self.agents_obj.agents.keys()
-                            and info_dict['Interacting Agent Index']
-                            in self.agents_obj.agents):
-                        agent_index = info_dict['Agent Index']
-                        self.agents_obj.agents[agent_index].add_contact(
-                            info_dict)
-
-    def get_interaction(
-        self, parameter_list: List[str]
-    ) -> Tuple[Union[str, None], Union[Dict[str, str], None]]:
+        Returns:
+            Name of the edge file
         """
-         Creates a dictionary containing information of a single interaction.
+        info_keys, rows = WorldBundle.read_text_file(filename)
+        keys = info_keys.split(':')
+        ids = {index: i for i, index in enumerate(agent_indices)}
+        rows = [
+            row for row in rows if row[keys.index('Agent Index')] in ids
+            and row[keys.index('Interacting Agent Index')] in ids
+        ]
+
+        edges = np.empty(
+            len(rows),
+            dtype=[(key, np.int64) if key in ('Agent Index',
+                                              'Interacting Agent Index') else
+                   (key, np.float64) for key in keys])
+        for i, key in enumerate(keys):
+            if key in ('Agent Index', 'Interacting Agent Index'):
+                edges[key] = [ids[row[i]] for row in rows]
+            else:
+                edges[key] = [float(row[i]) for row in rows]
+        edges = edges[np.argsort(edges['Agent Index'], kind='stable')]
+
+        edge_filename = osp.splitext(filename)[0] + '.npy'
+        np.save(edge_filename, edges)
+        return edge_filename
+
+    @staticmethod
+    def prefetch_file(filename: str, config_obj: ReadConfiguration) -> None:
+        """
+        Parses an interactions file into the :class:`FileCache` without adding its interactions to any agent, so that
+        reading it later is a cache hit. Binary edge files are not prefetched as they are memory-mapped.
 
         Args:
-            parameter_list: List of values for all the parameter keys of an interaction.
+            filename: Name of the interactions file
+            config_obj: An object of class :class:`ReadConfiguration` containing the simulation configurations
+        """
+        if filename.endswith('.npy'):
+            return
+        reader = ReadInteractions(filename, config_obj, None, read=False)
+        FileCache.load('Interactions', filename,
+                       reader.parse_interactions_file)
+
+    def parse_interactions_file(
+            self
+    ) -> Tuple[str, List[Dict[str, str]], weakref.WeakKeyDictionary]:
+        """
+        Parses the interaction file (either a txt or csv file, or its rows in the world bundle) without filtering the
+        interactions by the agents present in the simulation. The information dictionaries returned are shared across
+        time steps and must not be modified. The contact blocks of the interactions are cached for every agent store
+        they are read into.
 
         Returns:
-            Information dictionary of the interaction.
+            The interaction information keys of the file, the information dictionaries of all its interactions and the
+            cache of its contact blocks
         """
-        info_dict = {}
-        agent_index = None
-        for i, key in enumerate(self.parameter_keys):
-            if key == 'Agent Index':
-                agent_index = parameter_list[i]
+        records = []
+        bundled = self.config_obj.get_bundled_file(self.filename)
+        if bundled is not None:
+            interaction_info_keys, rows = bundled
+            parameter_keys = interaction_info_keys.split(':')
+            records = [dict(zip(parameter_keys, row)) for row in rows]
+
+        elif self.filename.endswith('.txt'):
+            with open(self.filename, 'r') as f:
+                no_interactions = int(self.get_value(f.readline()))
+                interaction_info_keys = self.get_value(f.readline())
+                parameter_keys = interaction_info_keys.split(':')
+
+                for i in range(no_interactions):
+                    parameter_list = (self.get_value(f.readline())).split(':')
+                    records.append(dict(zip(parameter_keys, parameter_list)))
 
-            info_dict[key] = parameter_list[i]
+        elif self.filename.endswith('.csv'):
+            with open(self.filename, 'r') as read_obj:
+                csv_dict_reader = DictReader(read_obj)
+                records = [dict(row) for row in csv_dict_reader]
+                interaction_info_keys = ':'.join(csv_dict_reader.fieldnames)
 
-        if (agent_index not in self.agents_obj.agents.keys()
-                or info_dict['Interacting Agent Index']
-                not in self.agents_obj.agents.keys()):
-            agent_index, info_dict = None, None
+        else:
+            interaction_info_keys = self.config_obj.interaction_info_keys
 
-        return agent_index, info_dict
+        return interaction_info_keys, records, weakref.WeakKeyDictionary()
 
 
 class ReadProbabilisticInteractions(BaseReadFile):
@@ -555,13 +1088,20 @@ class ReadProbabilisticInteractions(BaseReadFile):
         config_obj: An object of class :class:`ReadConfiguration` containing the simulation
                     configurations.
         agents_obj: An object of class :class:`ReadAgents` containing agent information
+        rng: Random number generator used to sample the interactions. If not passed, a generator seeded from the
+             global random module, which is seeded by the config file, is used.
     """
-    def __init__(self, filename: str, config_obj: ReadConfiguration,
-                 agents_obj: ReadAgents):
+    def __init__(self,
+                 filename: str,
+                 config_obj: ReadConfiguration,
+                 agents_obj: ReadAgents,
+                 rng: Union[np.random.Generator, None] = None):
         super().__init__()
         self.filename: str = filename
         self.config_obj: ReadConfiguration = config_obj
         self.agents_obj: ReadAgents = agents_obj
+        self.rng: np.random.Generator = rng if rng is not None else np.random.default_rng(
+            random.getrandbits(64))
         self.no_interaction_sets: int = 0
         self.parameter_keys: List[str] = []
 
@@ -570,7 +1110,7 @@ class ReadProbabilisticInteractions(BaseReadFile):
     def read_prob_interactions_file(self) -> None:
         """
         Reads the probabilistic interaction file (a txt file) and adds contact information from the file
-        to the :class:`~episimmer.agent.Agent` objects.
+        to the contacts of the agents object.
         """
         if self.filename == '' or self.filename is None:
             return
@@ -589,41 +1129,55 @@ class ReadProbabilisticInteractions(BaseReadFile):
                     'Error! Probabilistic Interaction parameters do not match the config.txt file'
                 )
 
+            no_ids = np.empty(0, dtype=np.int64)
+            receivers = [no_ids]
+            senders = [no_ids]
+            records = [np.empty(0, dtype=object)]
             for i in range(self.no_interaction_sets):
                 parameter_list = (self.get_value(f.readline())).split(':')
-                interactions_list = self.get_interactions(parameter_list)
-                for (agent_index, info_dict) in interactions_list:
-                    self.agents_obj.agents[agent_index].add_contact(info_dict)
+                line_receivers, line_senders, info_dict = self.get_interactions(
+                    parameter_list)
+                line_records = np.empty(len(line_receivers), dtype=object)
+                line_records.fill(info_dict)
+                receivers.append(line_receivers)
+                senders.append(line_senders)
+                records.append(line_records)
 
             f.close()
+            self.agents_obj.add_contact_block(
+                ContactBlock(np.concatenate(receivers),
+                             np.concatenate(senders), np.concatenate(records)))
 
     def get_interactions(
-            self,
-            parameter_list: List[str]) -> List[Tuple[str, Dict[str, str]]]:
+        self, parameter_list: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, str]]:
         """
-         Generates the interactions using probability values and agent indices given in the probabilistic
-         interactions file.
+        Generates the interactions using probability values and agent indices given in a line of the probabilistic
+        interactions file. Every pair of agents of the line interacts with the probability of the line, and an
+        interaction adds a contact to both agents. All the contacts of the line share one information dictionary
+        holding the interaction parameters of the line, which must not be modified.
 
         Args:
             parameter_list: List containing probability of interaction and agent indices associated with
                             that probability.
 
         Returns:
-            Interaction list consisting of tuples of agent index and interaction information (as a dictionary).
+            Ids of the agents and the contact agents of the contacts, and the information dictionary of the line
         """
         info_dict = {}
         agent_indexes = []
-        interactions_list = []
         interaction_probability = 0
+        no_interactions = np.empty(0, dtype=np.int64), np.empty(
+            0, dtype=np.int64), info_dict
 
         for i, key in enumerate(self.parameter_keys):
             if key == 'Probability':
                 try:
                     interaction_probability = float(parameter_list[i])
                     if interaction_probability < 0 or interaction_probability > 1:
-                        return []
+                        return no_interactions
                 except:
-                    return []
+                    return no_interactions
 
             elif key == 'Agents':
                 agent_indexes = parameter_list[i].split(',')
@@ -637,21 +1191,157 @@ class ReadProbabilisticInteractions(BaseReadFile):
             else:
                 info_dict[key] = parameter_list[i]
 
-        for index, agent_index1 in enumerate(agent_indexes):
-            for agent_index2 in agent_indexes[index + 1:]:
-                if random.random() < interaction_probability:
+        ids = self.agents_obj.store.ids
+        agent_ids = np.array([ids[index] for index in agent_indexes],
+                             dtype=np.int64)
+        rows, columns = self.sample_pairs(len(agent_ids),
+                                          interaction_probability)
 
-                    temp_info_dict = copy.deepcopy(info_dict)
-                    temp_info_dict['Agent Index'] = agent_index1
-                    temp_info_dict['Interacting Agent Index'] = agent_index2
-                    interactions_list.append((agent_index1, temp_info_dict))
+        # The two contacts of a pair are adjacent, so the contacts of every agent keep the order of the pairs
+        receivers = np.stack((agent_ids[rows], agent_ids[columns]),
+                             axis=1).ravel()
+        senders = np.stack((agent_ids[columns], agent_ids[rows]),
+                           axis=1).ravel()
+        return receivers, senders, info_dict
 
-                    temp_info_dict = copy.deepcopy(info_dict)
-                    temp_info_dict['Agent Index'] = agent_index2
-                    temp_info_dict['Interacting Agent Index'] = agent_index1
-                    interactions_list.append((agent_index2, temp_info_dict))
+    def sample_pairs(self, n: int, p: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Samples every unordered pair of n agents independently with probability p. The pairs are numbered in the order
+        (0, 1), (0, 2), ..., (1, 2), ... and the gaps between consecutive sampled pairs are drawn from a geometric
+        distribution, so the number of draws is proportional to the number of sampled pairs rather than to
+        the number of pairs.
 
-        return interactions_list
+        Args:
+            n: Number of agents
+            p: Probability of interaction of each pair
+
+        Returns:
+            Positions of the first and second agent of the sampled pairs, in increasing order
+        """
+        num_pairs = n * (n - 1) // 2
+        if p <= 0 or num_pairs == 0:
+            positions = np.empty(0, dtype=np.int64)
+        elif p >= 1:
+            positions = np.arange(num_pairs)
+        else:
+            batch_size = int(num_pairs * p + 3 * math.sqrt(num_pairs * p *
+                                                           (1 - p))) + 16
+            batches = []
+            last = -1
+            while last < num_pairs:
+                batch = last + np.cumsum(self.rng.geometric(p, batch_size))
+                batches.append(batch[batch < num_pairs])
+                last = batch[-1]
+            positions = np.concatenate(batches)
+
+        # Pairs (i, j) with i < j start at position i * (n - 1) - i * (i - 1) / 2
+        row_starts = np.arange(n) * (n - 1) - np.arange(n) * (np.arange(n) -
+                                                              1) // 2
+        rows = np.searchsorted(row_starts, positions, side='right') - 1
+        columns = rows + 1 + positions - row_starts[rows]
+        return rows, columns
+
+
+class ReadGroupInteractions(BaseReadFile):
+    """
+    Class for reading and storing group interaction information from the group interactions file. In a group
+    interaction every agent of the group interacts with every other agent, but the group is never expanded into
+    pairwise contacts. Inherits :class:`BaseReadFile` class.
+
+    Args:
+        filename: Name of the file containing group interaction information.
+        config_obj: An object of class :class:`ReadConfiguration` containing the simulation
+                    configurations.
+        agents_obj: An object of class :class:`ReadAgents` containing agent information
+        read: If False, the file is not read when the object is created
+    """
+    def __init__(self,
+                 filename: str,
+                 config_obj: ReadConfiguration,
+                 agents_obj: Union[ReadAgents, None],
+                 read: bool = True):
+        super().__init__()
+        self.filename: str = filename
+        self.config_obj: ReadConfiguration = config_obj
+        self.agents_obj: Union[ReadAgents, None] = agents_obj
+        self.no_groups: int = 0
+        self.parameter_keys: List[str] = []
+
+        if read:
+            self.read_group_interactions_file()
+
+    def read_group_interactions_file(self) -> None:
+        """
+        Reads the group interactions file (a txt file) and adds the groups to the groups of the agents object. The
+        parsed groups are stored in the :class:`FileCache` so that group interaction files repeating across time
+        steps and worlds are only tokenized once.
+        """
+        if self.filename == '' or self.filename is None:
+            return
+
+        group_info_keys, records = FileCache.load(
+            'Group Interactions', self.filename,
+            self.parse_group_interactions_file)
+        self.parameter_keys = group_info_keys.split(':')
+        self.no_groups = len(records)
+
+        agents = self.agents_obj.agents
+        for template in records:
+            group_info = dict(template)
+            group_info['Agents'] = [
+                index for index in template['Agents'] if index in agents
+            ]
+            self.agents_obj.groups.append(group_info)
+
+    @staticmethod
+    def prefetch_file(filename: str, config_obj: ReadConfiguration) -> None:
+        """
+        Parses a group interactions file into the :class:`FileCache` without adding its groups to the agents object,
+        so that reading it later is a cache hit.
+
+        Args:
+            filename: Name of the group interactions file
+            config_obj: An object of class :class:`ReadConfiguration` containing the simulation configurations
+        """
+        reader = ReadGroupInteractions(filename, config_obj, None, read=False)
+        FileCache.load('Group Interactions', filename,
+                       reader.parse_group_interactions_file)
+
+    def parse_group_interactions_file(
+            self) -> Tuple[str, List[Dict[str, Union[str, List[str]]]]]:
+        """
+        Parses the group interactions file (a txt file) without filtering the agents of the groups by the agents
+        present in the simulation. The parameter keys of the file must contain 'Agents', a comma separated list of
+        the agents of the group. All the other parameters are passed to the user-defined function of p_infection as
+        the interaction information.
+
+        Returns:
+            The group information keys of the file and the information dictionaries of all its groups
+        """
+        records = []
+        with open(self.filename, 'r') as f:
+            no_groups = int(self.get_value(f.readline()))
+            group_info_keys = self.get_value(f.readline())
+            self.parameter_keys = group_info_keys.split(':')
+            if 'Agents' not in self.parameter_keys:
+                raise Exception(
+                    'Group interaction definition does not contain parameter \'Agents\''
+                )
+
+            for i in range(no_groups):
+                parameter_list = (self.get_value(f.readline())).split(':')
+                info_dict = {}
+                for j, key in enumerate(self.parameter_keys):
+                    if key == 'Agents':
+                        agent_indexes = parameter_list[j].split(',')
+                        if agent_indexes[-1] == '':
+                            agent_indexes = agent_indexes[:-1]
+                        info_dict[key] = list(dict.fromkeys(agent_indexes))
+                    else:
+                        info_dict[key] = parameter_list[j]
+                records.append(info_dict)
+
+        return group_info_keys, records
 
 
 class ReadLocations(BaseReadFile):
@@ -681,6 +1371,22 @@ class ReadLocations(BaseReadFile):
         """
         if self.filename == '' or self.filename is None:
             return
+
+        bundled = self.config_obj.get_bundled_file(self.filename)
+        if bundled is not None:
+            location_info_keys, rows = bundled
+            if location_info_keys != self.config_obj.location_info_keys:
+                raise Exception(
+                    'Error! Location parameters do not match the config.txt file'
+                )
+
+            self.no_locations = len(rows)
+            self.parameter_keys = location_info_keys.split(':')
+            for row in rows:
+                location = Location(self.create_info_dict(row))
+                self.locations[location.index] = location
+            return
+
         f = open(self.filename, 'r')
 
         self.no_locations = int(self.get_value(f.readline()))
@@ -698,6 +1404,13 @@ class ReadLocations(BaseReadFile):
 
         f.close()
 
+    def reset(self) -> None:
+        """
+        Resets all the locations read from the locations file so that they can be reused in a new world.
+        """
+        for location in self.locations.values():
+            location.reset()
+
     def create_info_dict(self, info_list: List[str]) -> Dict[str, str]:
         """
          Creates a dictionary containing information of a single location.
@@ -726,12 +1439,14 @@ class ReadEvents(BaseReadFile):
                     configurations.
         locations_obj: An object of class :class:`ReadLocations` containing location information
         agents_obj: An object of class :class:`ReadAgents` containing agent information
+        read: If False, the file is not read when the object is created
     """
     def __init__(self,
                  filename: str,
                  config_obj: Union[ReadConfiguration, None] = None,
                  locations_obj: Union[ReadLocations, None] = None,
-                 agents_obj: Union[ReadAgents, None] = None):
+                 agents_obj: Union[ReadAgents, None] = None,
+                 read: bool = True):
         super().__init__()
         self.filename: str = filename
         self.config_obj: Union[ReadConfiguration, None] = config_obj
@@ -740,46 +1455,90 @@ class ReadEvents(BaseReadFile):
         self.no_events: int = 0
         self.parameter_keys: List[str] = []
 
-        if config_obj:
+        if config_obj and read:
             self.read_events_file()
 
     def read_events_file(self) -> None:
         """
         Reads the events file (a txt file) and adds the information from the file
-        to the :class:`~episimmer.location.Location` objects.
+        to the :class:`~episimmer.location.Location` objects. The parsed events are stored in the :class:`FileCache`
+        so that event files repeating across time steps and worlds are only tokenized once.
         """
         if self.filename == '' or self.filename is None:
             return
-        f = open(self.filename, 'r')
-        self.no_events = int(self.get_value(f.readline()))
-        event_info_keys = self.get_value(f.readline())
+
+        contents = FileCache.load('Events', self.filename,
+                                  self.parse_events_file)
+
+        event_info_keys, records = contents
         if event_info_keys != self.config_obj.event_info_keys:
             raise Exception(
                 'Error! Event parameters do not match the config.txt file')
-
         self.parameter_keys = event_info_keys.split(':')
+        self.no_events = len(records)
 
-        for i in range(self.no_events):
-            parameter_list = (self.get_value(f.readline())).split(':')
-            location_index, info_dict = self.get_event(parameter_list)
-            if location_index is not None and info_dict is not None:
-                self.locations_obj.locations[location_index].add_event(
-                    info_dict)
+        agents = self.agents_obj.agents
+        for location_index, template in records:
+            info_dict = dict(template)
+            info_dict['Agents'] = [
+                index for index in template['Agents'] if index in agents
+            ]
+            self.locations_obj.locations[location_index].add_event(info_dict)
 
-        f.close()
+    @staticmethod
+    def prefetch_file(filename: str, config_obj: ReadConfiguration) -> None:
+        """
+        Parses an events file into the :class:`FileCache` without adding its events to any location, so that reading
+        it later is a cache hit.
 
-    def get_event(
+        Args:
+            filename: Name of the events file
+            config_obj: An object of class :class:`ReadConfiguration` containing the simulation configurations
+        """
+        reader = ReadEvents(filename, config_obj, read=False)
+        FileCache.load('Events', filename, reader.parse_events_file)
+
+    def parse_events_file(
+        self
+    ) -> Tuple[str, List[Tuple[str, Dict[str, Union[str, List[str]]]]]]:
+        """
+        Parses the events file (a txt file, or its rows in the world bundle) without filtering the agents of the events
+        by the agents present in the simulation. The information dictionaries returned are shared across time steps and
+        must be copied before being added to a location.
+
+        Returns:
+            The event information keys of the file and the location index and information dictionary of all its
+            events
+        """
+        bundled = self.config_obj.get_bundled_file(self.filename)
+        if bundled is not None:
+            event_info_keys, rows = bundled
+            self.parameter_keys = event_info_keys.split(':')
+            return event_info_keys, [self.parse_event(row) for row in rows]
+
+        records = []
+        with open(self.filename, 'r') as f:
+            no_events = int(self.get_value(f.readline()))
+            event_info_keys = self.get_value(f.readline())
+            self.parameter_keys = event_info_keys.split(':')
+
+            for i in range(no_events):
+                parameter_list = (self.get_value(f.readline())).split(':')
+                records.append(self.parse_event(parameter_list))
+
+        return event_info_keys, records
+
+    def parse_event(
         self, parameter_list: List[str]
-    ) -> Tuple[Union[str, None], Union[Dict[str, Union[float, str, List[str]]],
-                                       None]]:
+    ) -> Tuple[str, Dict[str, Union[str, List[str]]]]:
         """
-         Creates a dictionary containing information of a single event.
+        Creates a dictionary containing information of a single event without filtering its agents.
 
         Args:
             parameter_list: List of values for all the parameter keys of an event.
 
         Returns:
-            Information dictionary of the event.
+            Location index and information dictionary of the event.
         """
         info_dict = {}
         location_index = None
@@ -791,28 +1550,45 @@ class ReadEvents(BaseReadFile):
                 info_dict[key] = parameter_list[i].split(',')
 
                 if info_dict[key][-1] == '':
-                    info_dict[key] = info_dict[:-1]
+                    info_dict[key] = info_dict[key][:-1]
 
                 info_dict[key] = list(
                     dict.fromkeys(info_dict[key])
                 )  # Convert to unique list (with same order)
 
-                if set(info_dict[key]) - set(list(self.agents_obj.agents)):
-                    to_remove = set(info_dict[key]) - set(
-                        list(self.agents_obj.agents))
-                    info_dict[key] = [
-                        index for index in info_dict[key]
-                        if index not in to_remove
-                    ]
-
             else:
                 info_dict[key] = parameter_list[i]
 
+        if location_index is None:
+            raise Exception('Error! No event to read in the event file')
+        return location_index, info_dict
+
+    def get_event(
+        self, parameter_list: List[str]
+    ) -> Tuple[Union[str, None], Union[Dict[str, Union[float, str, List[str]]],
+                                       None]]:
+        """
+        Creates a dictionary containing information of a single event. The agents of the event are checked against
+        the dictionary of agents, so the time taken is proportional to the number of agents in the event and not to
+        the size of the population.
+
+        Args:
+            parameter_list: List of values for all the parameter keys of an event.
+
+        Returns:
+            Information dictionary of the event.
+        """
+        location_index, info_dict = self.parse_event(parameter_list)
+
+        agents = self.agents_obj.agents
+        if agents is not None:
+            info_dict['Agents'] = [
+                index for index in info_dict['Agents'] if index in agents
+            ]
+
         if info_dict['Agents'] is None or self.agents_obj.agents is None:
             location_index, info_dict = None, None
 
-        if location_index is None:
-            raise Exception('Error! No event to read in the event file')
         return location_index, info_dict
 
 
@@ -829,13 +1605,23 @@ class ReadOneTimeEvents(ReadEvents):
         self.event_info_keys: str = ''
         self.one_time_parameter_keys: List[str] = []
         self.eventsAt: Dict[int, List[str]] = {}
+        self.events_table: Dict[int, List[Tuple[str,
+                                                Dict[str,
+                                                     Union[str,
+                                                           List[str]]]]]] = {}
+        self.agent_events_table: Dict[int, List[Tuple[str, Dict[str, Union[
+            str, List[str]]]]]] = {}
+        self.agent_ids: Union[FrozenSet[str], None] = None
+        self.prepared_agents: Union[Dict[str, Agent], None] = None
+        self.prepared_count: int = 0
 
         self.read_one_time_events_file()
 
     def read_one_time_events_file(self) -> None:
         """
         Reads the one time events file (a txt file) and populates a dictionary mapping from time step to event
-        information
+        information. Every event is also parsed once into a table mapping from time step to the location index and
+        information dictionary of the events at that time step.
         """
         if self.filename == '' or self.filename is None:
             return
@@ -845,19 +1631,64 @@ class ReadOneTimeEvents(ReadEvents):
         self.one_time_parameter_keys = self.event_info_keys.split(':')
         self.parameter_keys = self.one_time_parameter_keys[1:]
         self.eventsAt = {}
+        self.events_table = {}
         for i in range(self.no_events):
             line = (self.get_value(f.readline())).split(':')
+            event = self.parse_event(line[1:])
             for time in line[0].split(','):
                 self.eventsAt[int(time)] = self.eventsAt.get(
                     int(time), []) + [':'.join(line[1:])]
+                self.events_table.setdefault(int(time), []).append(event)
         f.close()
 
+    def prepare_one_time_events(self, config_obj: ReadConfiguration,
+                                agents_obj: ReadAgents) -> None:
+        """
+        Validates the one time events against the config file and builds a copy of the events table without the
+        agents not present in the simulation. The parsed events table is left unchanged, as the agents of a world can
+        differ from those of an earlier world, for example when vulnerability detection removes agents. The copy is
+        keyed on the set of agent indices, so it is only rebuilt when that set changes.
+
+        Args:
+            config_obj: An object of class :class:`ReadConfiguration` containing the simulation
+                        configurations.
+            agents_obj: An object of class :class:`ReadAgents` containing agent information
+        """
+        if self.event_info_keys != 'Time Step:' + config_obj.event_info_keys:
+            raise Exception(
+                'Error! One Time Event parameters do not match the config.txt file'
+            )
+
+        agents = agents_obj.agents
+        agent_ids = frozenset(agents)
+        if agent_ids != self.agent_ids:
+            self.agent_events_table = {}
+            for time_step, events in self.events_table.items():
+                agent_events = []
+                for location_index, info_dict in events:
+                    if not all(index in agents
+                               for index in info_dict['Agents']):
+                        info_dict = dict(info_dict)
+                        info_dict['Agents'] = [
+                            index for index in info_dict['Agents']
+                            if index in agents
+                        ]
+                    agent_events.append((location_index, info_dict))
+                self.agent_events_table[time_step] = agent_events
+            self.agent_ids = agent_ids
+
+        self.config_obj = config_obj
+        self.agents_obj = agents_obj
+        self.prepared_agents = agents
+        self.prepared_count = len(agents)
+
     def populate_one_time_events(self, config_obj: ReadConfiguration,
                                  locations_obj: ReadLocations,
                                  agents_obj: ReadAgents,
                                  time_step: int) -> None:
         """
-        Populates the locations objects with one time events at the current time step
+        Populates the locations objects with one time events at the current time step. The events are taken from the
+        preparsed events table, so the time taken is proportional to the number of attendees of the events.
 
         Args:
             config_obj: An object of class :class:`ReadConfiguration` containing the simulation
@@ -868,14 +1699,12 @@ class ReadOneTimeEvents(ReadEvents):
         """
         if self.filename == '' or self.filename is None:
             return
-        self.config_obj = config_obj
+        if self.config_obj is not config_obj or self.agents_obj is not agents_obj or \
+                self.prepared_agents is not agents_obj.agents or self.prepared_count != len(agents_obj.agents):
+            self.prepare_one_time_events(config_obj, agents_obj)
         self.locations_obj = locations_obj
-        self.agents_obj = agents_obj
-        if self.event_info_keys != 'Time Step:' + config_obj.event_info_keys:
-            raise Exception(
-                'Error! One Time Event parameters do not match the config.txt file'
-            )
-        for event in self.eventsAt.get(time_step, []):
-            parameter_list = (self.get_value(event)).split(':')
-            location_index, info_dict = self.get_event(parameter_list)
+        for location_index, template in self.agent_events_table.get(
+                time_step, []):
+            info_dict = dict(template)
+            info_dict['Agents'] = list(template['Agents'])
             self.locations_obj.locations[location_index].add_event(info_dict)
@@ -1,15 +1,25 @@
+import argparse
+import copy
+import math
 import random
-from typing import Dict, List, Union
+import threading
+from typing import Dict, List, Set, Tuple, Union
 
 import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
 
 from episimmer.agent import Agent
-from episimmer.model import BaseModel
+from episimmer.model import (BaseModel, ContactProbabilityTable, EventTable,
+                             ScheduledModel)
 from episimmer.policy.base import Policy
 
 from .read_file import (ReadAgents, ReadConfiguration, ReadEvents,
-                        ReadInteractions, ReadLocations, ReadOneTimeEvents,
-                        ReadProbabilisticInteractions)
+                        ReadGroupInteractions, ReadInteractions, ReadLocations,
+                        ReadOneTimeEvents, ReadProbabilisticInteractions)
+from .utils.arg_parser import get_default_args
+from .utils.file_cache import FileCache
+from .utils.snapshot import dumps, is_serializable, loads
 from .utils.statistics import save_stats
 from .utils.time import Time
 from .utils.visualize import save_env_graph, store_animated_dynamic_graph
@@ -25,26 +35,75 @@ class Simulate():
         policy_list: List of all the policies part of the simulation
         agents_obj: An object of class :class:`~episimmer.read_file.ReadAgents`
         locations_obj: An object of class :class:`~episimmer.read_file.ReadLocations`
+        rng: Random number generator of the world. All the random draws of the simulation, the model and the policies
+             are taken from it. If not passed, a freshly seeded generator is used.
+        args: Command-line arguments of the simulation. If not passed, the default arguments are used.
     """
-    def __init__(self, config_obj: ReadConfiguration, model: BaseModel,
-                 policy_list: List[Policy], agents_obj: ReadAgents,
-                 locations_obj: ReadLocations):
+    def __init__(self,
+                 config_obj: ReadConfiguration,
+                 model: BaseModel,
+                 policy_list: List[Policy],
+                 agents_obj: ReadAgents,
+                 locations_obj: ReadLocations,
+                 rng: Union[np.random.Generator, None] = None,
+                 args: Union[argparse.Namespace, None] = None):
         self.agents_obj: ReadAgents = agents_obj
         self.locations_obj: ReadLocations = locations_obj
         self.model: BaseModel = model
         self.policy_list: List[Policy] = policy_list
         self.config_obj: ReadConfiguration = config_obj
         self.g_list: List[nx.Graph] = []
-        self.state_list: Dict[str, List[str]] = {}
+        self.state_list: Dict[str, Set[str]] = {}
+        self.state_counts: Dict[str, int] = {}
         self.state_history: Dict[str, List[int]] = {}
+        self.rng: np.random.Generator = rng if rng is not None else np.random.default_rng(
+        )
+        self.args: argparse.Namespace = args if args is not None else get_default_args(
+            config_obj.example_path)
+        self.timer_wheel: Union[Dict[int, List[Agent]], None] = None
+        self.untimed_agents: Dict[str, Agent] = {}
+        self.agent_positions: Dict[str, int] = {}
+        self.prefetch_thread: Union[threading.Thread, None] = None
+        self.prefetch_error: Union[Exception, None] = None
+        self.group_interaction_files_list_of_list: List[List[str]] = []
+        self.event_table: Union[EventTable, None] = None
+        self.susceptible_states: Union[List[str], None] = None
+        self.infectious_states: Union[List[str], None] = None
+        self.frontier: bool = False
+        self.exposed_agents: Union[Set[str], None] = None
+        self.absorbing_states: Union[List[str], None] = None
+        self.edge_file_contacts: bool = False
+        self.world: int = Time.get_current_world()
+        self.time_step: int = 0
+        self.global_rng_state: Union[Tuple[object, object], None] = None
 
     def on_start_simulation(self) -> None:
         """
         Function to initialize agent states, reset policies and initialize the state list and history,
         """
+        # Share the random number generator of the world
+        self.model.set_rng(self.rng)
+        for policy in self.policy_list:
+            policy.set_rng(self.rng)
+
+        # Group interaction files are listed in an optional line of the config file
+        group_files_list = self.config_obj.get_group_interaction_files_list()
+        self.group_interaction_files_list_of_list = group_files_list
+
+        # Interactions that cannot change the next state of an agent are not evaluated
+        self.set_transmission_states()
+        self.set_edge_file_contacts()
+
+        # Only the agents exposed to infection and the agents in states that can change are handled in frontier mode
+        self.frontier = self.args.frontier
+
+        # Worlds that reach an absorbing configuration are ended early
+        self.set_absorbing_states()
+
         # Initialize state list
         for state in self.model.individual_state_types:
-            self.state_list[state] = []
+            self.state_list[state] = set()
+            self.state_counts[state] = 0
             self.state_history[state] = []
 
         # Initialize states
@@ -58,11 +117,108 @@ class Simulate():
 
         # Update State list
         for agent in self.agents_obj.agents.values():
-            self.state_list[agent.state].append(agent.index)
+            self.state_list[agent.state].add(agent.index)
+            self.state_counts[agent.state] += 1
+
+        if isinstance(self.model, ScheduledModel) or self.frontier:
+            self.agent_positions = {
+                index: i
+                for i, index in enumerate(self.agents_obj.agents)
+            }
+
+        # Hold the scheduled countdowns in a timer wheel, unless the model finds next states in its own way
+        if isinstance(self.model, ScheduledModel) and type(
+                self.model).find_next_state is ScheduledModel.find_next_state:
+            self.timer_wheel = {}
+            self.schedule_agents(list(self.agents_obj.agents.values()), -1)
 
         # Store state list
         self.store_state()
 
+    def set_transmission_states(self) -> None:
+        """
+        Sets the states in which agents can be infected and the states of the contact agents through which an
+        interaction can infect, as derived from the transitions of the model. Interactions, group interactions and
+        events that cannot infect an agent are then pruned before any random draws or calls to user-defined functions.
+        Nothing is pruned if a policy uses the interactions and events of the time step in its post policy procedure
+        or if the environment graph is stored for visualization.
+        """
+        self.susceptible_states = self.infectious_states = None
+        for policy in self.policy_list:
+            if type(policy).post_policy is not Policy.post_policy:
+                return
+        if self.args.viz_dyn:
+            return
+
+        self.susceptible_states = self.model.get_susceptible_states()
+        self.infectious_states = self.model.get_infectious_states()
+
+    def set_edge_file_contacts(self) -> None:
+        """
+        Sets whether the interactions of memory-mapped edge files are added to the contacts of the agents in every time
+        step. Edge files are only seen by :class:`~episimmer.model.ContactProbabilityTable` kernels, so they are
+        added if an interaction function of the model is not a table, if a policy uses the interactions of the time step
+        in its post policy procedure or if the environment graph is stored for visualization.
+        """
+        post_policy = any(
+            type(policy).post_policy is not Policy.post_policy
+            for policy in self.policy_list)
+        self.edge_file_contacts = post_policy or bool(
+            self.args.viz_dyn) or self.model.get_infectious_states() is None
+
+    def set_absorbing_states(self) -> None:
+        """
+        Sets the states that agents can only leave through infection, as derived from the transitions of the model.
+        These are only used to end the world early, which requires that nothing but the state counts is recorded in
+        every time step and that nothing but infection from other agents can change a state. Early ending is therefore
+        disabled if there are policies, an external prevalence function, statistics or environment graphs.
+        """
+        self.absorbing_states = None
+        if self.policy_list or self.model.external_prevalence or self.args.stats or self.args.viz_dyn:
+            return
+
+        self.absorbing_states = self.model.get_absorbing_states()
+
+    def is_absorbing(self) -> bool:
+        """
+        Returns whether the world has reached a configuration that no later time step can change. This is the case
+        when every agent is in an absorbing state, and either no agent is in a state in which it can be infected or no
+        agent is in an infectious state. Infectious states are the states through which a
+        :class:`~episimmer.model.ContactProbabilityTable` can infect. They cannot be derived if an interaction function
+        of the model is user-defined or an event contribution function is set, so the world then only ends early once
+        no agent can be infected.
+
+        Returns:
+            Boolean representing whether the world is in an absorbing configuration
+        """
+        if self.absorbing_states is None:
+            return False
+
+        for state, count in self.state_counts.items():
+            if count and state not in self.absorbing_states:
+                return False
+
+        susceptible_states = self.model.get_susceptible_states()
+        if not any(self.state_counts[state] for state in susceptible_states):
+            return True
+
+        infectious_states = self.model.get_infectious_states()
+        if infectious_states is None or self.model.contribute_fn is not None:
+            return False
+        return not any(self.state_counts[state] for state in infectious_states)
+
+    def fill_state_history(self, time_steps: int) -> None:
+        """
+        Fills the state history of a world in an absorbing configuration with the current state counts up to the last
+        time step, as if the remaining time steps had been simulated.
+
+        Args:
+            time_steps: Number of time steps of the simulation
+        """
+        for state, history in self.state_history.items():
+            history.extend([self.state_counts[state]] *
+                           (time_steps + 1 - len(history)))
+
     @save_env_graph()
     @save_stats([('agents_obj', 3)], 'Agents', ['state'])
     def on_start_time_step(self,
@@ -76,7 +232,8 @@ class Simulate():
         respective files and to run policies. Policies are run in two steps here. First, the policies that are
         independent of all the interactions and events present are run with the `enact_policy` method and the policies
         that do depend on them are run with `post_policy` method. After the policy is finished running, all types of
-        events are handled by saving the probability of infection for each agent.
+        events are handled by saving the probability of infection for each agent. The interaction and event files of
+        the next time step are read in the background while the current time step runs.
 
 
         Args:
@@ -86,12 +243,20 @@ class Simulate():
             one_time_event_obj: An object of class :class:`~episimmer.read_file.ReadOneTimeEvents`
         """
 
-        for agent in self.agents_obj.agents.values():
-            agent.new_time_step()
+        self.agents_obj.new_time_step()
 
         for location in self.locations_obj.locations.values():
             location.new_time_step()
 
+        self.agents_obj.edge_files = []
+        self.agents_obj.groups = []
+
+        # Hand over the files read in the background
+        self.wait_for_prefetch()
+        if self.prefetch_error is not None:
+            error, self.prefetch_error = self.prefetch_error, None
+            raise error
+
         # Initialize filenames
         interactions_filename = events_filename = None
 
@@ -103,6 +268,10 @@ class Simulate():
                 ReadInteractions(interactions_filename, self.config_obj,
                                  self.agents_obj)
 
+        # Interactions of edge files are only seen by contact probability tables otherwise
+        if self.edge_file_contacts and self.agents_obj.edge_files:
+            self.agents_obj.add_edge_file_contacts()
+
         # Load probabilistic interactions
         for probabilistic_interaction_files_list in probabilistic_interaction_files_list_of_list:
             if probabilistic_interaction_files_list:
@@ -111,7 +280,16 @@ class Simulate():
                     len(probabilistic_interaction_files_list)]
                 ReadProbabilisticInteractions(
                     probabilistic_interactions_filename, self.config_obj,
-                    self.agents_obj)
+                    self.agents_obj, self.rng)
+
+        # Load group interactions
+        for group_interaction_files_list in self.group_interaction_files_list_of_list:
+            if group_interaction_files_list:
+                group_interactions_filename = group_interaction_files_list[
+                    Time.get_current_time_step() %
+                    len(group_interaction_files_list)]
+                ReadGroupInteractions(group_interactions_filename,
+                                      self.config_obj, self.agents_obj)
 
         # Load Events
         for event_files_list in event_files_list_of_list:
@@ -126,6 +304,11 @@ class Simulate():
             self.config_obj, self.locations_obj, self.agents_obj,
             Time.get_current_time_step())
 
+        # Read the files of the next time step in the background
+        self.prefetch_files(interaction_files_list_of_list,
+                            event_files_list_of_list,
+                            Time.get_current_time_step() + 1)
+
         # Enact policies by updating agent and location states.
         for policy_index, policy in enumerate(self.policy_list):
             policy.enact_policy(Time.get_current_time_step(),
@@ -135,7 +318,7 @@ class Simulate():
 
         # Restrict agents with can_contribute_infection and can_receive_infection
         # All interactions and events restricted by removing elements in
-        # agent.contact_list and location.events
+        # the contacts of the agents object and location.events
         self.save_valid_interactions_events()
 
         # Enact post-policy procedures after saving all types of interactions.
@@ -147,23 +330,189 @@ class Simulate():
 
         if events_filename is not None:
             # Update event info to agents from location
-            for location in self.locations_obj.locations.values():
-                if not location.lock_down_state:
-                    for event_info in location.events:
-                        self.model.update_event_infection(
-                            event_info, location, self.agents_obj)
+            self.model.update_events_infection(self.event_table,
+                                               self.agents_obj)
+
+    def prefetch_files(self, interaction_files_list_of_list: List[List[str]],
+                       event_files_list_of_list: List[List[str]],
+                       time_step: int) -> None:
+        """
+        Starts reading and parsing the interaction, group interaction and event files of a time step into the
+        :class:`~episimmer.utils.file_cache.FileCache` on a background thread. Nothing is prefetched if the cache is
+        disabled or the time step is past the end of the simulation.
+
+        Args:
+            interaction_files_list_of_list: List of path names of all the interactions files
+            event_files_list_of_list: List of path names of all the events files
+            time_step: Time step whose files are read
+        """
+        if FileCache.memory_budget == 0 or time_step >= self.config_obj.time_steps:
+            return
+
+        files = []
+        for interaction_files_list in interaction_files_list_of_list:
+            if interaction_files_list:
+                files.append(
+                    (ReadInteractions,
+                     interaction_files_list[time_step %
+                                            len(interaction_files_list)]))
+        for event_files_list in event_files_list_of_list:
+            if event_files_list:
+                files.append(
+                    (ReadEvents,
+                     event_files_list[time_step % len(event_files_list)]))
+        for group_interaction_files_list in self.group_interaction_files_list_of_list:
+            if group_interaction_files_list:
+                files.append(
+                    (ReadGroupInteractions, group_interaction_files_list[
+                        time_step % len(group_interaction_files_list)]))
+
+        if files:
+            self.prefetch_thread = threading.Thread(target=self.read_files,
+                                                    args=(files, ),
+                                                    daemon=True)
+            self.prefetch_thread.start()
+
+    def read_files(self, files: List[Tuple[type, str]]) -> None:
+        """
+        Parses files into the :class:`~episimmer.utils.file_cache.FileCache`. The first error is stored and raised by
+        the main thread when the files are read in their time step.
+
+        Args:
+            files: List of the reader class and the name of every file
+        """
+        for reader_class, filename in files:
+            try:
+                reader_class.prefetch_file(filename, self.config_obj)
+            except Exception as error:
+                if self.prefetch_error is None:
+                    self.prefetch_error = error
+
+    def wait_for_prefetch(self) -> None:
+        """
+        Waits for the files being read in the background to be parsed.
+        """
+        if self.prefetch_thread is not None:
+            self.prefetch_thread.join()
+            self.prefetch_thread = None
 
     def handle_time_step_for_all_agents(self) -> None:
         """
         Find the next state and save it for every agent, and then convert each agent's current state to the saved next
-        state.
+        state. Agents in source states whose transitions do not depend on the agent are moved in bulk with one
+        vectorized draw per source state. For scheduled models, only the due agents returned by :meth:`get_due_agents`
+        are handled. In frontier mode, agents in idle states that are not exposed to infection are not handled either.
         """
-        for agent in self.agents_obj.agents.values():
-            self.handle_time_step_as_agent(agent)
-
-        for agent in self.agents_obj.agents.values():
+        self.model.compute_contact_tables(self.agents_obj)
+        compiled_transitions = self.model.compile_transitions()
+        bulk_agents = {state: [] for state in compiled_transitions}
+
+        idle_states = self.model.get_idle_states() if self.frontier else None
+        if self.timer_wheel is not None:
+            agents = self.get_due_agents(Time.get_current_time_step())
+        elif idle_states is not None:
+            agents = self.get_frontier_agents(Time.get_current_time_step(),
+                                              idle_states)
+        else:
+            agents = list(self.agents_obj.agents.values())
+
+        for agent in agents:
+            if agent.state in bulk_agents:
+                bulk_agents[agent.state].append(agent)
+            else:
+                self.handle_time_step_as_agent(agent)
+
+        for state, state_agents in bulk_agents.items():
+            next_states = self.model.find_next_states(
+                state, compiled_transitions[state], len(state_agents))
+            for agent, next_state in zip(state_agents, next_states):
+                agent.set_next_state((next_state, None))
+
+        for agent in agents:
             self.convert_state(agent)
 
+        if self.timer_wheel is not None:
+            self.schedule_agents(agents, Time.get_current_time_step())
+
+    def get_due_agents(self, time_step: int) -> List[Agent]:
+        """
+        Returns the agents whose next state must be found in the current time step, in the order of the agents
+        dictionary. These are the agents whose countdown expires in the current time step and the agents without a
+        running countdown whose state can change: those exposed to infection in the current time step and those in
+        states that are not idle, as in :meth:`get_frontier_agents`. If the idle states cannot be derived from the
+        transitions of the model, all the agents without a running countdown are returned. All other agents remain in
+        their current state.
+
+        Args:
+            time_step: Current time step
+
+        Returns:
+            List of agents due in the current time step
+        """
+        idle_states = self.model.get_idle_states()
+        if idle_states is not None:
+            return self.get_frontier_agents(time_step, idle_states)
+
+        agents = list(self.untimed_agents.values()) + self.timer_wheel.pop(
+            time_step, [])
+        agents.sort(key=lambda agent: self.agent_positions[agent.index])
+        return agents
+
+    def get_frontier_agents(self, time_step: int,
+                            idle_states: List[str]) -> List[Agent]:
+        """
+        Returns the agents whose next state must be found in the current time step in frontier mode, in the order of
+        the agents dictionary. These are the agents exposed to infection in the current time step and the agents in
+        states that are not idle. For scheduled models, only the due agents among them are returned, and the due agents
+        in idle states that are not exposed are kept as agents without a running countdown instead.
+
+        Args:
+            time_step: Current time step
+            idle_states: States that agents can only leave through infection in the current time step
+
+        Returns:
+            List of agents in the frontier of the current time step
+        """
+        agents = self.agents_obj.agents
+        exposed_agents = self.exposed_agents or set()
+        for state in self.model.individual_state_types:
+            if state not in idle_states:
+                exposed_agents = exposed_agents.union(self.state_list[state])
+
+        if self.timer_wheel is None:
+            frontier = [agents[index] for index in exposed_agents]
+        else:
+            frontier = [
+                self.untimed_agents[index] for index in exposed_agents
+                if index in self.untimed_agents
+            ]
+            for agent in self.timer_wheel.pop(time_step, []):
+                if agent.state in idle_states and agent.index not in exposed_agents:
+                    self.untimed_agents[agent.index] = agent
+                else:
+                    frontier.append(agent)
+
+        frontier.sort(key=lambda agent: self.agent_positions[agent.index])
+        return frontier
+
+    def schedule_agents(self, agents: List[Agent], time_step: int) -> None:
+        """
+        Adds agents with a running countdown to the bucket of the timer wheel for the time step in which the countdown
+        expires, and keeps track of the agents without one. Agents that were not handled in the current time step keep
+        their place. The bucket is given by the schedule expiry of the agent.
+
+        Args:
+            agents: Agents whose next state was found in the current time step
+            time_step: Current time step (-1 before the first time step)
+        """
+        for agent in agents:
+            if agent.schedule_time_left is None:
+                self.untimed_agents[agent.index] = agent
+            else:
+                self.untimed_agents.pop(agent.index, None)
+                expiry = max(math.ceil(agent.schedule_expiry), time_step + 1)
+                self.timer_wheel.setdefault(expiry, []).append(agent)
+
     def handle_time_step_as_agent(self, agent: Agent) -> None:
         """
        Finds the next state and save it for the agent
@@ -179,72 +528,295 @@ class Simulate():
         Stores the state of the simulation at the end of the time step.
         """
         self.store_state()
+        self.time_step = Time.get_current_time_step() + 1
+
+    def pause(self) -> None:
+        """
+        Saves the state of the global random modules, which user-defined functions may draw from, so that another
+        simulation can be run before the simulation is resumed with :meth:`resume`.
+        """
+        self.global_rng_state = (random.getstate(), np.random.get_state())
 
-    def valid_interaction(self, agent: Agent, c_dict: Dict[str, str]) -> bool:
+    def resume(self) -> None:
         """
-        Checks whether the contact of an agent will interact with the agent. If the current agent is under the
-        protection of a vaccine, the contact is said to not occur. Other factors include variables set by lockdown
-        (restriction) policies that change the probability of the current agent locking himself down. This is done
-        with the `can_contribute_infection` and `can_receive_infection` variables.
+        Makes the simulation the current simulation again before its next time step is run, after another simulation
+        sharing the model was run in between. The random number generator of the simulation is set for the model and
+        the policies, the state of the global random modules saved by :meth:`pause` is restored, and the current world
+        and time step are set to those of the simulation.
+        """
+        self.model.set_rng(self.rng)
+        for policy in self.policy_list:
+            policy.set_rng(self.rng)
+        if self.global_rng_state is not None:
+            random.setstate(self.global_rng_state[0])
+            np.random.set_state(self.global_rng_state[1])
+        Time.resume(self.world, self.time_step)
+
+    @staticmethod
+    def get_shared_objects(
+            config_obj: ReadConfiguration, model: BaseModel,
+            policy_list: List[Policy]) -> Dict[Tuple[str, int], object]:
+        """
+        Returns the objects that are not part of the mutable state of a simulation and are referenced by its snapshots
+        instead: the configuration, the model and the policies.
 
         Args:
-            agent: The current agent
-            c_dict: Contact dictionary of the agent
+            config_obj: A dictionary containing information from the config file of the example.
+            model: Disease model specified by the user
+            policy_list: List of all the policies of the simulation
 
         Returns:
-            Boolean representing whether the interaction will take place or not.
+            Dictionary mapping references to the shared objects
         """
-        if agent.under_protection:
-            return False
+        shared = {('config', 0): config_obj, ('model', 0): model}
+        for policy_index, policy in enumerate(policy_list):
+            shared[('policy', policy_index)] = policy
+        return shared
 
-        r = random.random()
-        contact_index = c_dict['Interacting Agent Index']
-        contact_agent = self.agents_obj.agents[contact_index]
-        if r < contact_agent.can_contribute_infection and r < agent.can_receive_infection:
-            return True
-        return False
+    def snapshot(self) -> bytes:
+        """
+        Returns a serialized snapshot of the mutable state of the simulation between two time steps. It holds the
+        agents with their states, schedule times left and policy histories, the locations, the state lists and state
+        history, the timer wheel, the random number generator, the current world and time step, and the attributes of
+        the policies, such as the queues of the testing machines. The configuration and the model are not part of the
+        snapshot, and neither are the attributes of the policies that cannot be serialized, such as user-defined
+        functions. These are taken from the objects passed to :meth:`restore`.
+
+        Returns:
+            Serialized snapshot of the simulation
+        """
+        self.wait_for_prefetch()
+        self.pause()
+        shared = Simulate.get_shared_objects(self.config_obj, self.model,
+                                             self.policy_list)
+        state = {
+            key: value
+            for key, value in self.__dict__.items() if key not in
+            ['config_obj', 'model', 'policy_list', 'prefetch_thread']
+        }
+        policy_states = [{
+            key: value
+            for key, value in policy.__dict__.items()
+            if is_serializable(value, shared)
+        } for policy in self.policy_list]
+        return dumps(
+            {
+                'simulate':
+                state,
+                'policy_types':
+                [type(policy).__name__ for policy in self.policy_list],
+                'policies':
+                policy_states
+            }, shared)
+
+    @staticmethod
+    def restore(snapshot: bytes, config_obj: ReadConfiguration,
+                model: BaseModel, policy_list: List[Policy]) -> 'Simulate':
+        """
+        Returns the simulation of a snapshot taken with :meth:`snapshot`. The policies must be built the same way as
+        the policies of the simulation the snapshot was taken from, and their serialized attributes are restored. To
+        continue under a different list of policies, :meth:`fork` the restored simulation.
+
+        Args:
+            snapshot: Serialized snapshot of a simulation
+            config_obj: A dictionary containing information from the config file of the example.
+            model: Disease model specified by the user
+            policy_list: List of all the policies of the simulation
 
-    def store_event_lists(
-            self, event_info: Dict[str, Union[float, str, List[str]]]) -> None:
+        Returns:
+            Simulation restored from the snapshot
+        """
+        shared = Simulate.get_shared_objects(config_obj, model, policy_list)
+        data = loads(snapshot, shared)
+        if data['policy_types'] != [
+                type(policy).__name__ for policy in policy_list
+        ]:
+            raise ValueError(
+                'The policies passed do not match the policies of the snapshot'
+            )
+
+        state = data['simulate']
+        sim_obj = Simulate(config_obj, model, policy_list, state['agents_obj'],
+                           state['locations_obj'], state['rng'])
+        sim_obj.__dict__.update(state)
+        for policy, policy_state in zip(policy_list, data['policies']):
+            policy.__dict__.update(policy_state)
+        return sim_obj
+
+    def fork(self,
+             policy_list: Union[List[Policy], None] = None) -> 'Simulate':
         """
-        Checks whether agents part of an event can contribute infection to the event or receive infection from
-        the event or both. This function saves the agents that can do either in the event_info dictionary,
+        Returns an independent copy of the simulation that continues from its current time step. The copy shares the
+        configuration and the model with the simulation, and its random number generator starts from the current state
+        of the generator of the simulation. If a list of policies is passed, the copy continues under these policies,
+        which are reset on the copy. Otherwise, the policies of the simulation are copied along with their state.
+        :meth:`resume` must be called before the time steps of the copy are run.
 
         Args:
-            event_info: A dictionary containing event information at a location that contains all the agents part of
-            the event.
+            policy_list: List of policies the copy continues under
+
+        Returns:
+            Copy of the simulation
+        """
+        self.wait_for_prefetch()
+        self.pause()
+        memo = {
+            id(self.config_obj): self.config_obj,
+            id(self.model): self.model
+        }
+        for edges in self.agents_obj.edge_files:
+            memo[id(edges)] = edges
+        if policy_list is not None:
+            memo[id(self.policy_list)] = policy_list
+        sim_obj = copy.deepcopy(self, memo)
+
+        if policy_list is not None:
+            for policy_index, policy in enumerate(policy_list):
+                policy.set_rng(sim_obj.rng)
+                policy.reset(sim_obj.agents_obj.agents.values(),
+                             sim_obj.locations_obj.locations.values(),
+                             sim_obj.model, policy_index)
+            sim_obj.set_transmission_states()
+            sim_obj.set_edge_file_contacts()
+            sim_obj.set_absorbing_states()
+        return sim_obj
+
+    def save_valid_interactions(self) -> None:
+        """
+        Removes the contacts of the agents that will not interact in the current time step. If the current agent is
+        under the protection of a vaccine, none of its contacts interact. Otherwise, a contact interacts if a uniform
+        draw is below both the can_contribute_infection of the contact agent and the can_receive_infection of the agent,
+        which are set by lockdown (restriction) policies. Contacts of agents that cannot be infected in their state, or
+        with contact agents that cannot infect in their state, are removed without a draw. The contacts of all the
+        agents are checked at once with a single mask over the arrays of the
+        :class:`~episimmer.agent.StepContacts` of the time step, which are then filtered with the mask.
+        """
+        contacts = self.agents_obj.contacts
+        block = contacts.get_block()
+        if not len(block):
+            return
+
+        store = self.agents_obj.store
+        can_contribute, _ = self.agents_obj.get_infection_restrictions()
+        receivers, senders = block.receivers, block.senders
+
+        drawn = ~store.under_protection[receivers]
+        if self.susceptible_states is not None:
+            drawn &= self.agents_obj.get_state_mask(
+                self.susceptible_states)[receivers]
+        if self.infectious_states is not None:
+            drawn &= self.agents_obj.get_state_mask(
+                self.infectious_states)[senders]
+        r = self.rng.random(np.count_nonzero(drawn))
+        valid = np.zeros(len(block), dtype=bool)
+        valid[drawn] = (r < can_contribute[senders[drawn]]) & (
+            r < store.can_receive_infection[receivers[drawn]])
+        if self.exposed_agents is not None:
+            self.exposed_agents.update(contacts.indices[np.unique(
+                receivers[valid])].tolist())
+
+        contacts.select(valid)
+
+    def save_edge_file_receivers(self) -> None:
+        """
+        Saves the agents that can receive infection through the interactions of the memory-mapped edge files of the
+        agents object as exposed agents. Whether these interactions take place is only drawn when the infection
+        probabilities are computed, so every agent that can be infected and has an edge from an agent that can infect is
+        saved. The edge files are processed in slices of
+        :attr:`~episimmer.model.ContactProbabilityTable.edge_chunk_size` edges.
+        """
+        order, _ = self.agents_obj.get_agent_ids()
+        can_contribute, can_receive = self.agents_obj.get_infection_restrictions(
+        )
+        receive = can_receive > 0
+        contribute = can_contribute > 0
+        if self.susceptible_states is not None:
+            receive &= self.agents_obj.get_state_mask(self.susceptible_states)
+        if self.infectious_states is not None:
+            contribute &= self.agents_obj.get_state_mask(
+                self.infectious_states)
+
+        exposed = np.zeros(len(order), dtype=bool)
+        chunk_size = ContactProbabilityTable.edge_chunk_size
+        for edges in self.agents_obj.edge_files:
+            for start in range(0, len(edges), chunk_size):
+                chunk = edges[start:start + chunk_size]
+                receivers = chunk['Agent Index']
+                valid = receive[receivers] & contribute[
+                    chunk['Interacting Agent Index']]
+                exposed[receivers[valid]] = True
+        self.exposed_agents.update(order[i]
+                                   for i in np.flatnonzero(exposed).tolist())
+
+    def store_events(self) -> None:
         """
-        r = random.random()
-        if r < event_info['_prob_of_occur']:
-            for agent_index in event_info['Agents']:
-                r = random.random()
-                agent = self.agents_obj.agents[agent_index]
+        Stores the events of all the locations in the current time step in an
+        :class:`~episimmer.model.EventTable` and checks at once whether the agents part of the events can contribute
+        infection to the events or receive infection from the events or both. The agents that can do either are also
+        saved in the event_info dictionaries.
+        """
+        self.event_table = EventTable(self.locations_obj.locations.values(),
+                                      self.agents_obj)
+        self.event_table.draw(self.rng, self.susceptible_states)
 
-                if r < agent.can_contribute_infection:
-                    event_info['_can_contrib'].append(agent_index)
+    def store_group_lists(
+            self, group_info: Dict[str, Union[str, List[str]]]) -> None:
+        """
+        Checks whether agents part of a group interaction can contribute infection to the group or receive infection
+        from the group or both. The agents that can do either are saved in the group_info dictionary, and the group is
+        added to the group list of the agents that can receive infection. Agents that can neither infect nor be
+        infected in their state are skipped without a draw.
 
-                if not agent.under_protection and r < agent.can_receive_infection:
-                    event_info['_can_receive'].append(agent_index)
+        Args:
+            group_info: A dictionary containing group interaction information that contains all the agents part of
+            the group.
+        """
+        group_info['_can_contrib'] = []
+        group_info['_can_receive'] = []
+        for agent_index in group_info['Agents']:
+            agent = self.agents_obj.agents[agent_index]
+            can_infect = self.infectious_states is None or agent.state in self.infectious_states
+            can_be_infected = self.susceptible_states is None or agent.state in self.susceptible_states
+            if not can_infect and not can_be_infected:
+                continue
+
+            r = self.rng.random()
+            if can_infect and r < agent.can_contribute_infection:
+                group_info['_can_contrib'].append(agent_index)
+
+            if can_be_infected and not agent.under_protection and r < agent.can_receive_infection:
+                group_info['_can_receive'].append(agent_index)
+                agent.add_group(group_info)
+                if self.exposed_agents is not None:
+                    self.exposed_agents.add(agent_index)
 
     def save_valid_interactions_events(self) -> None:
         """
-        Saves all the valid interactions and events in the current time step of the simulation.
+        Saves all the valid interactions, group interactions and events in the current time step of the simulation.
+        In frontier mode and for scheduled models with a timer wheel, the agents that can receive infection through any
+        of them, or through the interactions of the edge files, are saved as exposed agents.
         """
-        for agent in self.agents_obj.agents.values():
-            agent.contact_list[:] = [
-                c_dict for c_dict in agent.contact_list
-                if self.valid_interaction(agent, c_dict)
-            ]
+        track_exposure = self.frontier or self.timer_wheel is not None
+        self.exposed_agents = set() if track_exposure else None
 
-        for location in self.locations_obj.locations.values():
-            for event_info in location.events:
-                self.store_event_lists(event_info)
+        self.save_valid_interactions()
+        if self.exposed_agents is not None and self.agents_obj.edge_files:
+            self.save_edge_file_receivers()
+
+        for group_info in self.agents_obj.groups:
+            self.store_group_lists(group_info)
+
+        self.store_events()
+        if self.exposed_agents is not None:
+            for event_info in self.event_table.events:
+                self.exposed_agents.update(event_info['_can_receive'])
 
     @store_animated_dynamic_graph()
     def end_simulation(self) -> Dict[str, List[int]]:
         """
         Returns the state history at the end of the simulation.
         """
+        self.wait_for_prefetch()
         return self.state_history
 
     def store_state(self) -> None:
@@ -252,15 +824,139 @@ class Simulate():
         Stores the number of agents in each state in the state history at each time step.
         """
         for state in self.state_history.keys():
-            self.state_history[state].append(len(self.state_list[state]))
+            self.state_history[state].append(self.state_counts[state])
 
     def convert_state(self, agent: Agent) -> None:
         """
-        Updates the state list when an agent transitions from one state to another.
+        Updates the state sets and state counts when an agent transitions from one state to another. Both updates take
+        constant time.
 
         Args:
             agent: Agent whose next state is to be set
         """
-        self.state_list[agent.state].remove(agent.index)
+        old_state = agent.state
         agent.update_state()
-        self.state_list[agent.state].append(agent.index)
+        if agent.state != old_state:
+            self.state_list[old_state].remove(agent.index)
+            self.state_list[agent.state].add(agent.index)
+            self.state_counts[old_state] -= 1
+            self.state_counts[agent.state] += 1
+
+
+class BatchSimulate():
+    """
+    Class for simulating a batch of worlds together in one vectorized pass. The states and schedule times left of the
+    agents are held in arrays with a row for every world, and the interactions and transitions of each time step are
+    evaluated for all the worlds at once. Only environments whose transitions can be evaluated without the agent
+    objects are supported, as checked by :meth:`~episimmer.world.World.supports_batch`: the interaction functions of
+    the model must be :class:`~episimmer.model.ContactProbabilityTable` objects, and there must be no policies,
+    events, group or probabilistic interactions, or external prevalence.
+
+    Args:
+        config_obj: A dictionary containing information from the config file of the example.
+        model: Disease model specified by the user
+        agents_obj: An object of class :class:`~episimmer.read_file.ReadAgents`
+        rngs: Random number generator of every world in the batch. The random draws of each world are taken from its
+              own generator.
+    """
+    def __init__(self, config_obj: ReadConfiguration, model: BaseModel,
+                 agents_obj: ReadAgents, rngs: List[np.random.Generator]):
+        self.config_obj: ReadConfiguration = config_obj
+        self.model: BaseModel = model
+        self.agents_obj: ReadAgents = agents_obj
+        self.num_worlds: int = len(rngs)
+        self.rngs: List[np.random.Generator] = rngs
+        self.tables: List[ContactProbabilityTable] = []
+        self.states: Union[np.ndarray, None] = None
+        self.schedule_time_left: Union[np.ndarray, None] = None
+        self.contacts: Dict[Tuple[str, ...], Dict[ContactProbabilityTable,
+                                                  List[csr_matrix]]] = {}
+        self.current_contacts: Dict[ContactProbabilityTable,
+                                    List[csr_matrix]] = {}
+        self.state_history: List[np.ndarray] = []
+
+    def on_start_simulation(self) -> None:
+        """
+        Initializes the states of the agents in all the worlds and stores them in the state history.
+        """
+        self.model.set_batch_rngs(self.rngs)
+        for fns in self.model.get_infection_fns().values():
+            for table in fns:
+                if table not in self.tables:
+                    self.tables.append(table)
+
+        order, _ = self.agents_obj.get_agent_ids()
+        self.states, self.schedule_time_left = self.model.initialize_batch_states(
+            self.num_worlds, len(order))
+        self.store_state()
+
+    def on_start_time_step(
+            self, interaction_files_list_of_list: List[List[str]]) -> None:
+        """
+        Counts down the schedules of the agents in all the worlds and loads the contacts of the interaction files of
+        the current time step. The contacts of a set of interaction files are the same in all the worlds, so they are
+        only read once and kept as sparse contact matrices for every table of the model.
+
+        Args:
+            interaction_files_list_of_list: List of path names of all the interactions files
+        """
+        self.schedule_time_left -= 1
+        self.schedule_time_left[self.schedule_time_left <= 0] = np.nan
+
+        filenames = tuple(
+            files_list[Time.get_current_time_step() % len(files_list)]
+            for files_list in interaction_files_list_of_list if files_list)
+        if filenames not in self.contacts:
+            self.agents_obj.new_time_step()
+            self.agents_obj.edge_files = []
+            for filename in filenames:
+                ReadInteractions(filename, self.config_obj, self.agents_obj)
+            self.contacts[filenames] = {
+                table: table.get_batch_contacts(self.agents_obj)
+                for table in self.tables
+            }
+        self.current_contacts = self.contacts[filenames]
+
+    def handle_time_step_for_all_worlds(self) -> None:
+        """
+        Computes the probabilities of infection of the agents in all the worlds for every table of the model and finds
+        their next states.
+        """
+        infection_probs = {
+            table:
+            table.compute_batch(self.states, self.model.individual_state_types,
+                                self.current_contacts[table])
+            for table in self.tables
+        }
+        self.model.find_next_batch_states(self.states, self.schedule_time_left,
+                                          infection_probs)
+
+    def end_time_step(self) -> None:
+        """
+        Stores the state of the worlds at the end of the time step.
+        """
+        self.store_state()
+
+    def store_state(self) -> None:
+        """
+        Stores the number of agents in each state of every world in the state history.
+        """
+        self.state_history.append(
+            np.stack([
+                np.count_nonzero(self.states == code, axis=1)
+                for code in range(len(self.model.individual_state_types))
+            ]))
+
+    def end_simulation(self) -> List[Dict[str, List[int]]]:
+        """
+        Returns the state history of every world at the end of the simulation.
+
+        Returns:
+            List of state history dictionaries, one for every world in the batch
+        """
+        self.model.set_batch_rngs(None)
+        history = np.stack(self.state_history, axis=-1).tolist()
+        return [{
+            state: history[code][world]
+            for code, state in enumerate(self.model.individual_state_types)
+        } for world in range(self.num_worlds)]
@@ -1,6 +1,12 @@
-from .arg_parser import parse_args
+from .arg_parser import (get_arg_parser, get_default_args, parse_args,
+                         parse_compile_args)
+from .file_cache import FileCache
 from .math import deep_copy_average, deep_copy_stddev
-from .module_handling import get_model, get_policy, module_from_file
+from .module_handling import (get_model, get_policy, get_scenarios,
+                              module_from_file)
+from .quantile import StreamingQuantiles
+from .snapshot import (SnapshotPickler, SnapshotUnpickler, dumps,
+                       is_serializable, loads)
 from .statistics import (Stats, expand_levels, expand_levels_recursion,
                          get_pretty_print_str, process_dict,
                          process_dict_recursion, save_pickle, save_stats,
@@ -11,14 +17,21 @@ from .visualize import (animate_graph, buildgraph, draw_graph,
                         save_env_graph, set_ax_params,
                         store_animated_dynamic_graph, store_animated_time_plot)
 
-ap_funcs = ['parse_args']
+ap_funcs = [
+    'parse_args', 'get_default_args', 'get_arg_parser', 'parse_compile_args'
+]
+cache_classes = ['FileCache']
 math_funcs = ['deep_copy_average', 'deep_copy_stddev']
-module_funcs = ['module_from_file', 'get_policy', 'get_model']
+module_funcs = ['module_from_file', 'get_policy', 'get_model', 'get_scenarios']
+quantile_classes = ['StreamingQuantiles']
+snapshot_funcs = ['dumps', 'loads', 'is_serializable']
+snapshot_classes = ['SnapshotPickler', 'SnapshotUnpickler']
 stats_funcs = ['expand_levels_recursion', 'expand_levels', 'process_dict_recursion','process_dict',\
                 'get_pretty_print_str', 'save_pickle', 'save_to_text_file', 'save_stats', 'write_stats']
 stats_classes = ['Stats']
 time_classes = ['Time']
 viz_funcs = ['plot_results', 'buildgraph', 'store_animated_time_plot', 'get_interaction_graph_from_object',\
                 'save_env_graph', 'set_ax_params', 'draw_graph', 'animate_graph', 'store_animated_dynamic_graph']
-__all__ = ap_funcs + math_funcs + module_funcs + stats_funcs + stats_classes + time_classes + viz_funcs
-classes = stats_classes + time_classes
+__all__ = ap_funcs + cache_classes + math_funcs + module_funcs + quantile_classes + snapshot_funcs + \
+    snapshot_classes + stats_funcs + stats_classes + time_classes + viz_funcs
+classes = cache_classes + quantile_classes + snapshot_classes + stats_classes + time_classes
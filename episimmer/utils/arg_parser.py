@@ -1,4 +1,5 @@
 import argparse
+import sys
 
 
 def parse_args() -> argparse.Namespace:
@@ -8,6 +9,32 @@ def parse_args() -> argparse.Namespace:
     Returns:
         Parsed arguments
     """
+    args = get_arg_parser().parse_args()
+    return args
+
+
+def get_default_args(example_path: str) -> argparse.Namespace:
+    """
+    This function returns the default command-line arguments for an example, as used when the simulation is run from
+    code rather than from the command line.
+
+    Args:
+        example_path: Path to the data folder
+
+    Returns:
+        Default arguments
+    """
+    args = get_arg_parser().parse_args([example_path])
+    return args
+
+
+def get_arg_parser() -> argparse.ArgumentParser:
+    """
+    This function returns the parser of the command-line arguments
+
+    Returns:
+        Argument parser
+    """
     arg_parser = argparse.ArgumentParser()
 
     # input argument options
@@ -53,5 +80,94 @@ def parse_args() -> argparse.Namespace:
         help=
         'Creates a gif of the simulation environment progressing through the days. Default = False'
     )
-    args = arg_parser.parse_args()
+    arg_parser.add_argument(
+        '-w',
+        '--workers',
+        dest='workers',
+        type=int,
+        default=1,
+        help=
+        'Number of processes used to simulate the worlds in parallel. Default = 1'
+    )
+    arg_parser.add_argument(
+        '-col',
+        '--columnar',
+        dest='columnar',
+        action='store_true',
+        default=False,
+        help=
+        'Store the attributes of the agents in NumPy arrays indexed by integer agent ids. Default = False'
+    )
+    arg_parser.add_argument(
+        '-cm',
+        '--cachememory',
+        dest='cache_memory',
+        type=float,
+        default=256,
+        help=
+        'Memory budget in MB for caching parsed interaction and event files. 0 disables the cache. Default = 256'
+    )
+    arg_parser.add_argument(
+        '-fr',
+        '--frontier',
+        dest='frontier',
+        action='store_true',
+        default=False,
+        help=
+        'Only find the next state of the agents exposed to infection and the agents in states they can leave '
+        'without infection. Default = False')
+    arg_parser.add_argument(
+        '-b',
+        '--batch',
+        dest='batch',
+        type=int,
+        default=0,
+        help=
+        'Number of worlds simulated together in one vectorized pass if the model and environment allow it. 0 '
+        'disables batches. Default = 0')
+    arg_parser.add_argument(
+        '-sc',
+        '--scenarios',
+        dest='scenarios',
+        action='store_true',
+        default=False,
+        help=
+        'Simulate the policy scenarios returned by generate_scenarios in Generate_policy.py, sharing the time steps '
+        'before each scenario starts. Default = False')
+    arg_parser.add_argument(
+        '-q',
+        '--quantiles',
+        dest='quantiles',
+        type=float,
+        nargs='+',
+        default=[],
+        help=
+        'Percentiles of the epidemic trajectory estimated across worlds in bounded memory, plotted as a band and saved '
+        'with the average. Default = []')
+    return arg_parser
+
+
+def parse_compile_args() -> argparse.Namespace:
+    """
+    This function parses the command-line arguments of the compile command
+
+    Returns:
+        Parsed arguments
+    """
+    arg_parser = argparse.ArgumentParser(prog='episimmer compile')
+
+    # input argument options
+    arg_parser.add_argument(dest='example_path',
+                            type=str,
+                            help='Pass the path to the data folder')
+    arg_parser.add_argument(
+        '-e',
+        '--edges',
+        dest='edges',
+        action='store_true',
+        default=False,
+        help=
+        'Also write a memory-mappable binary edge file (npy) next to every interactions file. Default = False'
+    )
+    args = arg_parser.parse_args(sys.argv[2:])
     return args
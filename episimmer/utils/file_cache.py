@@ -0,0 +1,144 @@
+import os
+import os.path as osp
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Tuple, Union
+
+
+class FileCache():
+    """
+    Class that caches the parsed contents of interaction and event files in Episimmer. Entries are keyed by the
+    type of file and its path, and are invalidated when the modification time of the file changes. The total size
+    of the entries is bounded by a memory budget, and the least recently used entries are evicted first. The cache can
+    be used from several threads.
+    """
+    entries: 'OrderedDict[Tuple[str, str], Tuple[int, object, int]]' = OrderedDict(
+    )
+    memory_budget: int = 256 * 2**20
+    memory_used: int = 0
+    lock: threading.RLock = threading.RLock()
+
+    @staticmethod
+    def set_memory_budget(budget_mb: float) -> None:
+        """
+        Sets the memory budget of the cache and evicts entries until the cache fits in it. A budget of 0 disables the
+        cache.
+
+        Args:
+            budget_mb: Memory budget in megabytes
+        """
+        with FileCache.lock:
+            FileCache.memory_budget = int(budget_mb * 2**20)
+            FileCache.evict()
+
+    @staticmethod
+    def get(kind: str, filename: str) -> Union[object, None]:
+        """
+        Returns the cached contents of a file if the file has not been modified since it was cached.
+
+        Args:
+            kind: Type of the file
+            filename: Path of the file
+
+        Returns:
+            The cached contents of the file, or None if there is no valid entry
+        """
+        key = (kind, osp.abspath(filename))
+        with FileCache.lock:
+            entry = FileCache.entries.get(key)
+            if entry is None:
+                return None
+
+            mtime, contents, size = entry
+            if mtime != os.stat(filename).st_mtime_ns:
+                del FileCache.entries[key]
+                FileCache.memory_used -= size
+                return None
+
+            FileCache.entries.move_to_end(key)
+            return contents
+
+    @staticmethod
+    def put(kind: str, filename: str, mtime: int, contents: object) -> None:
+        """
+        Caches the parsed contents of a file and evicts the least recently used entries if the memory budget is
+        exceeded. Contents larger than the memory budget are not cached.
+
+        Args:
+            kind: Type of the file
+            filename: Path of the file
+            mtime: Modification time of the file (in nanoseconds) when it was parsed
+            contents: Parsed contents of the file
+        """
+        size = FileCache.get_size(contents)
+        if size > FileCache.memory_budget:
+            return
+
+        key = (kind, osp.abspath(filename))
+        with FileCache.lock:
+            if key in FileCache.entries:
+                FileCache.memory_used -= FileCache.entries.pop(key)[2]
+            FileCache.entries[key] = (mtime, contents, size)
+            FileCache.memory_used += size
+            FileCache.evict()
+
+    @staticmethod
+    def load(kind: str, filename: str, parse: Callable[[], object]) -> object:
+        """
+        Returns the cached contents of a file, parsing and caching the file first if there is no valid entry.
+
+        Args:
+            kind: Type of the file
+            filename: Path of the file
+            parse: Function that parses the file and returns its contents
+
+        Returns:
+            The parsed contents of the file
+        """
+        contents = FileCache.get(kind, filename)
+        if contents is None:
+            mtime = os.stat(filename).st_mtime_ns
+            contents = parse()
+            FileCache.put(kind, filename, mtime, contents)
+        return contents
+
+    @staticmethod
+    def evict() -> None:
+        """
+        Evicts the least recently used entries until the cache fits in the memory budget.
+        """
+        with FileCache.lock:
+            while FileCache.entries and FileCache.memory_used > FileCache.memory_budget:
+                _, (_, _, size) = FileCache.entries.popitem(last=False)
+                FileCache.memory_used -= size
+
+    @staticmethod
+    def clear() -> None:
+        """
+        Removes all the entries of the cache.
+        """
+        with FileCache.lock:
+            FileCache.entries = OrderedDict()
+            FileCache.memory_used = 0
+
+    @staticmethod
+    def get_size(obj: object) -> int:
+        """
+        Returns an estimate of the memory used by parsed file contents made of lists, tuples, dictionaries and
+        strings.
+
+        Args:
+            obj: Parsed file contents
+
+        Returns:
+            Estimated size in bytes
+        """
+        size = sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            for value in obj.values():
+                size += FileCache.get_size(value)
+        elif isinstance(obj, (list, tuple)):
+            for value in obj:
+                size += FileCache.get_size(value)
+        return size
@@ -1,7 +1,7 @@
 import importlib.util
 import os.path as osp
 from types import ModuleType
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
 if TYPE_CHECKING:
     from episimmer.model import BaseModel
@@ -56,3 +56,20 @@ def get_policy(example_path: str) -> List['Policy']:
         'Generate_policy', osp.join(example_path, 'Generate_policy.py'))
     policy_list = generate_policy.generate_policy()
     return policy_list
+
+
+def get_scenarios(example_path: str) -> Dict[str, Tuple[int, List['Policy']]]:
+    """
+    Returns the policy scenarios created by the generate_scenarios function of the Generate_policy.py file. Each
+    scenario is named and maps to the time step at which it starts and the policy list it runs from then on.
+
+    Args:
+        example_path: Path to directory containing simulation files
+
+    Returns:
+       Dictionary mapping the name of each scenario to its starting time step and policy list
+    """
+    generate_policy = module_from_file(
+        'Generate_policy', osp.join(example_path, 'Generate_policy.py'))
+    scenarios = generate_policy.generate_scenarios()
+    return scenarios
@@ -0,0 +1,101 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+class StreamingQuantiles():
+    """
+    Class that estimates quantiles of a stream of arrays element-wise in bounded memory with the P² algorithm of
+    Jain and Chlamtac. Each quantile of each element is tracked with five markers whose heights are adjusted with
+    piecewise-parabolic interpolation as observations arrive, so the memory used does not grow with the number of
+    observations. Up to five observations, the exact quantiles of the stored observations are returned.
+
+    Args:
+        quantiles: Quantiles to be estimated, as fractions between 0 and 1
+        shape: Shape of the observed arrays
+    """
+    def __init__(self, quantiles: List[float], shape: Tuple[int, ...]):
+        for p in quantiles:
+            if not 0 < p < 1:
+                raise ValueError(
+                    'Quantile {0} is not between 0 and 1'.format(p))
+        self.quantiles: List[float] = list(quantiles)
+        self.count: int = 0
+        p = np.array(self.quantiles).reshape((-1, 1) + (1, ) * len(shape))
+        self.heights: np.ndarray = np.zeros((len(self.quantiles), 5) + shape)
+        self.positions: np.ndarray = np.broadcast_to(
+            np.arange(5.0).reshape((1, 5) + (1, ) * len(shape)),
+            self.heights.shape).copy()
+        self.desired_positions: np.ndarray = np.concatenate(
+            [np.zeros_like(p), 2 * p, 4 * p, 2 + 2 * p,
+             np.full_like(p, 4)],
+            axis=1)
+        self.increments: np.ndarray = np.concatenate(
+            [np.zeros_like(p), p / 2, p, (1 + p) / 2,
+             np.ones_like(p)], axis=1)
+
+    def add(self, x: np.ndarray) -> None:
+        """
+        Updates the markers of every quantile with an observed array.
+
+        Args:
+            x: Observed array
+        """
+        x = np.asarray(x, dtype=float)
+        if self.count < 5:
+            self.heights[:, self.count] = x
+            self.count += 1
+            if self.count == 5:
+                self.heights.sort(axis=1)
+            return
+        self.count += 1
+
+        q = self.heights
+        n = self.positions
+
+        # Cell of the observation between the markers, extending the extreme markers if needed
+        k = (x >= q[:, 1]).astype(int) + (x >= q[:, 2]) + (x >= q[:, 3])
+        np.minimum(q[:, 0], x, out=q[:, 0])
+        np.maximum(q[:, 4], x, out=q[:, 4])
+        for i in range(1, 5):
+            n[:, i] += i > k
+        self.desired_positions += self.increments
+
+        # Move the middle markers that are off their desired positions by one position
+        for i in range(1, 4):
+            d = self.desired_positions[:, i] - n[:, i]
+            move = ((d >= 1) & (n[:, i + 1] - n[:, i] > 1)) | (
+                (d <= -1) & (n[:, i - 1] - n[:, i] < -1))
+            if not move.any():
+                continue
+            d = np.where(move, np.sign(d), 0)
+            parabolic = q[:, i] + d / (n[:, i + 1] - n[:, i - 1]) * (
+                (n[:, i] - n[:, i - 1] + d) * (q[:, i + 1] - q[:, i]) /
+                (n[:, i + 1] - n[:, i]) + (n[:, i + 1] - n[:, i] - d) *
+                (q[:, i] - q[:, i - 1]) / (n[:, i] - n[:, i - 1]))
+            neighbour = np.where(d > 0, i + 1, i - 1)
+            q_neighbour = np.take_along_axis(q, neighbour[:, None], 1)[:, 0]
+            n_neighbour = np.take_along_axis(n, neighbour[:, None], 1)[:, 0]
+            linear = q[:, i] + d * (q_neighbour - q[:, i]) / (n_neighbour -
+                                                              n[:, i])
+            height = np.where(
+                (q[:, i - 1] < parabolic) & (parabolic < q[:, i + 1]),
+                parabolic, linear)
+            q[:, i] = np.where(move, height, q[:, i])
+            n[:, i] += d
+
+    def get_quantiles(self) -> np.ndarray:
+        """
+        Returns the current estimates of the quantiles.
+
+        Returns:
+            Array with the estimate of every quantile, stacked along the first axis in the order of the quantiles
+        """
+        if self.count == 0:
+            return np.full((len(self.quantiles), ) + self.heights.shape[2:],
+                           np.nan)
+        if self.count <= 5:
+            return np.quantile(self.heights[0, :self.count],
+                               self.quantiles,
+                               axis=0)
+        return self.heights[:, 2].copy()
@@ -0,0 +1,116 @@
+import io
+import pickle
+from typing import Dict, Hashable, Union
+
+import numpy as np
+
+
+class SnapshotPickler(pickle.Pickler):
+    """
+    Pickler for snapshots of a simulation. Objects that are not part of the mutable state of the simulation, such as
+    the model and the configuration, are written as references to be resolved by :class:`SnapshotUnpickler`, and
+    memory-mapped arrays are written as the paths of their files.
+
+    Args:
+        file: Binary file the snapshot is written to
+        shared: Dictionary mapping the references to the objects written as references
+    """
+    def __init__(self, file: io.BytesIO, shared: Dict[Hashable, object]):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.shared_ids: Dict[int, Hashable] = {
+            id(obj): key
+            for key, obj in shared.items()
+        }
+
+    def persistent_id(self, obj: object) -> Union[Hashable, None]:
+        """
+        Returns the reference of an object written as a reference, or None if the object is pickled.
+
+        Args:
+            obj: Object being pickled
+
+        Returns:
+            Reference of the object
+        """
+        key = self.shared_ids.get(id(obj))
+        if key is not None:
+            return key
+        if isinstance(obj, np.memmap) and obj.filename is not None:
+            return ('memmap', obj.filename)
+        return None
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """
+    Unpickler for snapshots written by :class:`SnapshotPickler`.
+
+    Args:
+        file: Binary file the snapshot is read from
+        shared: Dictionary mapping the references to the objects they are resolved to
+    """
+    def __init__(self, file: io.BytesIO, shared: Dict[Hashable, object]):
+        super().__init__(file)
+        self.shared: Dict[Hashable, object] = shared
+
+    def persistent_load(self, key: Hashable) -> object:
+        """
+        Returns the object of a reference.
+
+        Args:
+            key: Reference written by :class:`SnapshotPickler`
+
+        Returns:
+            The object of the reference
+        """
+        if isinstance(key, tuple) and key[0] == 'memmap':
+            return np.load(key[1], mmap_mode='r')
+        return self.shared[key]
+
+
+def dumps(obj: object, shared: Dict[Hashable, object]) -> bytes:
+    """
+    Returns the snapshot of an object.
+
+    Args:
+        obj: Object to be serialized
+        shared: Dictionary mapping references to the objects written as references
+
+    Returns:
+        Serialized snapshot
+    """
+    f = io.BytesIO()
+    SnapshotPickler(f, shared).dump(obj)
+    return f.getvalue()
+
+
+def loads(snapshot: bytes, shared: Dict[Hashable, object]) -> object:
+    """
+    Returns the object of a snapshot.
+
+    Args:
+        snapshot: Serialized snapshot
+        shared: Dictionary mapping references to the objects they are resolved to
+
+    Returns:
+        The deserialized object
+    """
+    return SnapshotUnpickler(io.BytesIO(snapshot), shared).load()
+
+
+def is_serializable(obj: object, shared: Dict[Hashable, object]) -> bool:
+    """
+    Returns whether an object can be written to a snapshot. User-defined functions local to another function, for
+    example, cannot.
+
+    Args:
+        obj: Object to be checked
+        shared: Dictionary mapping references to the objects written as references
+
+    Returns:
+        Boolean representing whether the object can be serialized
+    """
+    try:
+        dumps(obj, shared)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
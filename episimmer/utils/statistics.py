@@ -241,8 +241,7 @@ def save_stats(
         @functools.wraps(func)
         def wrapper(ref: 'Simulate', *args, **kwargs) -> None:
             func(ref, *args, **kwargs)
-            args = parse_args()
-            stats = args.stats
+            stats = ref.args.stats
             if stats:
                 for obj_str, levels in obj_lev_tuples:
                     obj = getattr(ref, obj_str)
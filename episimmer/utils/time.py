@@ -37,17 +37,34 @@ class Time():
         Time.current_time_step = None
 
     @staticmethod
-    def new_world() -> None:
+    def new_world(world: Union[int, None] = None) -> None:
         """
         Sets the value of current_world and current time step at the onset of a world.
+
+        Args:
+            world: Index of the new world. If not passed, the world after the current world is used.
         """
-        if Time.current_world is None:
+        if world is not None:
+            Time.current_world = world
+        elif Time.current_world is None:
             Time.current_world = 0
         else:
             Time.current_world += 1
 
         Time.current_time_step = 0
 
+    @staticmethod
+    def resume(world: int, time_step: int) -> None:
+        """
+        Sets the value of current_world and current time step when a simulation is resumed from a snapshot or fork.
+
+        Args:
+            world: Index of the world of the simulation
+            time_step: Time step the simulation continues from
+        """
+        Time.current_world = world
+        Time.current_time_step = time_step
+
     @staticmethod
     def increment_current_time_step() -> None:
         """
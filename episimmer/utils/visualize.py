@@ -11,7 +11,6 @@ import networkx as nx
 import numpy as np
 from matplotlib.axes import Axes
 
-from .arg_parser import parse_args
 from .time import Time
 
 if TYPE_CHECKING:
@@ -19,14 +18,20 @@ if TYPE_CHECKING:
     from episimmer.simulate import Simulate
 
 
-def plot_results(example_path: str, model: 'BaseModel',
-                 avg_dict: Dict[str, List[float]],
-                 stddev_dict: Dict[str,
-                                   List[float]], max_dict: Dict[str,
-                                                                List[int]],
-                 min_dict: Dict[str, List[int]], plot: bool) -> None:
+def plot_results(
+    example_path: str,
+    model: 'BaseModel',
+    avg_dict: Dict[str, List[float]],
+    stddev_dict: Dict[str, List[float]],
+    max_dict: Dict[str, List[int]],
+    min_dict: Dict[str, List[int]],
+    plot: bool,
+    filename: str = 'results.jpg',
+    percentile_dict: Union[Dict[float, Dict[str, List[float]]], None] = None
+) -> None:
     """
-    Plots the epidemic trajectory
+    Plots the epidemic trajectory. The band between the lowest and highest percentile is shaded if at least two
+    percentiles are passed, and the range across worlds otherwise. The other percentiles are plotted as dashed lines.
 
     Args:
         example_path: Path to directory containing simulation files
@@ -36,20 +41,36 @@ def plot_results(example_path: str, model: 'BaseModel',
         max_dict: Maximum values of epidemic trajectory across worlds
         min_dict: Minimum values of epidemic trajectory across worlds
         plot: Boolean used to plot the epidemic trajectory
+        filename: Name of the file in the results directory the plot is saved to
+        percentile_dict: Percentiles of epidemic trajectory across worlds, keyed by percentile
     """
+    plt.clf()
+    percentiles = sorted(percentile_dict) if percentile_dict else []
+    lines = []
     for state in avg_dict.keys():
         x = np.arange(0, len(avg_dict[state]))
-        plt.plot(avg_dict[state], color=model.colors[state])
+        line, = plt.plot(avg_dict[state], color=model.colors[state])
+        lines.append(line)
         # y=np.array(avg_dict[state])
         # error=np.array(stddev_dict[state])
+        lower, upper = min_dict[state], max_dict[state]
+        inner_percentiles = percentiles
+        if len(percentiles) > 1:
+            lower = percentile_dict[percentiles[0]][state]
+            upper = percentile_dict[percentiles[-1]][state]
+            inner_percentiles = percentiles[1:-1]
+        for percentile in inner_percentiles:
+            plt.plot(percentile_dict[percentile][state],
+                     color=model.colors[state],
+                     linestyle='--')
         plt.fill_between(x,
-                         min_dict[state],
-                         max_dict[state],
+                         lower,
+                         upper,
                          alpha=0.2,
                          facecolor=model.colors[state],
                          linewidth=0)
     plt.title(model.name + ' Plot')
-    plt.legend(list(avg_dict.keys()), loc='upper right', shadow=True)
+    plt.legend(lines, list(avg_dict.keys()), loc='upper right', shadow=True)
     plt.ylabel('Population')
     plt.xlabel('Time Steps (in unit steps)')
     plt.grid(b=True, which='major', color='#666666', linestyle='-')
@@ -59,7 +80,7 @@ def plot_results(example_path: str, model: 'BaseModel',
     fig.set_size_inches(8, 5)
     if plot:
         plt.show()
-    fig.savefig(osp.join(example_path, 'results', 'results.jpg'))
+    fig.savefig(osp.join(example_path, 'results', filename))
 
 
 def buildgraph(i: int, model: 'BaseModel',
@@ -140,8 +161,7 @@ def get_interaction_graph_from_object(obj: 'Simulate') -> nx.Graph:
     # Interactions
     for agent in agents_dict.values():
         if agent.can_contribute_infection > 0:
-            for int_agent in agent.contact_list:
-                int_agent_indx = int_agent['Interacting Agent Index']
+            for int_agent_indx, _ in agent.get_contacts():
                 if (agents_obj.agents[int_agent_indx].can_receive_infection >
                         0):
                     g.add_edge(agent.index, int_agent_indx, color='black')
@@ -177,8 +197,7 @@ def save_env_graph() -> Callable:
         def wrapper(ref: 'Simulate', *args, **kwargs) -> None:
             func(ref, *args, **kwargs)
             if ref.config_obj.worlds - 1 == Time.get_current_world():
-                args = parse_args()
-                if args.viz_dyn:
+                if ref.args.viz_dyn:
                     g = get_interaction_graph_from_object(ref)
                     ref.g_list.append(g)
 
@@ -283,8 +302,7 @@ def store_animated_dynamic_graph() -> Callable:
         @functools.wraps(func)
         def wrapper(ref: 'Simulate', *args, **kwargs) -> None:
             if ref.config_obj.worlds - 1 == Time.get_current_world():
-                cmd_args = parse_args()
-                if cmd_args.viz_dyn:
+                if ref.args.viz_dyn:
 
                     fig = plt.figure()
                     fig.set_size_inches(20, 14)
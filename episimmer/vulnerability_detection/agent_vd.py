@@ -3,7 +3,7 @@ from typing import Dict, List, Tuple, Union
 
 import numpy as np
 
-from episimmer.read_file import ReadAgents, ReadLocations, ReadOneTimeEvents
+from episimmer.read_file import ReadAgents, ReadLocations
 from episimmer.simulate import Simulate
 from episimmer.utils.time import Time
 from episimmer.world import World
@@ -190,17 +190,15 @@ class EarlyVulnerableAgent(VulnerableAgent):
         """
         time_steps = self.world_obj.config_obj.time_steps
         Time.new_world()
-        agents_obj = ReadAgents(self.world_obj.agents_filename,
-                                self.world_obj.config_obj)
+        agents_obj, locations_obj, one_time_event_obj = self.world_obj.get_world_objects(
+        )
         self.reset_start_infection(agents_obj)
-        locations_obj = ReadLocations(self.world_obj.locations_filename,
-                                      self.world_obj.config_obj)
-        one_time_event_obj = ReadOneTimeEvents(
-            self.world_obj.one_time_event_file)
 
         sim_obj = Simulate(self.world_obj.config_obj, self.world_obj.model,
                            self.world_obj.policy_list, agents_obj,
-                           locations_obj)
+                           locations_obj,
+                           self.world_obj.seed_world(Time.get_current_world()),
+                           self.world_obj.args)
         sim_obj.on_start_simulation()
 
         for current_time_step in range(time_steps):
@@ -289,8 +287,7 @@ class SimpleAgentVulnerability(AgentVulnerability):
         """
         Initialises scores and counts for all agents with value 0.0 and 0 respectively.
         """
-        agents_obj = ReadAgents(self.world_obj.agents_filename,
-                                self.world_obj.config_obj)
+        agents_obj, _, _ = self.world_obj.get_world_objects()
         for agent_index in agents_obj.agents.keys():
             self.agent_scores[agent_index] = 0.0
             self.agent_counts[agent_index] = 0
@@ -307,7 +304,7 @@ class SimpleAgentVulnerability(AgentVulnerability):
         agents = list(agents_obj.agents)
         self.agents_to_remove = random.sample(agents, num_agents_to_remove)
         for agent in self.agents_to_remove:
-            agents_obj.agents.pop(agent)
+            agents_obj.remove_agent(agent)
             self.agent_counts[agent] += 1
 
     def update_agent_scores(self, end_state: Dict[str, List[int]]) -> None:
@@ -335,18 +332,16 @@ class SimpleAgentVulnerability(AgentVulnerability):
         """
         Time.new_world()
         time_steps = self.world_obj.config_obj.time_steps
-        agents_obj = ReadAgents(self.world_obj.agents_filename,
-                                self.world_obj.config_obj)
+        agents_obj, locations_obj, one_time_event_obj = self.world_obj.get_world_objects(
+        )
         if self.num_agents_to_remove > 0:
             self.remove_agents(agents_obj, self.num_agents_to_remove)
-        locations_obj = ReadLocations(self.world_obj.locations_filename,
-                                      self.world_obj.config_obj)
-        one_time_event_obj = ReadOneTimeEvents(
-            self.world_obj.one_time_event_file)
 
         sim_obj = Simulate(self.world_obj.config_obj, self.world_obj.model,
                            self.world_obj.policy_list, agents_obj,
-                           locations_obj)
+                           locations_obj,
+                           self.world_obj.seed_world(Time.get_current_world()),
+                           self.world_obj.args)
         sim_obj.on_start_simulation()
 
         for current_time_step in range(time_steps):
@@ -460,7 +455,7 @@ class ChunkAgentVulnerability(AgentVulnerability):
         agents = list(agents_obj.agents)
         self.agents_to_remove = random.sample(agents, num_agents_to_remove)
         for agent in self.agents_to_remove:
-            agents_obj.agents.pop(agent)
+            agents_obj.remove_agent(agent)
 
     def reset_world(self) -> None:
         """
@@ -514,19 +509,17 @@ class ChunkAgentVulnerability(AgentVulnerability):
             end: End time step where simulation must be ended
         """
         Time.new_world()
-        agents_obj = ReadAgents(self.world_obj.agents_filename,
-                                self.world_obj.config_obj)
+        agents_obj, locations_obj, one_time_event_obj = self.world_obj.get_world_objects(
+        )
         self.reset_world()
         if self.num_agents_to_remove > 0:
             self.remove_agents(agents_obj, self.num_agents_to_remove)
-        locations_obj = ReadLocations(self.world_obj.locations_filename,
-                                      self.world_obj.config_obj)
-        one_time_event_obj = ReadOneTimeEvents(
-            self.world_obj.one_time_event_file)
 
         sim_obj = Simulate(self.world_obj.config_obj, self.world_obj.model,
                            self.world_obj.policy_list, agents_obj,
-                           locations_obj)
+                           locations_obj,
+                           self.world_obj.seed_world(Time.get_current_world()),
+                           self.world_obj.args)
         sim_obj.on_start_simulation()
 
         flag = 0
@@ -713,9 +706,8 @@ class BanditAlgos(AgentVulnerability):
         Initialises agent scores to the score from one run of the algorithm without the said agent. Agent counts is
         also initialised to 0.
         """
-        agents_obj = ReadAgents(self.world_obj.agents_filename,
-                                self.world_obj.config_obj)
-        for agent_index in agents_obj.agents.keys():
+        agents_obj, _, _ = self.world_obj.get_world_objects()
+        for agent_index in list(agents_obj.agents.keys()):
             # self.agent_scores[int(agent_index)] = 1.0
             self.agent_scores[int(agent_index)] = self.get_init_score(
                 agent_index)
@@ -731,8 +723,7 @@ class BanditAlgos(AgentVulnerability):
         Returns:
             Score of the agent
         """
-        agents_obj = ReadAgents(self.world_obj.agents_filename,
-                                self.world_obj.config_obj)
+        agents_obj, _, _ = self.world_obj.get_world_objects()
         agents_obj.agents.pop(agent_index)
         end_state, _, _ = self.one_run_helper(agents_obj)
         return self.get_score(end_state)
@@ -801,21 +792,21 @@ class BanditAlgos(AgentVulnerability):
         One Run helper
 
         Args:
-            agents_obj: ReadAgents object
+            agents_obj: ReadAgents object obtained from the world object for the current run
 
         Returns:
             The end_state, agents object and locations object
         """
         Time.new_world()
         time_steps = self.world_obj.config_obj.time_steps
-        locations_obj = ReadLocations(self.world_obj.locations_filename,
-                                      self.world_obj.config_obj)
-        one_time_event_obj = ReadOneTimeEvents(
-            self.world_obj.one_time_event_file)
+        locations_obj = self.world_obj.locations_obj
+        one_time_event_obj = self.world_obj.one_time_event_obj
 
         sim_obj = Simulate(self.world_obj.config_obj, self.world_obj.model,
                            self.world_obj.policy_list, agents_obj,
-                           locations_obj)
+                           locations_obj,
+                           self.world_obj.seed_world(Time.get_current_world()),
+                           self.world_obj.args)
         sim_obj.on_start_simulation()
 
         for current_time_step in range(time_steps):
@@ -835,8 +826,7 @@ class BanditAlgos(AgentVulnerability):
         """
         Executes a single run of the detection module.
         """
-        agents_obj = ReadAgents(self.world_obj.agents_filename,
-                                self.world_obj.config_obj)
+        agents_obj, _, _ = self.world_obj.get_world_objects()
         self.remove_agents(agents_obj)
         end_state, _, _ = self.one_run_helper(agents_obj)
         self.update_agent_scores(end_state)
@@ -1,6 +1,5 @@
 from typing import Dict, Union
 
-from episimmer.read_file import ReadAgents
 from episimmer.world import World
 
 
@@ -19,8 +18,7 @@ class AgentVD():
         """
         Initialises scores for all agents with value 0.0.
         """
-        agents_obj = ReadAgents(self.world_obj.agents_filename,
-                                self.world_obj.config_obj)
+        agents_obj, _, _ = self.world_obj.get_world_objects()
         for agent_index in agents_obj.agents.keys():
             self.agent_scores[agent_index] = 0.0
 
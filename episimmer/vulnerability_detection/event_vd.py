@@ -2,8 +2,7 @@ import random
 from typing import Dict, List, Union
 
 from episimmer.policy.lockdown_policy import EventLockdown
-from episimmer.read_file import (ReadAgents, ReadEvents, ReadLocations,
-                                 ReadOneTimeEvents)
+from episimmer.read_file import ReadEvents
 from episimmer.simulate import Simulate
 from episimmer.utils.time import Time
 from episimmer.vulnerability_detection.base import EventVulnerability
@@ -94,12 +93,8 @@ class SimpleEventVulnerability(EventVulnerability):
         Returns:
             List of event identifiers
         """
-        agents_obj = ReadAgents(self.world_obj.agents_filename,
-                                self.world_obj.config_obj)
-        locations_obj = ReadLocations(self.world_obj.locations_filename,
-                                      self.world_obj.config_obj)
-        one_time_event_obj = ReadOneTimeEvents(
-            self.world_obj.one_time_event_file)
+        agents_obj, locations_obj, one_time_event_obj = self.world_obj.get_world_objects(
+        )
 
         for event_files_list in self.world_obj.event_files_list:
             if event_files_list:
@@ -161,17 +156,15 @@ class SimpleEventVulnerability(EventVulnerability):
         """
         Time.new_world()
         time_steps = self.world_obj.config_obj.time_steps
-        agents_obj = ReadAgents(self.world_obj.agents_filename,
-                                self.world_obj.config_obj)
-        locations_obj = ReadLocations(self.world_obj.locations_filename,
-                                      self.world_obj.config_obj)
-        one_time_event_obj = ReadOneTimeEvents(
-            self.world_obj.one_time_event_file)
+        agents_obj, locations_obj, one_time_event_obj = self.world_obj.get_world_objects(
+        )
 
         policy_list = self.select_event() if self.events else []
 
         sim_obj = Simulate(self.world_obj.config_obj, self.world_obj.model,
-                           policy_list, agents_obj, locations_obj)
+                           policy_list, agents_obj, locations_obj,
+                           self.world_obj.seed_world(Time.get_current_world()),
+                           self.world_obj.args)
         sim_obj.on_start_simulation()
 
         for current_time_step in range(time_steps):
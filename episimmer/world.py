@@ -1,18 +1,30 @@
-from typing import Dict, List, Tuple, Union
+import argparse
+import os.path as osp
+import random
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
 
 import numpy as np
 
-from episimmer.model import BaseModel
+from episimmer.model import BaseModel, ContactProbabilityTable
 from episimmer.policy.base import Policy
 
 from .read_file import (ReadAgents, ReadConfiguration, ReadLocations,
                         ReadOneTimeEvents)
-from .simulate import Simulate
-from .utils.arg_parser import parse_args
+from .simulate import BatchSimulate, Simulate
+from .utils.arg_parser import get_default_args
+from .utils.file_cache import FileCache
 from .utils.math import deep_copy_average, deep_copy_stddev
+from .utils.module_handling import get_scenarios
+from .utils.quantile import StreamingQuantiles
+from .utils.statistics import Stats, save_pickle
 from .utils.time import Time
 from .utils.visualize import plot_results, store_animated_time_plot
 
+worker_world_obj: Union['World', None] = None
+worker_scenarios: Union[Dict[str, Tuple[int, List[Policy]]], None] = None
+
 
 class World():
     """
@@ -28,13 +40,19 @@ class World():
         locations_filename: Name of the file that contains location information
         event_files_list: List of path names of all the events list files
         one_time_event_file: File name of the one time event
+        args: Command-line arguments of the simulation. If not passed, the default arguments are used.
     """
-    def __init__(self, config_obj: ReadConfiguration, model: BaseModel,
-                 policy_list: List[Policy], agents_filename: str,
+    def __init__(self,
+                 config_obj: ReadConfiguration,
+                 model: BaseModel,
+                 policy_list: List[Policy],
+                 agents_filename: str,
                  interaction_files_list: List[List[str]],
                  probabilistic_interaction_files_list: List[List[str]],
-                 locations_filename: str, event_files_list: List[List[str]],
-                 one_time_event_file: Union[str, None]):
+                 locations_filename: str,
+                 event_files_list: List[List[str]],
+                 one_time_event_file: Union[str, None],
+                 args: Union[argparse.Namespace, None] = None):
         self.config_obj: ReadConfiguration = config_obj
         self.policy_list: List[Policy] = policy_list
         self.agents_filename: str = agents_filename
@@ -45,43 +63,329 @@ class World():
             List[str]] = probabilistic_interaction_files_list
         self.event_files_list: List[List[str]] = event_files_list
         self.one_time_event_file: Union[str, None] = one_time_event_file
+        self.args: argparse.Namespace = args if args is not None else get_default_args(
+            config_obj.example_path)
+        self.agents_obj: Union[ReadAgents, None] = None
+        self.locations_obj: Union[ReadLocations, None] = None
+        self.one_time_event_obj: Union[ReadOneTimeEvents, None] = None
+        self.seed_entropy: int = int(
+            config_obj.random_seed
+        ) if config_obj.random_seed != '' else np.random.SeedSequence().entropy
+
+    def get_world_objects(
+            self) -> Tuple[ReadAgents, ReadLocations, ReadOneTimeEvents]:
+        """
+        Returns the agents, locations and one time events of the simulation. The input files are read only the first
+        time this function is called, after which the same objects are reset for every new world. The memory budget of
+        the :class:`~episimmer.utils.file_cache.FileCache` of interaction and event files is also set on the first call.
+
+        Returns:
+            ReadAgents object, ReadLocations object and ReadOneTimeEvents object
+        """
+        if self.agents_obj is None:
+            FileCache.set_memory_budget(self.args.cache_memory)
+            self.agents_obj = ReadAgents(self.agents_filename, self.config_obj,
+                                         self.args.columnar)
+            self.locations_obj = ReadLocations(self.locations_filename,
+                                               self.config_obj)
+            self.one_time_event_obj = ReadOneTimeEvents(
+                self.one_time_event_file)
+        else:
+            self.agents_obj.reset()
+            self.locations_obj.reset()
+
+        return self.agents_obj, self.locations_obj, self.one_time_event_obj
+
+    def seed_world(self, world: int) -> np.random.Generator:
+        """
+        Returns the random number generator of a world. The generator is derived from the random seed of the config
+        file (or from fresh entropy when no seed is set) and the index of the world, so that the outcome of a world is
+        independent of the worlds simulated before it and of the process simulating it. The global random modules are
+        also seeded from the same sequence for user-defined functions that draw from them.
+
+        Args:
+            world: Index of the world
+
+        Returns:
+            Random number generator of the world
+        """
+        global_seq, world_seq = np.random.SeedSequence(
+            [self.seed_entropy, world]).spawn(2)
+        seed = global_seq.generate_state(1)[0]
+        random.seed(int(seed))
+        np.random.seed(seed)
+
+        return np.random.default_rng(world_seq)
 
     def one_world(
-            self) -> Tuple[Dict[str, List[int]], ReadAgents, ReadLocations]:
+        self,
+        world: Union[int, None] = None
+    ) -> Tuple[Dict[str, List[int]], ReadAgents, ReadLocations]:
         """
-        Runs a single simulation world
+        Runs a single simulation world. A world that reaches an absorbing configuration is ended early, and the rest
+        of its state history is filled with its final state counts.
+
+        Args:
+            world: Index of the world. If not passed, the world after the current world is simulated.
 
         Returns:
             State of the world at the end of a simulation, ReadAgents object, and ReadLocations object
         """
+        sim_obj = self.start_world(world)
+        self.run_time_steps(sim_obj, self.config_obj.time_steps)
 
-        time_steps = self.config_obj.time_steps
+        end_state = sim_obj.end_simulation()
+        return end_state, sim_obj.agents_obj, sim_obj.locations_obj
 
-        Time.new_world()
+    def start_world(self, world: Union[int, None] = None) -> Simulate:
+        """
+        Starts a simulation world by initializing its agents, locations and random number generator. The time steps of
+        the world are then run with :meth:`run_time_steps`.
 
-        # Initialize agents
-        agents_obj = ReadAgents(self.agents_filename, self.config_obj)
+        Args:
+            world: Index of the world. If not passed, the world after the current world is simulated.
 
-        # Initialize locations
-        locations_obj = ReadLocations(self.locations_filename, self.config_obj)
+        Returns:
+            Simulation of the world
+        """
+        Time.new_world(world)
+        rng = self.seed_world(Time.get_current_world())
 
-        # Initialize one time events
-        one_time_event_obj = ReadOneTimeEvents(self.one_time_event_file)
+        # Initialize agents, locations and one time events
+        agents_obj, locations_obj, _ = self.get_world_objects()
 
         sim_obj = Simulate(self.config_obj, self.model, self.policy_list,
-                           agents_obj, locations_obj)
+                           agents_obj, locations_obj, rng, self.args)
         sim_obj.on_start_simulation()
+        return sim_obj
+
+    def restore_world(self, snapshot: bytes) -> Simulate:
+        """
+        Restores the simulation of a world from a snapshot taken with :meth:`~episimmer.simulate.Simulate.snapshot`,
+        for example to resume a run that was preempted. The remaining time steps of the world are then run with
+        :meth:`run_time_steps`.
+
+        Args:
+            snapshot: Serialized snapshot of the simulation of a world
+
+        Returns:
+            Simulation of the world
+        """
+        if self.one_time_event_obj is None:
+            self.one_time_event_obj = ReadOneTimeEvents(
+                self.one_time_event_file)
+        return Simulate.restore(snapshot, self.config_obj, self.model,
+                                self.policy_list)
+
+    def run_time_steps(self, sim_obj: Simulate, end_time_step: int) -> None:
+        """
+        Runs the time steps of a simulation from its next time step up to, but not including, end_time_step. The
+        simulation can be one started with :meth:`start_world`, a fork of one, or one restored from a snapshot. If the
+        world reaches an absorbing configuration, the rest of its state history is filled with its final state counts
+        and no further time steps are run.
 
-        for current_time_step in range(time_steps):
+        Args:
+            sim_obj: Simulation of a world
+            end_time_step: Time step at which the run stops
+        """
+        sim_obj.resume()
+        while sim_obj.time_step < end_time_step:
             sim_obj.on_start_time_step(
                 self.interaction_files_list, self.event_files_list,
-                self.probabilistic_interaction_files_list, one_time_event_obj)
+                self.probabilistic_interaction_files_list,
+                self.one_time_event_obj)
             sim_obj.handle_time_step_for_all_agents()
             sim_obj.end_time_step()
             Time.increment_current_time_step()
 
-        end_state = sim_obj.end_simulation()
-        return end_state, agents_obj, locations_obj
+            # No later time step can change the state of the world
+            if sim_obj.is_absorbing():
+                sim_obj.fill_state_history(self.config_obj.time_steps)
+                sim_obj.time_step = self.config_obj.time_steps
+                break
+        sim_obj.pause()
+
+    def scenario_world(
+        self, world: int, scenarios: Dict[str, Tuple[int, List[Policy]]]
+    ) -> Dict[str, Dict[str, List[int]]]:
+        """
+        Runs a single simulation world for every policy scenario. The world is run once under the policies of the world
+        object up to the starting time step of each scenario, where it is forked into a branch that runs the rest of the
+        time steps under the policies of the scenario. All the branches of the world thus share the time steps before
+        they start, and every branch starts from the same state of the random number generator as the world at that
+        time step, so that the differences between the scenarios reflect their policies rather than the random draws.
+
+        Args:
+            world: Index of the world
+            scenarios: Dictionary mapping the name of each scenario to its starting time step and policy list
+
+        Returns:
+            Dictionary mapping the name of each scenario to the state history of its branch
+        """
+        sim_obj = self.start_world(world)
+
+        # An absorbing configuration can be changed by the policies of a branch
+        if any(policy_list for _, policy_list in scenarios.values()):
+            sim_obj.absorbing_states = None
+
+        sdicts = {}
+        for name, (start_time_step,
+                   policy_list) in sorted(scenarios.items(),
+                                          key=lambda scenario: scenario[1][0]):
+            self.run_time_steps(sim_obj, start_time_step)
+            branch_obj = sim_obj.fork(policy_list)
+            self.run_time_steps(branch_obj, self.config_obj.time_steps)
+            sdicts[name] = branch_obj.end_simulation()
+
+        sim_obj.wait_for_prefetch()
+        return sdicts
+
+    def check_scenarios(
+            self, scenarios: Dict[str, Tuple[int, List[Policy]]]) -> None:
+        """
+        Checks that every policy scenario starts at a time step of the simulation and that no scenario runs policy
+        objects of the world object, which keep running in the shared time steps while the branches are simulated.
+
+        Args:
+            scenarios: Dictionary mapping the name of each scenario to its starting time step and policy list
+        """
+        for name, (start_time_step, policy_list) in scenarios.items():
+            if not 0 <= start_time_step <= self.config_obj.time_steps:
+                raise ValueError(
+                    'Scenario {0} starts at time step {1}, which is not between 0 and {2}'
+                    .format(name, start_time_step, self.config_obj.time_steps))
+            for policy in policy_list:
+                if any(policy is base_policy
+                       for base_policy in self.policy_list):
+                    raise ValueError(
+                        'Scenario {0} runs a policy object of the world. Scenarios must create their own policy '
+                        'objects'.format(name))
+
+    def run_scenario_worlds(
+            self, scenarios: Dict[str, Tuple[int, List[Policy]]],
+            workers: int) -> Iterator[Dict[str, Dict[str, List[int]]]]:
+        """
+        Simulates all the worlds for every policy scenario with :meth:`scenario_world` and yields the state histories
+        of the scenarios of each world in the order of the worlds. If more than one worker is requested, the worlds are
+        distributed across a pool of processes, each of which builds its own world object and scenarios from the
+        example path.
+
+        Args:
+            scenarios: Dictionary mapping the name of each scenario to its starting time step and policy list
+            workers: Number of processes used to simulate the worlds
+
+        Returns:
+            Iterator over the state histories of the scenarios of each world
+        """
+        worlds = range(self.config_obj.worlds)
+        if workers <= 1:
+            for world in worlds:
+                yield self.scenario_world(world, scenarios)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=init_scenario_worker,
+                                 initargs=(self.config_obj.example_path,
+                                           self.seed_entropy,
+                                           self.args)) as executor:
+            for sdicts, stats_dict in executor.map(run_scenario_worker,
+                                                   worlds):
+                Stats.stats_dict.update(stats_dict)
+                yield sdicts
+
+    def supports_batch(self) -> bool:
+        """
+        Returns whether the worlds can be simulated in batches with :class:`~episimmer.simulate.BatchSimulate`. This
+        requires a model whose transitions can be inspected and whose interaction functions are all
+        :class:`~episimmer.model.ContactProbabilityTable` objects, no external prevalence function, no policies, no
+        events, group interactions or probabilistic interactions, and no per-agent statistics or environment graphs.
+
+        Returns:
+            Boolean representing whether the worlds can be simulated in batches
+        """
+        infection_fns = self.model.get_infection_fns()
+        if infection_fns is None or self.model.external_prevalence:
+            return False
+        for fns in infection_fns.values():
+            if not all(isinstance(fn, ContactProbabilityTable) for fn in fns):
+                return False
+
+        if self.policy_list or self.args.stats or self.args.viz_dyn:
+            return False
+        if any(self.event_files_list) or any(
+                self.probabilistic_interaction_files_list):
+            return False
+        if self.one_time_event_file or self.config_obj.get_group_interaction_files_list(
+        ):
+            return False
+        return True
+
+    def batch_worlds(self, worlds: range) -> List[Dict[str, List[int]]]:
+        """
+        Runs a batch of simulation worlds together in one vectorized pass. The random draws of each world are taken
+        from its own generator, so the outcome of a world does not depend on the batch it is simulated in.
+
+        Args:
+            worlds: Indices of the worlds in the batch
+
+        Returns:
+            State history of every world in the batch
+        """
+        Time.new_world(worlds[0])
+        rngs = [self.seed_world(world) for world in worlds]
+        agents_obj, _, _ = self.get_world_objects()
+
+        sim_obj = BatchSimulate(self.config_obj, self.model, agents_obj, rngs)
+        sim_obj.on_start_simulation()
+
+        for current_time_step in range(self.config_obj.time_steps):
+            sim_obj.on_start_time_step(self.interaction_files_list)
+            sim_obj.handle_time_step_for_all_worlds()
+            sim_obj.end_time_step()
+            Time.increment_current_time_step()
+
+        return sim_obj.end_simulation()
+
+    def run_worlds(self,
+                   workers: int,
+                   batch: int = 0) -> Iterator[Dict[str, List[int]]]:
+        """
+        Simulates all the worlds and yields the state history of each world in the order of the worlds. If a batch size
+        is passed and the worlds can be simulated in batches, batches of worlds are simulated together in one
+        vectorized pass. Otherwise, if more than one worker is requested, the worlds are distributed across a pool of
+        processes, each of which builds its own world object from the example path.
+
+        Args:
+            workers: Number of processes used to simulate the worlds
+            batch: Number of worlds simulated together in one vectorized pass. 0 disables batches.
+
+        Returns:
+            Iterator over the state history of each world
+        """
+        worlds = range(self.config_obj.worlds)
+        if batch > 0:
+            if self.supports_batch():
+                for start in range(0, len(worlds), batch):
+                    yield from self.batch_worlds(worlds[start:start + batch])
+                return
+            warnings.warn(
+                'The worlds cannot be simulated in batches with this model and environment. The worlds are '
+                'simulated one at a time.')
+
+        if workers <= 1:
+            for world in worlds:
+                sdict, _, _ = self.one_world(world)
+                yield sdict
+            return
+
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=init_world_worker,
+                                 initargs=(self.config_obj.example_path,
+                                           self.seed_entropy,
+                                           self.args)) as executor:
+            for sdict, stats_dict in executor.map(run_world_worker, worlds):
+                Stats.stats_dict.update(stats_dict)
+                yield sdict
 
     def simulate_worlds(self) -> Dict[str, List[float]]:
         """
@@ -92,10 +396,71 @@ class World():
             Averaged epidemic trajectory dictionary
         """
 
-        args = parse_args()
-        plot = args.noplot
-        anim = args.animate
+        plot = self.args.noplot
+        anim = self.args.animate
+        workers = self.args.workers
+        batch = self.args.batch
+
+        avg_dict = self.summarize_worlds(self.run_worlds(workers, batch), plot,
+                                         self.args.quantiles)
+        if anim:
+            store_animated_time_plot(self.config_obj.example_path, self.model,
+                                     avg_dict)
+
+        return avg_dict
+
+    def simulate_scenarios(
+        self, scenarios: Dict[str, Tuple[int, List[Policy]]]
+    ) -> Dict[str, Dict[str, List[float]]]:
+        """
+        Simulates multiple worlds for every policy scenario with :meth:`scenario_world` and saves the epidemic
+        trajectory plot of each scenario as results_<scenario>.jpg, and its percentiles, if any are requested, as
+        results_<scenario>.pickle. It also plots them by default (which can be disabled with command line flags).
+
+        Args:
+            scenarios: Dictionary mapping the name of each scenario to its starting time step and policy list
+
+        Returns:
+            Dictionary mapping the name of each scenario to its averaged epidemic trajectory dictionary
+        """
+        self.check_scenarios(scenarios)
+
+        plot = self.args.noplot
+        workers = self.args.workers
 
+        scenario_sdicts = {name: [] for name in scenarios}
+        for sdicts in self.run_scenario_worlds(scenarios, workers):
+            for name, sdict in sdicts.items():
+                scenario_sdicts[name].append(sdict)
+
+        avg_dicts = {}
+        for name, sdict_list in scenario_sdicts.items():
+            avg_dicts[name] = self.summarize_worlds(sdict_list, plot,
+                                                    self.args.quantiles,
+                                                    'results_{0}'.format(name))
+        return avg_dicts
+
+    def summarize_worlds(self,
+                         sdicts: Iterable[Dict[str, List[int]]],
+                         plot: bool,
+                         percentiles: Union[List[float], None] = None,
+                         name: str = 'results') -> Dict[str, List[float]]:
+        """
+        Averages the state histories of all the worlds and saves the epidemic trajectory plot as <name>.jpg. If
+        percentiles are passed, they are estimated for every state and time step with
+        :class:`~episimmer.utils.quantile.StreamingQuantiles` as the worlds are added, so the state histories are
+        never all held in memory. The band between the lowest and highest percentile is then plotted in place of the
+        range across worlds, and the average and percentiles are saved as <name>.pickle.
+
+        Args:
+            sdicts: State history of each world
+            plot: Boolean used to plot the epidemic trajectory
+            percentiles: Percentiles of the epidemic trajectory to be estimated, between 0 and 100
+            name: Name of the files in the results directory the results are saved to
+
+        Returns:
+            Averaged epidemic trajectory dictionary
+        """
         tdict = {}
         t2_dict = {}
         max_dict = {}
@@ -105,9 +470,18 @@ class World():
             t2_dict[state] = [0] * (self.config_obj.time_steps + 1)
             max_dict[state] = [0] * (self.config_obj.time_steps + 1)
             min_dict[state] = [np.inf] * (self.config_obj.time_steps + 1)
+        quantiles_obj = None
+        if percentiles:
+            quantiles_obj = StreamingQuantiles(
+                [percentile / 100 for percentile in percentiles],
+                (len(self.model.individual_state_types),
+                 self.config_obj.time_steps + 1))
 
-        for i in range(self.config_obj.worlds):
-            sdict, _, _ = self.one_world()
+        for sdict in sdicts:
+            if quantiles_obj is not None:
+                quantiles_obj.add([
+                    sdict[state] for state in self.model.individual_state_types
+                ])
             for state in self.model.individual_state_types:
                 for j in range(len(tdict[state])):
                     tdict[state][j] += sdict[state][j]
@@ -120,10 +494,94 @@ class World():
         # Average number time series
         avg_dict = deep_copy_average(tdict, self.config_obj.worlds)
         stddev_dict = deep_copy_stddev(tdict, t2_dict, self.config_obj.worlds)
+
+        # Percentile time series
+        percentile_dict = {}
+        if quantiles_obj is not None:
+            for percentile, estimates in zip(percentiles,
+                                             quantiles_obj.get_quantiles()):
+                percentile_dict[percentile] = {
+                    state: estimates[i].tolist()
+                    for i, state in enumerate(
+                        self.model.individual_state_types)
+                }
+            save_pickle(self.config_obj.example_path, name + '.pickle', {
+                'average': avg_dict,
+                'percentiles': percentile_dict
+            })
+
         plot_results(self.config_obj.example_path, self.model, avg_dict,
-                     stddev_dict, max_dict, min_dict, plot)
-        if anim:
-            store_animated_time_plot(self.config_obj.example_path, self.model,
-                                     avg_dict)
+                     stddev_dict, max_dict, min_dict, plot, name + '.jpg',
+                     percentile_dict)
 
         return avg_dict
+
+
+def init_world_worker(example_path: str, seed_entropy: int,
+                      args: argparse.Namespace) -> None:
+    """
+    Initializes a worker process of the world process pool by building the world object of the example.
+
+    Args:
+        example_path: Path to directory with simulation files
+        seed_entropy: Entropy of the parent world object from which the generator of each world is derived
+        args: Command-line arguments of the parent world object
+    """
+    global worker_world_obj
+    from .main import get_world_obj
+
+    config_obj = ReadConfiguration(osp.join(example_path, 'config.txt'))
+    worker_world_obj = get_world_obj(config_obj, example_path, args)
+    worker_world_obj.seed_entropy = seed_entropy
+
+
+def run_world_worker(
+        world: int) -> Tuple[Dict[str, List[int]], Dict[int, Dict]]:
+    """
+    Simulates a single world in a worker process of the world process pool.
+
+    Args:
+        world: Index of the world
+
+    Returns:
+        State history of the world and the statistics collected for the world
+    """
+    sdict, _, _ = worker_world_obj.one_world(world)
+    stats_dict = {}
+    if world in Stats.get_dict():
+        stats_dict[world] = Stats.get_dict().pop(world)
+    return sdict, stats_dict
+
+
+def init_scenario_worker(example_path: str, seed_entropy: int,
+                         args: argparse.Namespace) -> None:
+    """
+    Initializes a worker process of the scenario process pool by building the world object and the policy scenarios
+    of the example.
+
+    Args:
+        example_path: Path to directory with simulation files
+        seed_entropy: Entropy of the parent world object from which the generator of each world is derived
+        args: Command-line arguments of the parent world object
+    """
+    global worker_scenarios
+    init_world_worker(example_path, seed_entropy, args)
+    worker_scenarios = get_scenarios(example_path)
+
+
+def run_scenario_worker(
+        world: int) -> Tuple[Dict[str, Dict[str, List[int]]], Dict[int, Dict]]:
+    """
+    Simulates a single world for every policy scenario in a worker process of the scenario process pool.
+
+    Args:
+        world: Index of the world
+
+    Returns:
+        State histories of the scenarios of the world and the statistics collected for the world
+    """
+    sdicts = worker_world_obj.scenario_world(world, worker_scenarios)
+    stats_dict = {}
+    if world in Stats.get_dict():
+        stats_dict[world] = Stats.get_dict().pop(world)
+    return sdicts, stats_dict
@@ -128,6 +128,23 @@ class TestExamples(unittest.TestCase):
             raise Exception('Example {0} could not be run!'.format(example))
         print('Statistics Testing : {0} - complete'.format(example))
 
+    # Parallel worlds
+    def test_parallel_worlds(self):
+        """
+        Running worlds on a process pool
+        """
+        example_path = osp.join('examples', 'Basic_Disease_Models',
+                                'Example_1')
+        main_path = osp.join('episimmer', 'main.py')
+        process = subprocess.run('python3 {0} {1} -np -w 2'.format(
+            main_path, example_path),
+                                 shell=True,
+                                 stdout=subprocess.DEVNULL)
+        if process.returncode:
+            raise Exception(
+                'Example {0} could not be run!'.format(example_path))
+        print('Parallel Worlds Testing : {0} - complete'.format(example_path))
+
 
 if __name__ == '__main__':
     unittest.main()
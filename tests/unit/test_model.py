@@ -1,8 +1,13 @@
 import os.path as osp
+import tempfile
 import unittest
 
-from episimmer import Agent, Location, ReadAgents
-from episimmer.model import BaseModel, ScheduledModel, StochasticModel
+import numpy as np
+
+from episimmer import Agent, Location, ReadAgents, ReadInteractions
+from episimmer.model import (BaseModel, ContactProbabilityTable, EventTable,
+                             ScheduledModel, StochasticModel)
+from episimmer.utils.time import Time
 
 
 class TestModel(unittest.TestCase):
@@ -62,6 +67,69 @@ class TestModel(unittest.TestCase):
         base_model.update_event_infection(event_info, location, agents_obj)
         self.assertListEqual(agent2.event_probabilities, [0.02])
 
+    def test_event_table(self):
+        agents_obj = ReadAgents('', None)
+        agents_obj.create_agents([{'Agent Index': str(i)} for i in range(4)])
+        agents = agents_obj.agents
+        for agent, state in zip(
+                agents.values(),
+            ['Infected', 'Infected', 'Susceptible', 'Susceptible']):
+            agent.initialize_state(state)
+        agents['1'].update_contribute_infection(0.0)
+        agents['3'].protect()
+        locations = [Location({'Location Index': str(i)}) for i in range(2)]
+        locations[0].add_event({'Agents': ['0', '1', '2', '3']})
+        locations[1].add_event({'Agents': ['1', '2']})
+        locations[1].lock_down_state = True
+
+        event_table = EventTable(locations, agents_obj)
+        np.testing.assert_array_equal(event_table.indptr, [0, 4, 6])
+        np.testing.assert_array_equal(event_table.agent_ids,
+                                      [0, 1, 2, 3, 1, 2])
+        event_table.draw(np.random.default_rng(0))
+        self.assertListEqual(locations[0].events[0]['_can_contrib'],
+                             ['0', '2', '3'])
+        self.assertListEqual(locations[0].events[0]['_can_receive'],
+                             ['0', '1', '2'])
+
+        def contribute_fn(agent, e_info, loc, current_time_step):
+            return 1.0 if agent.state == 'Infected' else 0.0
+
+        def receive_fn(agent, ambient_infection, e_info, loc,
+                       current_time_step):
+            return ambient_infection * 0.3
+
+        def batch_contribute_fn(states, event_ids, events, locs,
+                                current_time_step):
+            return np.where(states == 'Infected', 1.0, 0.0)
+
+        def batch_receive_fn(states, ambient_infection, event_ids, events,
+                             locs, current_time_step):
+            return ambient_infection * 0.3
+
+        base_model = BaseModel('Test')
+        base_model.set_event_contribution_fn(contribute_fn)
+        base_model.set_event_receive_fn(receive_fn)
+        base_model.update_events_infection(event_table, agents_obj)
+        self.assertListEqual(agents['1'].event_probabilities, [0.3])
+
+        self.assertRaises(TypeError, base_model.set_event_receive_fn,
+                          receive_fn, True)
+        base_model.set_event_contribution_fn(batch_contribute_fn, True)
+        self.assertRaises(TypeError, base_model.update_events_infection,
+                          event_table, agents_obj)
+        base_model.set_event_receive_fn(batch_receive_fn, True)
+        Time.reset()
+        Time.new_world()
+        base_model.update_events_infection(event_table, agents_obj)
+        self.assertTrue(event_table.is_computed())
+        for index in ['0', '1', '2', '3']:
+            p_not_inf = 1.0
+            for p in agents[index].event_probabilities:
+                p_not_inf *= 1 - p
+            self.assertAlmostEqual(
+                event_table.get_not_infected_prob(agents[index]), p_not_inf)
+
     def test_get_final_infection_prob(self):
         base_model = BaseModel('Test')
         agent0 = Agent(None, {'Agent Index': '0'})
@@ -186,6 +254,159 @@ class TestModel(unittest.TestCase):
         self.assertWarns(UserWarning, stoch_model.p_infection, None,
                          [0.1, 0.2])
 
+    def test_transmission_states(self):
+        self.assertIsNone(BaseModel('Test').get_susceptible_states())
+
+        stoch_model = StochasticModel(['Susceptible', 'Infected', 'Recovered'],
+                                      ['Infected'], {
+                                          'Susceptible': 0.99,
+                                          'Infected': 0.01,
+                                          'Recovered': 0.0
+                                      })
+        stoch_model.set_transition('Infected', 'Recovered',
+                                   stoch_model.p_standard(0.2))
+        stoch_model.set_transition(
+            'Susceptible', 'Infected',
+            stoch_model.p_infection(
+                ContactProbabilityTable({
+                    'Infected': 0.1,
+                    'Recovered': 0.0
+                })))
+        self.assertListEqual(stoch_model.get_susceptible_states(),
+                             ['Susceptible'])
+        self.assertListEqual(stoch_model.get_infectious_states(), ['Infected'])
+
+        stoch_model.set_transition(
+            'Susceptible', 'Infected',
+            stoch_model.p_infection(lambda a, b, c, d: 0.1))
+        self.assertListEqual(stoch_model.get_susceptible_states(),
+                             ['Susceptible'])
+        self.assertIsNone(stoch_model.get_infectious_states())
+
+        stoch_model.set_transition('Recovered', 'Susceptible',
+                                   lambda agent, agents: 0.1)
+        self.assertIsNone(stoch_model.get_susceptible_states())
+
+        sched_model = ScheduledModel()
+        sched_model.insert_state('Susceptible', None, None,
+                                 sched_model.p_infection({'Infected': 1}),
+                                 False, 0.99)
+        sched_model.insert_state('Infected', 6, 3,
+                                 sched_model.scheduled({'Recovered': 1}), True,
+                                 0.01)
+        self.assertListEqual(sched_model.get_susceptible_states(),
+                             ['Susceptible'])
+
+    def test_idle_states(self):
+        self.assertIsNone(BaseModel('Test').get_idle_states())
+
+        stoch_model = StochasticModel(['Susceptible', 'Infected', 'Recovered'],
+                                      ['Infected'], {
+                                          'Susceptible': 0.99,
+                                          'Infected': 0.01,
+                                          'Recovered': 0
+                                      })
+        stoch_model.set_transition('Susceptible', 'Infected',
+                                   stoch_model.p_infection())
+        stoch_model.set_transition('Infected', 'Recovered',
+                                   stoch_model.p_standard(0.2))
+        stoch_model.set_transition('Recovered', 'Susceptible',
+                                   stoch_model.p_function(lambda x: 0.0))
+        self.assertListEqual(stoch_model.get_idle_states(),
+                             ['Susceptible', 'Recovered'])
+
+        stoch_model.set_external_prevalence_fn(lambda agent, time_step: 0.1)
+        self.assertListEqual(stoch_model.get_idle_states(), ['Recovered'])
+
+        sched_model = ScheduledModel()
+        sched_model.insert_state('Susceptible', None, None,
+                                 sched_model.p_infection({'Infected': 1}),
+                                 False, 0.99)
+        sched_model.insert_state('Infected', 6, 3,
+                                 sched_model.scheduled({'Recovered': 1}), True,
+                                 0.01)
+        sched_model.insert_state('Recovered', 0, 0,
+                                 sched_model.scheduled({'Recovered': 1}),
+                                 False, 0)
+        self.assertListEqual(sched_model.get_idle_states(),
+                             ['Susceptible', 'Recovered'])
+
+    def test_absorbing_states(self):
+        self.assertIsNone(BaseModel('Test').get_absorbing_states())
+
+        stoch_model = StochasticModel(['Susceptible', 'Infected', 'Recovered'],
+                                      ['Infected'], {
+                                          'Susceptible': 0.99,
+                                          'Infected': 0.01,
+                                          'Recovered': 0
+                                      })
+        stoch_model.set_transition('Susceptible', 'Infected',
+                                   stoch_model.p_infection())
+        stoch_model.set_transition('Infected', 'Recovered',
+                                   stoch_model.p_standard(0.2))
+        self.assertListEqual(stoch_model.get_absorbing_states(),
+                             ['Susceptible', 'Recovered'])
+
+        stoch_model.set_transition('Recovered', 'Susceptible',
+                                   stoch_model.p_function(lambda x: 0.0))
+        self.assertListEqual(stoch_model.get_absorbing_states(),
+                             ['Susceptible'])
+
+        sched_model = ScheduledModel()
+        sched_model.insert_state('Susceptible', 2, 1,
+                                 sched_model.p_infection({'Infected': 1}),
+                                 False, 0.99)
+        sched_model.insert_state('Infected', 6, 3,
+                                 sched_model.scheduled({'Recovered': 1}), True,
+                                 0.01)
+        sched_model.insert_state('Recovered', 0, 0,
+                                 sched_model.scheduled({'Recovered': 1}),
+                                 False, 0)
+        self.assertListEqual(sched_model.get_absorbing_states(),
+                             ['Susceptible', 'Recovered'])
+
+    def test_stoch_compile_transitions(self):
+        stoch_model = StochasticModel(['Susceptible', 'Infected', 'Recovered'],
+                                      ['Infected'], {
+                                          'Susceptible': 0.99,
+                                          'Infected': 0.01,
+                                          'Recovered': 0
+                                      })
+        stoch_model.set_transition('Susceptible', 'Infected',
+                                   stoch_model.p_infection())
+        stoch_model.set_transition('Infected', 'Recovered',
+                                   stoch_model.p_standard(0.2))
+        stoch_model.set_transition('Recovered', 'Susceptible',
+                                   stoch_model.p_function(lambda x: 0.1))
+
+        compiled = stoch_model.compile_transitions()
+        self.assertListEqual(sorted(compiled), ['Infected', 'Recovered'])
+        np.testing.assert_allclose(compiled['Infected'], [0, 0, 0.2])
+        np.testing.assert_allclose(compiled['Recovered'], [0.1, 0.1, 0.1])
+
+        stoch_model.set_rng(np.random.default_rng(0))
+        next_states = stoch_model.find_next_states('Infected',
+                                                   compiled['Infected'], 10000)
+        self.assertSetEqual(set(next_states), {'Infected', 'Recovered'})
+        self.assertAlmostEqual(next_states.count('Recovered') / 10000,
+                               0.2,
+                               delta=0.02)
+
+        class OverriddenModel(StochasticModel):
+            def find_next_state(self, agent, agents):
+                return 'Recovered', None
+
+        user_model = OverriddenModel(['Susceptible', 'Infected', 'Recovered'],
+                                     ['Infected'], {
+                                         'Susceptible': 0.99,
+                                         'Infected': 0.01,
+                                         'Recovered': 0
+                                     })
+        user_model.set_transition('Infected', 'Recovered',
+                                  user_model.p_standard(0.2))
+        self.assertDictEqual(user_model.compile_transitions(), {})
+        self.assertIsNone(user_model.get_infection_fns())
+
     def test_sched_insert_state(self):
         sched_model = ScheduledModel()
         self.assertRaises(TypeError, sched_model.insert_state, 1, None, None,
@@ -269,6 +490,214 @@ class TestModel(unittest.TestCase):
         self.assertWarns(UserWarning, sched_model.p_infection, new_states,
                          None, [0.1, 0.2])
 
+    def test_contact_probability_table(self):
+        self.assertRaises(TypeError, ContactProbabilityTable, [0.1])
+        self.assertRaises(TypeError, ContactProbabilityTable,
+                          {'Infected': 0.1}, 'duration')
+        self.assertRaises(TypeError, ContactProbabilityTable,
+                          {'Infected': [0.1]}, 'duration', [10])
+        self.assertRaises(ValueError, ContactProbabilityTable,
+                          {'Infected': 1.5})
+
+        table = ContactProbabilityTable(
+            {
+                'Infected': [0.1, 0.5],
+                'Exposed': [0.0, 1.0]
+            }, 'duration', [10])
+        base_model = BaseModel('Test')
+        base_model.set_external_prevalence_fn(lambda agent, time_step: 0.0)
+        base_model.contact_tables.append(table)
+
+        agents_obj = ReadAgents('', None)
+        agents_obj.create_agents([{'Agent Index': str(i)} for i in range(4)])
+        agents = agents_obj.agents
+        for index, state in [('0', 'Susceptible'), ('1', 'Infected'),
+                             ('2', 'Infected'), ('3', 'Exposed')]:
+            agents[index].initialize_state(state)
+        for index, contact_index, duration in [('0', '1', '5'),
+                                               ('0', '2', '20'),
+                                               ('1', '0', '20'), ('2', '3',
+                                                                  '5'),
+                                               ('3', '2', '30')]:
+            agents[index].add_contact({
+                'Agent Index': index,
+                'Interacting Agent Index': contact_index,
+                'duration': duration
+            })
+
+        Time.reset()
+        Time.new_world()
+        expected = {}
+        for index in ['0', '1', '2', '3']:
+            expected[index] = base_model.get_final_infection_prob(
+                table, None, agents[index], agents)
+        self.assertAlmostEqual(expected['0'], 1 - 0.9 * 0.5)
+        self.assertEqual(expected['2'], 0.0)
+
+        base_model.compute_contact_tables(agents_obj)
+        self.assertTrue(table.is_computed())
+        for index in ['0', '1', '2', '3']:
+            self.assertAlmostEqual(
+                base_model.get_final_infection_prob(table, None, agents[index],
+                                                    agents), expected[index])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            interactions_filename = osp.join(temp_dir, 'interactions.txt')
+            with open(interactions_filename, 'w') as f:
+                f.write('5\nAgent Index:Interacting Agent Index:duration\n')
+                for agent in agents.values():
+                    for c_dict in agent.contact_list:
+                        f.write(':'.join(c_dict.values()) + '\n')
+            edge_filename = ReadInteractions.write_edge_file(
+                interactions_filename, list(agents))
+            edges = np.load(edge_filename, mmap_mode='r')
+            self.assertListEqual(list(edges['Agent Index']), [0, 0, 1, 2, 3])
+
+            agents_obj.edge_files = [edges]
+            for agent in agents.values():
+                agent.contact_list = []
+            table.edge_chunk_size = 2
+            Time.increment_current_time_step()
+            base_model.compute_contact_tables(agents_obj)
+            for index in ['0', '1', '2', '3']:
+                self.assertAlmostEqual(
+                    base_model.get_final_infection_prob(
+                        table, None, agents[index], agents), expected[index])
+
+            state_types = ['Susceptible', 'Infected', 'Exposed']
+            states = np.array(
+                [[state_types.index(agent.state)
+                  for agent in agents.values()]] * 2)
+            infection_prob = table.compute_batch(
+                states, state_types, table.get_batch_contacts(agents_obj))
+            self.assertTupleEqual(infection_prob.shape, (2, 4))
+            for i, index in enumerate(agents):
+                self.assertAlmostEqual(infection_prob[1, i], expected[index])
+            del edges
+            agents_obj.edge_files = []
+
+        agents['1'].initialize_state('Recovered')
+        agents_obj.remove_agent('2')
+        np.testing.assert_array_equal(
+            table.get_agent_rows(agents_obj, list(table.table)), [2, 2, 2, 1])
+
+    def test_batch_states(self):
+        table = ContactProbabilityTable({'Infected': 0.1})
+        stoch_model = StochasticModel(['Susceptible', 'Infected', 'Recovered'],
+                                      ['Infected'], {
+                                          'Susceptible': 0.5,
+                                          'Infected': 0.5,
+                                          'Recovered': 0
+                                      })
+        stoch_model.set_transition('Susceptible', 'Infected',
+                                   stoch_model.p_infection(table))
+        stoch_model.set_transition('Infected', 'Recovered',
+                                   stoch_model.p_standard(1.0))
+
+        states, schedule_time_left = stoch_model.initialize_batch_states(3, 4)
+        self.assertTupleEqual(states.shape, (3, 4))
+        self.assertTrue(np.isin(states, [0, 1]).all())
+        self.assertTrue(np.isnan(schedule_time_left).all())
+
+        states = np.array([[0, 0, 1, 2], [0, 1, 1, 2]])
+        infection_prob = np.array([[1.0, 0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 0.0]])
+        stoch_model.find_next_batch_states(states, schedule_time_left,
+                                           {table: infection_prob})
+        np.testing.assert_array_equal(states, [[1, 0, 2, 2], [0, 2, 2, 2]])
+
+        sched_model = ScheduledModel()
+        sched_model.insert_state(
+            'Susceptible', None, None,
+            sched_model.p_infection({'Infected': 1}, table), False, 0.5)
+        sched_model.insert_state('Infected', 6, 0,
+                                 sched_model.scheduled({'Recovered': 1}), True,
+                                 0.5)
+        sched_model.insert_state('Recovered', None, None,
+                                 sched_model.scheduled({'Recovered': 1}),
+                                 False, 0)
+
+        states = np.array([[0, 0, 1, 1]])
+        schedule_time_left = np.array([[np.nan, np.nan, np.nan, 2]])
+        sched_model.find_next_batch_states(states, schedule_time_left,
+                                           {table: np.array([[1.0, 0, 0, 0]])})
+        np.testing.assert_array_equal(states, [[1, 0, 2, 1]])
+        np.testing.assert_array_equal(schedule_time_left,
+                                      [[6, np.nan, np.nan, 2]])
+
+    def test_group_infection_prob(self):
+        base_model = BaseModel('Test')
+        base_model.set_external_prevalence_fn(lambda agent, time_step: 0.0)
+
+        def fn(p_infected_states_list, contact_agent, c_dict,
+               current_time_step):
+            if contact_agent.state == 'Infected':
+                return float(c_dict['beta'])
+            return 0.0
+
+        agents = {
+            str(i): Agent(None, {'Agent Index': str(i)})
+            for i in range(5)
+        }
+        for index, state in [('0', 'Susceptible'), ('1', 'Infected'),
+                             ('2', 'Infected'), ('3', 'Susceptible'),
+                             ('4', 'Infected')]:
+            agents[index].initialize_state(state)
+        group_info = {
+            'Agents': ['0', '1', '2', '3', '4'],
+            'beta': '0.3',
+            '_can_contrib': ['0', '1', '2', '3'],
+            '_can_receive': ['0', '1', '3', '4']
+        }
+        for index in group_info['_can_receive']:
+            agents[index].add_group(group_info)
+
+        Time.reset()
+        Time.new_world()
+        for index in group_info['_can_receive']:
+            p_not_inf = 1
+            for contact_index in group_info['_can_contrib']:
+                if contact_index != index:
+                    p_not_inf *= 1 - fn(None, agents[contact_index],
+                                        group_info, 0)
+            self.assertAlmostEqual(
+                base_model.get_final_infection_prob(fn, None, agents[index],
+                                                    agents), 1 - p_not_inf)
+
+        group_info['beta'] = '1'
+        group_info['_p_not_inf'] = {}
+        self.assertEqual(
+            base_model.get_final_infection_prob(fn, None, agents['0'], agents),
+            1.0)
+        self.assertEqual(
+            base_model.get_final_infection_prob(fn, None, agents['1'], agents),
+            1.0)
+        group_info['_can_contrib'] = ['0', '1']
+        group_info['_p_not_inf'] = {}
+        self.assertEqual(
+            base_model.get_final_infection_prob(fn, None, agents['1'], agents),
+            0.0)
+        self.assertRaises(TypeError, base_model.get_final_infection_prob, None,
+                          None, agents['1'], agents)
+
+    def test_set_rng(self):
+        stoch_model = StochasticModel(['Susceptible', 'Infected'],
+                                      ['Infected'], {
+                                          'Susceptible': 0.5,
+                                          'Infected': 0.5
+                                      })
+
+        def get_initial_states(seed):
+            agents = {
+                str(i): Agent(None, {'Agent Index': str(i)})
+                for i in range(50)
+            }
+            stoch_model.set_rng(np.random.default_rng(seed))
+            stoch_model.initialize_states(agents)
+            return [agent.state for agent in agents.values()]
+
+        self.assertListEqual(get_initial_states(1), get_initial_states(1))
+        self.assertNotEqual(get_initial_states(1), get_initial_states(2))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+import numpy as np
+
+from episimmer.utils.quantile import StreamingQuantiles
+
+
+class TestStreamingQuantiles(unittest.TestCase):
+    def test_invalid_quantiles(self):
+        self.assertRaises(ValueError, StreamingQuantiles, [0.5, 1], (2, ))
+        self.assertRaises(ValueError, StreamingQuantiles, [0], (2, ))
+
+    def test_few_observations(self):
+        quantiles_obj = StreamingQuantiles([0.1, 0.5, 0.9], (2, 3))
+        self.assertTrue(np.isnan(quantiles_obj.get_quantiles()).all())
+
+        rng = np.random.default_rng(0)
+        sample = rng.integers(0, 100, (5, 2, 3))
+        for count in range(1, 6):
+            quantiles_obj.add(sample[count - 1])
+            np.testing.assert_allclose(
+                quantiles_obj.get_quantiles(),
+                np.percentile(sample[:count], [10, 50, 90], axis=0))
+
+    def test_percentiles(self):
+        rng = np.random.default_rng(0)
+        sample = np.concatenate([
+            rng.normal(50, 10, (2000, 2)),
+            rng.exponential(10, (2000, 1)),
+            rng.integers(0, 20, (2000, 1))
+        ],
+                                axis=1)
+        percentiles = [5, 25, 50, 75, 95]
+        quantiles_obj = StreamingQuantiles(
+            [percentile / 100 for percentile in percentiles], (4, ))
+        for x in sample:
+            quantiles_obj.add(x)
+
+        estimates = quantiles_obj.get_quantiles()
+        self.assertEqual(estimates.shape, (5, 4))
+        np.testing.assert_allclose(estimates,
+                                   np.percentile(sample, percentiles, axis=0),
+                                   atol=1.5)
+        self.assertTrue((np.diff(estimates, axis=0) >= 0).all())
@@ -1,11 +1,17 @@
+import os
 import os.path as osp
+import shutil
+import tempfile
 import unittest
 
+import numpy as np
+
 from episimmer.read_file import (ReadAgents, ReadConfiguration, ReadEvents,
-                                 ReadInteractions, ReadLocations,
-                                 ReadOneTimeEvents,
+                                 ReadGroupInteractions, ReadInteractions,
+                                 ReadLocations, ReadOneTimeEvents,
                                  ReadProbabilisticInteractions,
-                                 ReadVDConfiguration)
+                                 ReadVDConfiguration, WorldBundle)
+from episimmer.utils.file_cache import FileCache
 
 
 class TestReadFile(unittest.TestCase):
@@ -46,7 +52,10 @@ class TestReadFile(unittest.TestCase):
             'events_files_list_list':
             ['event_files_list.txt', 'event_files_list2.txt'],
             'one_time_event_file':
-            'one_time_event.txt'
+            'one_time_event.txt',
+            'group_interactions_files_list_list': [''],
+            'bundle':
+            None
         }
         self.assertDictEqual(target_dict, config_obj.__dict__)
 
@@ -148,6 +157,137 @@ class TestReadFile(unittest.TestCase):
             3: ['0:1,2,3']
         })
 
+    def test_reset_agents_locations(self):
+        example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
+        config_filename = osp.join(example_path, 'config.txt')
+        config_obj = ReadConfiguration(config_filename)
+        agents_filename, _, _, locations_filename, _, _ = config_obj.get_file_paths(
+            example_path)
+
+        agents_obj = ReadAgents(agents_filename, config_obj)
+        locations_obj = ReadLocations(locations_filename, config_obj)
+        agent = agents_obj.agents['0']
+        agent.initialize_state('Infected', 3)
+        agent.add_contact({'Agent Index': '0', 'Interacting Agent Index': '1'})
+        agent.protect()
+        agent.policy_dict['Testing']['History'].append('Positive')
+        agents_obj.agents.pop('1')
+        location = locations_obj.locations['0']
+        location.add_event({'Location Index': '0', 'Agents': ['0']})
+
+        agents_obj.reset()
+        locations_obj.reset()
+
+        self.assertEqual(len(agents_obj.agents), 10)
+        self.assertIs(agents_obj.agents['0'], agent)
+        self.assertIsNone(agent.state)
+        self.assertIsNone(agent.schedule_time_left)
+        self.assertListEqual(agent.contact_list, [])
+        self.assertFalse(agent.under_protection)
+        self.assertListEqual(agent.get_policy_history('Testing'), [])
+        self.assertListEqual(location.events, [])
+
+    def test_read_agents_columnar(self):
+        example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
+        config_filename = osp.join(example_path, 'config.txt')
+        config_obj = ReadConfiguration(config_filename)
+        agents_filename, _, _, _, _, _ = config_obj.get_file_paths(
+            example_path)
+
+        agents_obj = ReadAgents(agents_filename, config_obj, columnar=True)
+        store = agents_obj.store
+        self.assertEqual(store.n, 10)
+        self.assertListEqual(list(agents_obj.agents), store.indices)
+
+        agent = agents_obj.agents['3']
+        self.assertEqual(agent.id, store.ids['3'])
+        agent.initialize_state('Infected', 3)
+        agent.update_receive_infection(0.5)
+        agent.protect()
+        self.assertEqual(agent.state, 'Infected')
+        self.assertEqual(agent.schedule_time_left, 2)
+        self.assertEqual(store.schedule_expiry[agent.id], 2)
+        self.assertEqual(store.state[agent.id], store.state_codes['Infected'])
+        self.assertEqual(store.can_receive_infection[agent.id], 0.5)
+        self.assertTrue(store.under_protection[agent.id])
+
+        self.assertListEqual(list(agents_obj.touched_agents), ['3'])
+        agents_obj.new_time_step()
+        self.assertEqual(store.can_receive_infection[agent.id], 1.0)
+        self.assertDictEqual(agents_obj.touched_agents, {})
+
+        agent.set_next_state(('Recovered', None))
+        agent.update_state()
+        self.assertEqual(agent.state, 'Recovered')
+        self.assertIsNone(agent.next_state)
+        self.assertIsNone(agent.schedule_time_left)
+
+        agents_obj.reset()
+        self.assertIsNone(agent.state)
+        self.assertEqual(agent.can_receive_infection, 1.0)
+        self.assertFalse(agent.under_protection)
+
+    def test_infection_restrictions(self):
+        example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
+        config_filename = osp.join(example_path, 'config.txt')
+        config_obj = ReadConfiguration(config_filename)
+        agents_filename, _, _, _, _, _ = config_obj.get_file_paths(
+            example_path)
+
+        agents_obj = ReadAgents(agents_filename, config_obj)
+        store = agents_obj.store
+        agents = agents_obj.agents
+        agents['2'].update_contribute_infection(0.25)
+        agents['3'].update_receive_infection(0.5)
+        agents['4'].protect()
+        agents['5'].can_receive_infection = 0.75
+        agents_obj.remove_agent('6')
+        agents_obj.agents.pop('7')
+
+        can_contribute, can_receive = agents_obj.get_infection_restrictions()
+        expected_contribute = np.ones(10)
+        expected_receive = np.ones(10)
+        expected_contribute[store.ids['2']] = 0.25
+        expected_receive[store.ids['3']] = 0.5
+        expected_receive[store.ids['4']] = 0.0
+        expected_receive[store.ids['5']] = 0.75
+        for index in ['6', '7']:
+            expected_contribute[store.ids[index]] = 0.0
+            expected_receive[store.ids[index]] = 0.0
+        np.testing.assert_array_equal(can_contribute, expected_contribute)
+        np.testing.assert_array_equal(can_receive, expected_receive)
+
+        agents_obj.new_time_step()
+        agents_obj.reset()
+        can_contribute, can_receive = agents_obj.get_infection_restrictions()
+        np.testing.assert_array_equal(can_contribute, np.ones(10))
+        np.testing.assert_array_equal(can_receive, np.ones(10))
+
+    def test_state_mask(self):
+        example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
+        config_filename = osp.join(example_path, 'config.txt')
+        config_obj = ReadConfiguration(config_filename)
+        agents_filename, _, _, _, _, _ = config_obj.get_file_paths(
+            example_path)
+
+        agents_obj = ReadAgents(agents_filename, config_obj)
+        agents = agents_obj.agents
+        for i, agent in enumerate(agents.values()):
+            agent.initialize_state(['Susceptible', 'Infected',
+                                    'Recovered'][i % 3])
+        agents['0'].set_next_state(('Infected', None))
+        agents['0'].update_state()
+        agents['1'].state = 'Recovered'
+        agents_obj.remove_agent('4')
+
+        order, _ = agents_obj.get_agent_ids()
+        for states in [['Infected'], ['Susceptible', 'Recovered'], ['Exposed'],
+                       []]:
+            np.testing.assert_array_equal(agents_obj.get_state_mask(states), [
+                index in agents and agents[index].state in states
+                for index in order
+            ])
+
     def test_read_interactions(self):
         example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
         config_filename = osp.join(example_path, 'config.txt')
@@ -191,6 +331,100 @@ class TestReadFile(unittest.TestCase):
         }
         self.assertDictEqual(contacts_dict, target_dict)
 
+    def test_step_contacts(self):
+        example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
+        config_filename = osp.join(example_path, 'config.txt')
+        config_obj = ReadConfiguration(config_filename)
+        agents_filename = config_obj.get_file_paths(example_path)[0]
+        interactions_filename = osp.join(example_path,
+                                         'interactions_list2.txt')
+
+        agents_obj = ReadAgents(agents_filename, config_obj)
+        agents = agents_obj.agents
+        contacts = agents_obj.contacts
+        ReadInteractions(interactions_filename, config_obj, agents_obj)
+        agents['2'].add_contact({
+            'Agent Index': '2',
+            'Interacting Agent Index': '1',
+            'duration': '7'
+        })
+        ReadInteractions(interactions_filename, config_obj, agents_obj)
+
+        block = contacts.get_block()
+        self.assertTrue((np.diff(block.receivers) >= 0).all())
+        self.assertListEqual(
+            [contact_index for contact_index, _ in agents['2'].get_contacts()],
+            ['4', '3', '1', '4', '3'])
+        np.testing.assert_array_equal(
+            block.get_column('duration'),
+            [float(c_dict['duration']) for c_dict in block.records])
+        self.assertListEqual(
+            agents['1'].contact_list,
+            [c_dict for _, c_dict in agents['1'].get_contacts()])
+
+        contacts.select(block.senders != agents_obj.store.ids['4'])
+        self.assertListEqual(
+            [c_dict['duration'] for c_dict in agents['2'].contact_list],
+            ['5', '7', '5'])
+        np.testing.assert_array_equal(
+            contacts.get_block().get_column('duration'),
+            [12, 12, 5, 7, 5, 1, 1])
+
+        agents['2'].contact_list = []
+        self.assertListEqual(agents['2'].get_contacts(), [])
+        self.assertEqual(len(agents['1'].contact_list), 2)
+        np.testing.assert_array_equal(contacts.indptr[-1], 4)
+
+        agents_obj.remove_agent('9')
+        agents_obj.new_time_step()
+        ReadInteractions(interactions_filename, config_obj, agents_obj)
+        self.assertListEqual(agents['8'].contact_list, [])
+        self.assertEqual(len(contacts.get_block()), 4)
+
+    def test_file_cache(self):
+        example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
+        config_filename = osp.join(example_path, 'config.txt')
+        config_obj = ReadConfiguration(config_filename)
+        agents_filename = config_obj.get_file_paths(example_path)[0]
+        interactions_filename = osp.join(example_path,
+                                         'interactions_list2.txt')
+        agents_obj = ReadAgents(agents_filename, config_obj)
+
+        FileCache.clear()
+        ReadInteractions(interactions_filename, config_obj, agents_obj)
+        contacts = list(agents_obj.agents['1'].contact_list)
+        self.assertEqual(len(FileCache.entries), 1)
+        self.assertGreater(FileCache.memory_used, 0)
+
+        agents_obj.reset()
+        ReadInteractions(interactions_filename, config_obj, agents_obj)
+        self.assertEqual(agents_obj.agents['1'].contact_list, contacts)
+        self.assertIs(agents_obj.agents['1'].contact_list[0], contacts[0])
+
+        stat = os.stat(interactions_filename)
+        os.utime(interactions_filename,
+                 ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        try:
+            self.assertIsNone(
+                FileCache.get('Interactions', interactions_filename))
+            self.assertEqual(FileCache.memory_used, 0)
+        finally:
+            os.utime(interactions_filename,
+                     ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        ReadInteractions(interactions_filename, config_obj, agents_obj)
+        FileCache.set_memory_budget(0)
+        self.assertEqual(len(FileCache.entries), 0)
+        FileCache.set_memory_budget(256)
+
+        events_filename = osp.join(example_path, 'non_empty_event.txt')
+        ReadEvents.prefetch_file(events_filename, config_obj)
+        ReadInteractions.prefetch_file(interactions_filename, config_obj)
+        self.assertEqual(len(FileCache.entries), 2)
+        event_info_keys, records = FileCache.get('Events', events_filename)
+        self.assertEqual(event_info_keys, config_obj.event_info_keys)
+        self.assertEqual(records[0][0], '0')
+
     def test_read_prob_interactions(self):
         example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
         config_filename = osp.join(example_path, 'config.txt')
@@ -225,20 +459,71 @@ class TestReadFile(unittest.TestCase):
                     contact_dict['Interacting Agent Index'])
 
         target_dict = {
-            '0': ['2'],
-            '1': ['3', '5', '2'],
-            '2': ['3', '5', '1', '0', '4', '6'],
-            '3': ['5', '1', '2'],
-            '4': ['5', '2', '6', '6', '8'],
-            '5': ['3', '1', '2', '4'],
-            '6': ['2', '4', '4'],
+            '0': ['1', '2'],
+            '1': ['3', '5', '2', '0', '2'],
+            '2': ['3', '5', '1', '0', '1', '4', '6'],
+            '3': ['5', '1', '2', '6'],
+            '4': ['2', '6'],
+            '5': ['3', '1', '2'],
+            '6': ['3', '2', '4'],
             '7': [],
-            '8': ['4'],
+            '8': [],
             '9': []
         }
 
+        # The contacts of a line share the information dictionary of the line
+        records = [
+            c_dict for _, c_dict in agents_obj.agents['2'].get_contacts()
+        ]
+        self.assertIs(records[0], records[1])
+        self.assertDictEqual(records[0], {'duration': '4'})
+        self.assertDictEqual(agents_obj.agents['2'].contact_list[0], {
+            'duration': '4',
+            'Agent Index': '2',
+            'Interacting Agent Index': '3'
+        })
         self.assertDictEqual(contacts_dict, target_dict)
 
+    def test_sample_pairs(self):
+        reader = ReadProbabilisticInteractions('', None, None,
+                                               np.random.default_rng(0))
+        rows, columns = reader.sample_pairs(4, 1.0)
+        self.assertListEqual(list(zip(rows, columns)), [(0, 1), (0, 2), (0, 3),
+                                                        (1, 2), (1, 3),
+                                                        (2, 3)])
+        rows, columns = reader.sample_pairs(4, 0.0)
+        self.assertEqual(len(rows), 0)
+
+        rows, columns = reader.sample_pairs(200, 0.1)
+        pairs = list(zip(rows, columns))
+        self.assertListEqual(pairs, sorted(set(pairs)))
+        self.assertTrue(all(0 <= i < j < 200 for i, j in pairs))
+        self.assertAlmostEqual(len(pairs) / (200 * 199 / 2), 0.1, delta=0.01)
+
+    def test_read_group_interactions(self):
+        example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
+        config_filename = osp.join(example_path, 'config.txt')
+        config_obj = ReadConfiguration(config_filename)
+        agents_filename = config_obj.get_file_paths(example_path)[0]
+        agents_obj = ReadAgents(agents_filename, config_obj)
+        self.assertListEqual(config_obj.get_group_interaction_files_list(), [])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            groups_filename = osp.join(temp_dir, 'groups.txt')
+            with open(groups_filename, 'w') as f:
+                f.write('2\nAgents:Room\n0,1,2,2,15,:A\n3,4:B\n')
+            groups_obj = ReadGroupInteractions(groups_filename, config_obj,
+                                               agents_obj)
+
+        self.assertEqual(groups_obj.no_groups, 2)
+        self.assertListEqual(agents_obj.groups, [{
+            'Agents': ['0', '1', '2'],
+            'Room': 'A'
+        }, {
+            'Agents': ['3', '4'],
+            'Room': 'B'
+        }])
+
     def test_read_events(self):
         example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
         config_filename = osp.join(example_path, 'config.txt')
@@ -276,6 +561,79 @@ class TestReadFile(unittest.TestCase):
         self.assertListEqual(events_dict['1'], ['1', '3', '5', '7', '9'])
         self.assertListEqual(events_dict['2'], ['2', '4', '6', '8'])
 
+        events_obj = ReadEvents('', config_obj, locations_obj, agents_obj)
+        events_obj.parameter_keys = ['Location Index', 'Agents']
+        location_index, info_dict = events_obj.get_event(['1', '3,10,5,3,'])
+        self.assertEqual(location_index, '1')
+        self.assertListEqual(info_dict['Agents'], ['3', '5'])
+
+    def test_world_bundle(self):
+        def read_world(example_path):
+            config_obj = ReadConfiguration(osp.join(example_path,
+                                                    'config.txt'))
+            agents_filename, interactions_files_list_filename, \
+                events_files_list_filename, locations_filename, \
+                one_time_event_file, \
+                probabilistic_interactions_files_list_filename = config_obj.get_file_paths(example_path)
+            interaction_files_list_of_list, event_files_list_of_list, _ = config_obj.get_file_names_list(
+                example_path, interactions_files_list_filename,
+                events_files_list_filename,
+                probabilistic_interactions_files_list_filename)
+
+            agents_obj = ReadAgents(agents_filename, config_obj)
+            locations_obj = ReadLocations(locations_filename, config_obj)
+            for interaction_files_list in interaction_files_list_of_list:
+                for interactions_filename in interaction_files_list:
+                    ReadInteractions(interactions_filename, config_obj,
+                                     agents_obj)
+            for event_files_list in event_files_list_of_list:
+                for events_filename in event_files_list:
+                    ReadEvents(events_filename, config_obj, locations_obj,
+                               agents_obj)
+
+            contacts_dict = {
+                agent.index: agent.contact_list
+                for agent in agents_obj.agents.values()
+            }
+            events_dict = {
+                location.index: location.events
+                for location in locations_obj.locations.values()
+            }
+            return config_obj, contacts_dict, events_dict
+
+        example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bundle_path = osp.join(temp_dir, 'Complete_Interaction_Space')
+            shutil.copytree(example_path, bundle_path)
+            bundle_filename = WorldBundle.compile_example(bundle_path)
+            self.assertEqual(
+                osp.join(bundle_path, WorldBundle.bundle_filename),
+                bundle_filename)
+
+            FileCache.clear()
+            config_obj, contacts_dict, events_dict = read_world(bundle_path)
+            self.assertIsNotNone(config_obj.bundle)
+            self.assertIsNotNone(
+                config_obj.get_bundled_file(
+                    osp.join(bundle_path, 'interactions_list.csv')))
+            _, target_contacts_dict, target_events_dict = read_world(
+                example_path)
+            self.assertDictEqual(contacts_dict, target_contacts_dict)
+            self.assertDictEqual(events_dict, target_events_dict)
+
+            os.remove(bundle_filename)
+            self.assertEqual(
+                config_obj.get_bundled_file(
+                    osp.join(bundle_path, 'interactions_list.csv')),
+                WorldBundle.read_text_file(
+                    osp.join(example_path, 'interactions_list.csv')))
+
+            agents_filename = osp.join(bundle_path, 'agents.csv')
+            stat = os.stat(agents_filename)
+            os.utime(agents_filename,
+                     ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            self.assertIsNone(config_obj.get_bundled_file(agents_filename))
+
     def test_read_one_time_events(self):
         example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
         config_filename = osp.join(example_path, 'config.txt')
@@ -313,6 +671,30 @@ class TestReadFile(unittest.TestCase):
         self.assertDictEqual(one_time_event_helper(1),
                              one_time_event_helper(3))
 
+        self.assertIs(one_time_event_obj.events_table[1][0][1],
+                      one_time_event_obj.events_table[3][0][1])
+
+        # Worlds with different removed agents
+        agents_obj.reset()
+        locations_obj.reset()
+        del agents_obj.agents['5']
+        self.assertListEqual(
+            one_time_event_helper(0)['1'], ['4', '6', '7', '8', '9'])
+
+        agents_obj.reset()
+        locations_obj.reset()
+        del agents_obj.agents['6']
+        self.assertListEqual(
+            one_time_event_helper(0)['1'], ['4', '5', '7', '8', '9'])
+
+        agents_obj.reset()
+        locations_obj.reset()
+        self.assertListEqual(
+            one_time_event_helper(0)['1'], ['4', '5', '6', '7', '8', '9'])
+        self.assertListEqual(
+            one_time_event_obj.events_table[0][0][1]['Agents'],
+            ['4', '5', '6', '7', '8', '9'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,348 @@
+import copy
+import os.path as osp
+import tempfile
+import unittest
+from itertools import chain
+from unittest import mock
+
+import numpy as np
+
+from episimmer import (Agent, ReadAgents, ReadConfiguration, ReadInteractions,
+                       ReadLocations, ReadOneTimeEvents)
+from episimmer.model import (ContactProbabilityTable, ScheduledModel,
+                             StochasticModel)
+from episimmer.policy import lockdown_policy
+from episimmer.simulate import Simulate
+from episimmer.utils.arg_parser import get_default_args
+from episimmer.utils.time import Time
+
+
+class TestSimulate(unittest.TestCase):
+    def setUp(self):
+        self.example_path = osp.join('tests', 'unit',
+                                     'Complete_Interaction_Space')
+        self.config_obj = ReadConfiguration(
+            osp.join(self.example_path, 'config.txt'))
+        agents_filename, _, _, locations_filename, _, _ = self.config_obj.get_file_paths(
+            self.example_path)
+        self.agents_obj = ReadAgents(agents_filename, self.config_obj)
+        self.locations_obj = ReadLocations(locations_filename, self.config_obj)
+        Time.reset()
+
+    def tearDown(self):
+        Time.reset()
+
+    def test_timer_wheel(self):
+        sched_model = ScheduledModel()
+        sched_model.insert_state('Susceptible', None, None,
+                                 sched_model.p_infection({'Infected': 1}),
+                                 False, 0.4)
+        sched_model.insert_state('Infected', 3, 2,
+                                 sched_model.scheduled({'Recovered': 1}), True,
+                                 0.4)
+        sched_model.insert_state('Recovered', 2, 1,
+                                 sched_model.scheduled({'Infected': 1}), False,
+                                 0.2)
+        sim_obj = Simulate(self.config_obj, sched_model, [], self.agents_obj,
+                           self.locations_obj, np.random.default_rng(7))
+
+        # Schedule times left as counted down in every time step by the agents
+        schedule_time_left = {}
+        initialize_state = Agent.initialize_state
+
+        def record_initial_state(agent, state, time_left=None):
+            schedule_time_left[agent.index] = time_left
+            initialize_state(agent, state, time_left)
+
+        Time.new_world(0)
+        with mock.patch.object(Agent,
+                               'initialize_state',
+                               autospec=True,
+                               side_effect=record_initial_state):
+            sim_obj.on_start_simulation()
+        self.assertIsNotNone(sim_obj.timer_wheel)
+
+        agents = self.agents_obj.agents
+        handled_scheduled = 0
+        for time_step in range(20):
+            for index, time_left in schedule_time_left.items():
+                if time_left is not None:
+                    time_left -= 1
+                    schedule_time_left[
+                        index] = time_left if time_left > 0 else None
+            for index, agent in agents.items():
+                self.assertEqual(agent.schedule_time_left,
+                                 schedule_time_left[index])
+
+            # Susceptible agents without a running countdown are only due when exposed to infection
+            sim_obj.exposed_agents = {
+                index
+                for index in agents if int(index) % 3 == time_step % 3
+            }
+            due_agents = sim_obj.get_due_agents(time_step)
+            self.assertListEqual([agent.index for agent in due_agents], [
+                index
+                for index in agents if schedule_time_left[index] is None and
+                (agents[index].state != 'Susceptible'
+                 or index in sim_obj.exposed_agents)
+            ])
+
+            for agent in due_agents:
+                sim_obj.handle_time_step_as_agent(agent)
+                sim_obj.convert_state(agent)
+                schedule_time_left[agent.index] = agent.schedule_time_left
+                if agent.schedule_time_left is not None:
+                    handled_scheduled += 1
+                    self.assertEqual(agent.schedule_expiry,
+                                     time_step + agent.schedule_time_left)
+            sim_obj.schedule_agents(due_agents, time_step)
+            Time.increment_current_time_step()
+
+        self.assertGreater(handled_scheduled, 0)
+
+    def run_world(self, interactions_filename, fn, frontier=False):
+        stoch_model = StochasticModel(['Susceptible', 'Infected', 'Recovered'],
+                                      ['Infected'], {
+                                          'Susceptible': 0.8,
+                                          'Infected': 0.2,
+                                          'Recovered': 0
+                                      })
+        stoch_model.set_transition('Susceptible', 'Infected',
+                                   stoch_model.p_infection(fn))
+        stoch_model.set_transition('Infected', 'Recovered',
+                                   stoch_model.p_standard(0.0))
+        args = get_default_args(self.example_path)
+        args.frontier = frontier
+        self.agents_obj.reset()
+        sim_obj = Simulate(self.config_obj, stoch_model, [], self.agents_obj,
+                           self.locations_obj, np.random.default_rng(3), args)
+
+        Time.new_world(0)
+        sim_obj.on_start_simulation()
+        for _ in range(5):
+            sim_obj.on_start_time_step([[interactions_filename]], [], [],
+                                       ReadOneTimeEvents(''))
+            sim_obj.handle_time_step_for_all_agents()
+            sim_obj.end_time_step()
+            Time.increment_current_time_step()
+        self.agents_obj.edge_files = []
+        return sim_obj.end_simulation()
+
+    def write_chain_interactions(self, tmp_dir):
+        interactions_filename = osp.join(tmp_dir, 'interactions.txt')
+        with open(interactions_filename, 'w') as f:
+            f.write('18\n')
+            f.write(self.config_obj.interaction_info_keys + '\n')
+            for i in range(1, 10):
+                f.write('{0}:{1}:1\n'.format(i, i - 1))
+                f.write('{0}:{1}:1\n'.format(i - 1, i))
+        return interactions_filename
+
+    def test_frontier_edge_files(self):
+        table = ContactProbabilityTable({'Infected': 1.0})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            edge_filename = ReadInteractions.write_edge_file(
+                self.write_chain_interactions(tmp_dir),
+                list(self.agents_obj.agents))
+
+            state_history = self.run_world(edge_filename, table)
+            self.assertGreater(state_history['Infected'][-1],
+                               state_history['Infected'][0])
+            self.assertDictEqual(self.run_world(edge_filename, table, True),
+                                 state_history)
+
+    def test_edge_file_contacts(self):
+        def probability_of_infection_fn(p_infected_states_list, contact_agent,
+                                        c_dict, current_time_step):
+            if contact_agent.state == 'Infected':
+                return 0.5 * int(c_dict['duration'])
+            return 0
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            interactions_filename = self.write_chain_interactions(tmp_dir)
+            edge_filename = ReadInteractions.write_edge_file(
+                interactions_filename, list(self.agents_obj.agents))
+
+            state_history = self.run_world(interactions_filename,
+                                           probability_of_infection_fn)
+            self.assertGreater(state_history['Infected'][-1],
+                               state_history['Infected'][0])
+            self.assertDictEqual(
+                self.run_world(edge_filename, probability_of_infection_fn),
+                state_history)
+
+    def test_prefetch_error(self):
+        sim_obj = Simulate(
+            self.config_obj,
+            StochasticModel(['Susceptible'], [], {'Susceptible': 1}), [],
+            self.agents_obj, self.locations_obj)
+        Time.new_world(0)
+        sim_obj.on_start_simulation()
+        missing_filename = osp.join(self.example_path, 'missing.txt')
+        sim_obj.read_files([(ReadInteractions, missing_filename)])
+        error = sim_obj.prefetch_error
+        self.assertIsInstance(error, FileNotFoundError)
+
+        with self.assertRaises(FileNotFoundError) as cm:
+            sim_obj.on_start_time_step([[missing_filename]], [], [],
+                                       ReadOneTimeEvents(''))
+        self.assertIs(cm.exception, error)
+        self.assertIsNone(sim_obj.prefetch_error)
+
+    def get_sirs_model(self, fn):
+        stoch_model = StochasticModel(['Susceptible', 'Infected', 'Recovered'],
+                                      ['Infected'], {
+                                          'Susceptible': 0.5,
+                                          'Infected': 0.3,
+                                          'Recovered': 0.2
+                                      })
+        stoch_model.set_transition('Susceptible', 'Infected',
+                                   stoch_model.p_infection(fn))
+        stoch_model.set_transition('Infected', 'Recovered',
+                                   stoch_model.p_standard(0.3))
+        stoch_model.set_transition('Recovered', 'Susceptible',
+                                   stoch_model.p_standard(0.3))
+        return stoch_model
+
+    def run_time_steps(self, sim_obj, time_steps, check_fn):
+        interactions_filename = osp.join(self.example_path,
+                                         'interactions_list.csv')
+        Time.new_world(0)
+        sim_obj.on_start_simulation()
+        for _ in range(time_steps):
+            sim_obj.on_start_time_step([[interactions_filename]], [], [],
+                                       ReadOneTimeEvents(''))
+            sim_obj.handle_time_step_for_all_agents()
+            sim_obj.end_time_step()
+            check_fn()
+            Time.increment_current_time_step()
+        return sim_obj.end_simulation()
+
+    def test_state_counts(self):
+        table = ContactProbabilityTable({'Infected': 0.5})
+        policy_list = [
+            lockdown_policy.FullLockdown(lambda time_step: time_step % 3 == 1)
+        ]
+        sim_obj = Simulate(self.config_obj, self.get_sirs_model(table),
+                           policy_list, self.agents_obj, self.locations_obj,
+                           np.random.default_rng(2))
+
+        def check_state_counts():
+            for state in sim_obj.model.individual_state_types:
+                state_agents = {
+                    agent.index
+                    for agent in self.agents_obj.agents.values()
+                    if agent.state == state
+                }
+                self.assertSetEqual(sim_obj.state_list[state], state_agents)
+                self.assertEqual(sim_obj.state_counts[state],
+                                 len(state_agents))
+                self.assertEqual(sim_obj.state_history[state][-1],
+                                 len(state_agents))
+
+        state_history = self.run_time_steps(sim_obj, 15, check_state_counts)
+        self.assertGreater(len(set(state_history['Infected'])), 1)
+
+    def test_is_absorbing(self):
+        def recovered_fn(p_infected_states_list, contact_agent, c_dict,
+                         current_time_step):
+            return 0.5 if contact_agent.state == 'Recovered' else 0.0
+
+        for fn, event_fn, absorbing in [
+            (ContactProbabilityTable({'Infected': 0.5}), None, True),
+            (ContactProbabilityTable({'Recovered': 0.5}), None, False),
+            (ContactProbabilityTable({'Infected': 0.5}),
+             lambda agent, event_info, location, current_time_step: 1.0,
+             False), (recovered_fn, None, False)
+        ]:
+            stoch_model = StochasticModel(
+                ['Susceptible', 'Infected', 'Recovered'], ['Infected'], {
+                    'Susceptible': 0.5,
+                    'Infected': 0,
+                    'Recovered': 0.5
+                })
+            stoch_model.set_transition('Susceptible', 'Infected',
+                                       stoch_model.p_infection(fn))
+            stoch_model.set_transition('Infected', 'Recovered',
+                                       stoch_model.p_standard(0.3))
+            if event_fn is not None:
+                stoch_model.set_event_contribution_fn(event_fn)
+            sim_obj = Simulate(self.config_obj, stoch_model, [],
+                               self.agents_obj, self.locations_obj,
+                               np.random.default_rng(0))
+            sim_obj.set_absorbing_states()
+            self.assertListEqual(sim_obj.absorbing_states,
+                                 ['Susceptible', 'Recovered'])
+
+            sim_obj.state_counts = {
+                'Susceptible': 5,
+                'Infected': 0,
+                'Recovered': 5
+            }
+            self.assertEqual(sim_obj.is_absorbing(), absorbing)
+            sim_obj.state_counts['Infected'] = 1
+            self.assertFalse(sim_obj.is_absorbing())
+            sim_obj.state_counts = {
+                'Susceptible': 0,
+                'Infected': 0,
+                'Recovered': 10
+            }
+            self.assertTrue(sim_obj.is_absorbing())
+
+    def test_save_valid_interactions(self):
+        def probability_of_infection_fn(p_infected_states_list, contact_agent,
+                                        c_dict, current_time_step):
+            if contact_agent.state == 'Infected':
+                return 0.5
+            return 0
+
+        def valid_interaction(sim_obj, agent, c_dict, rng):
+            # Filter of a single contact with the draws of save_valid_interactions
+            contact_agent = self.agents_obj.agents[
+                c_dict['Interacting Agent Index']]
+            if agent.under_protection:
+                return False
+            if sim_obj.susceptible_states is not None and agent.state not in sim_obj.susceptible_states:
+                return False
+            if sim_obj.infectious_states is not None and contact_agent.state not in sim_obj.infectious_states:
+                return False
+            r = rng.random()
+            return r < contact_agent.can_contribute_infection and r < agent.can_receive_infection
+
+        for fn in [
+                ContactProbabilityTable({'Infected': 0.5}),
+                probability_of_infection_fn
+        ]:
+            self.agents_obj.reset()
+            sim_obj = Simulate(self.config_obj, self.get_sirs_model(fn), [],
+                               self.agents_obj, self.locations_obj,
+                               np.random.default_rng(4))
+            restriction_rng = np.random.default_rng(5)
+            save_valid_interactions = Simulate.save_valid_interactions
+            checked_contacts = []
+
+            def check_save_valid_interactions(sim_obj):
+                agents = self.agents_obj.agents.values()
+                for agent in agents:
+                    agent.update_receive_infection(restriction_rng.random())
+                    agent.update_contribute_infection(restriction_rng.random())
+                    if restriction_rng.random() < 0.1:
+                        agent.protect()
+
+                rng = copy.deepcopy(sim_obj.rng)
+                contact_lists = [[
+                    c_dict for c_dict in agent.contact_list
+                    if valid_interaction(sim_obj, agent, c_dict, rng)
+                ] for agent in agents]
+                save_valid_interactions(sim_obj)
+                self.assertListEqual([agent.contact_list for agent in agents],
+                                     contact_lists)
+                self.assertEqual(sim_obj.rng.random(), rng.random())
+                checked_contacts.extend(chain.from_iterable(contact_lists))
+
+            with mock.patch.object(Simulate,
+                                   'save_valid_interactions',
+                                   autospec=True,
+                                   side_effect=check_save_valid_interactions):
+                self.run_time_steps(sim_obj, 10, lambda: None)
+            self.assertGreater(len(checked_contacts), 0)
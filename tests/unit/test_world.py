@@ -0,0 +1,255 @@
+import os.path as osp
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from episimmer.main import get_world_obj
+from episimmer.read_file import ReadConfiguration, ReadInteractions
+from episimmer.utils.arg_parser import get_default_args
+from episimmer.utils.module_handling import get_scenarios
+from episimmer.utils.time import Time
+
+TABLE_MODEL = '''import episimmer.model as model
+
+table = model.ContactProbabilityTable({'Infected': 0.3})
+
+
+class UserModel(model.StochasticModel):
+    def __init__(self):
+        model.StochasticModel.__init__(self, ['Susceptible', 'Infected', 'Recovered'], ['Infected'],
+                                       {'Susceptible': 0.7, 'Infected': 0.3, 'Recovered': 0})
+        self.set_transition('Susceptible', 'Infected', self.p_infection(table))
+        self.set_transition('Infected', 'Recovered', self.p_standard(0.2))
+'''
+
+SCHEDULED_TABLE_MODEL = '''import episimmer.model as model
+
+table = model.ContactProbabilityTable({'Infected': 0.3})
+
+
+class UserModel(model.ScheduledModel):
+    def __init__(self):
+        model.ScheduledModel.__init__(self)
+        self.insert_state('Susceptible', None, None, self.p_infection({'Infected': 1}, table), False, 0.7)
+        self.insert_state('Infected', 3, 1, self.scheduled({'Recovered': 1}), True, 0.3)
+        self.insert_state('Recovered', 0, 0, self.scheduled({'Recovered': 1}), False, 0)
+'''
+
+NO_POLICY = '''def generate_policy():
+    return []
+'''
+
+SCENARIO_POLICY = '''from episimmer.policy import lockdown_policy
+
+LOCKDOWN_START = {0}
+
+
+def generate_policy():
+    if LOCKDOWN_START is None:
+        return []
+    return [lockdown_policy.FullLockdown(lambda time_step: time_step >= LOCKDOWN_START)]
+
+
+def generate_scenarios():
+    return {{
+        'No_Policy': (0, []),
+        'Lockdown_Day_3': (3, [lockdown_policy.FullLockdown(lambda time_step: True)]),
+        'Lockdown_Day_6': (6, [lockdown_policy.FullLockdown(lambda time_step: True)])
+    }}
+'''
+
+
+class TestWorld(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        Time.reset()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        Time.reset()
+
+    def write_example(self, model_source, policy_source, config):
+        example_path = osp.join(self.tmp_dir.name, 'example')
+        shutil.copytree(
+            osp.join('tests', 'unit', 'Complete_Interaction_Space'),
+            example_path)
+        with open(osp.join(example_path, 'UserModel.py'), 'w') as f:
+            f.write(model_source)
+        with open(osp.join(example_path, 'Generate_policy.py'), 'w') as f:
+            f.write(policy_source)
+
+        config_filename = osp.join(example_path, 'config.txt')
+        with open(config_filename, 'r') as f:
+            lines = f.readlines()
+        with open(config_filename, 'w') as f:
+            for line in lines:
+                key = line[:line.index('<')].strip()
+                if key in config:
+                    line = '{0} <{1}>\n'.format(key, config[key])
+                f.write(line)
+        return example_path
+
+    def read_sources(self, example_path):
+        sources = []
+        for filename in ['UserModel.py', 'Generate_policy.py']:
+            with open(osp.join(example_path, filename), 'r') as f:
+                sources.append(f.read())
+        return sources
+
+    def get_world_obj(self, example_path, **options):
+        config_obj = ReadConfiguration(osp.join(example_path, 'config.txt'))
+        args = get_default_args(example_path)
+        for option, value in options.items():
+            setattr(args, option, value)
+        return get_world_obj(config_obj, example_path, args)
+
+    def test_batch_worlds(self):
+        for model_source in [TABLE_MODEL, SCHEDULED_TABLE_MODEL]:
+            example_path = self.write_example(
+                model_source, NO_POLICY, {
+                    'Number of worlds': 4,
+                    'Probabilistic Interaction Files list filename': '',
+                    'Event Files list filename': '',
+                    'One Time Event filename': ''
+                })
+            world_obj = self.get_world_obj(example_path)
+            self.assertTrue(world_obj.supports_batch())
+
+            sdicts = list(world_obj.run_worlds(1, 4))
+            self.assertEqual(len(sdicts), 4)
+            self.assertNotEqual(sdicts[0], sdicts[1])
+            for batch in [1, 3]:
+                self.assertListEqual(list(world_obj.run_worlds(1, batch)),
+                                     sdicts)
+            shutil.rmtree(example_path)
+
+    def test_snapshot_fork(self):
+        example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
+        world_obj = self.get_world_obj(
+            self.write_example(*self.read_sources(example_path),
+                               {'Random Seed': 4}))
+        time_steps = world_obj.config_obj.time_steps
+        state_history, _, _ = world_obj.one_world(0)
+
+        sim_obj = world_obj.start_world(0)
+        world_obj.run_time_steps(sim_obj, 4)
+        snapshot = sim_obj.snapshot()
+        fork_obj = sim_obj.fork()
+        self.assertIs(fork_obj.config_obj, sim_obj.config_obj)
+        self.assertIs(fork_obj.model, sim_obj.model)
+        self.assertIsNot(fork_obj.agents_obj, sim_obj.agents_obj)
+
+        world_obj.run_time_steps(sim_obj, time_steps)
+        self.assertDictEqual(sim_obj.end_simulation(), state_history)
+        world_obj.run_time_steps(fork_obj, time_steps)
+        self.assertDictEqual(fork_obj.end_simulation(), state_history)
+
+        restored_obj = world_obj.restore_world(snapshot)
+        self.assertIs(restored_obj.model, world_obj.model)
+        self.assertEqual(restored_obj.time_step, 4)
+        world_obj.run_time_steps(restored_obj, time_steps)
+        self.assertDictEqual(restored_obj.end_simulation(), state_history)
+
+    def test_snapshot_edge_files(self):
+        example_path = self.write_example(
+            TABLE_MODEL, NO_POLICY, {
+                'Random Seed': 4,
+                'Interaction Files list filename':
+                'interaction_files_list.txt',
+                'Probabilistic Interaction Files list filename': '',
+                'Event Files list filename': '',
+                'One Time Event filename': ''
+            })
+        interactions_filename = osp.join(example_path, 'interactions_list.csv')
+        edge_filename = ReadInteractions.write_edge_file(
+            interactions_filename, [str(i) for i in range(10)])
+        with open(osp.join(example_path, 'interaction_files_list.txt'),
+                  'w') as f:
+            f.write('<{0}>\n'.format(osp.basename(edge_filename)))
+        world_obj = self.get_world_obj(example_path)
+        time_steps = world_obj.config_obj.time_steps
+
+        sim_obj = world_obj.start_world(0)
+        world_obj.run_time_steps(sim_obj, 3)
+        edges = sim_obj.agents_obj.edge_files[0]
+        self.assertIsInstance(edges, np.memmap)
+
+        fork_obj = sim_obj.fork()
+        self.assertIs(fork_obj.agents_obj.edge_files[0], edges)
+        restored_obj = world_obj.restore_world(sim_obj.snapshot())
+        restored_edges = restored_obj.agents_obj.edge_files[0]
+        self.assertIsInstance(restored_edges, np.memmap)
+        self.assertEqual(restored_edges.filename, edges.filename)
+
+        world_obj.run_time_steps(sim_obj, time_steps)
+        state_history = sim_obj.end_simulation()
+        for branch_obj in [fork_obj, restored_obj]:
+            world_obj.run_time_steps(branch_obj, time_steps)
+            self.assertDictEqual(branch_obj.end_simulation(), state_history)
+
+    def test_scenario_world(self):
+        example_path = osp.join('tests', 'unit', 'Complete_Interaction_Space')
+        model_source, _ = self.read_sources(example_path)
+        example_path = self.write_example(model_source,
+                                          SCENARIO_POLICY.format(None), {
+                                              'Random Seed': 1,
+                                              'Number of worlds': 2
+                                          })
+        world_obj = self.get_world_obj(example_path)
+        scenarios = get_scenarios(example_path)
+        world_sdicts = [
+            world_obj.scenario_world(world, scenarios) for world in range(2)
+        ]
+
+        lockdown_starts = {
+            'No_Policy': None,
+            'Lockdown_Day_3': 3,
+            'Lockdown_Day_6': 6
+        }
+        for name, lockdown_start in lockdown_starts.items():
+            with open(osp.join(example_path, 'Generate_policy.py'), 'w') as f:
+                f.write(SCENARIO_POLICY.format(lockdown_start))
+            world_obj = self.get_world_obj(example_path)
+            for world, sdicts in enumerate(world_sdicts):
+                self.assertDictEqual(sdicts[name],
+                                     world_obj.one_world(world)[0])
+
+        # Time steps before a scenario starts are shared with the world without policies
+        for sdicts in world_sdicts:
+            self.assertNotEqual(sdicts['Lockdown_Day_3'], sdicts['No_Policy'])
+            for name, (start_time_step, _) in scenarios.items():
+                for state, history in sdicts[name].items():
+                    self.assertListEqual(
+                        history[:start_time_step + 1],
+                        sdicts['No_Policy'][state][:start_time_step + 1])
+
+    def test_summarize_worlds_quantiles(self):
+        example_path = self.write_example(
+            TABLE_MODEL, NO_POLICY, {
+                'Number of worlds': 3,
+                'Probabilistic Interaction Files list filename': '',
+                'Event Files list filename': '',
+                'One Time Event filename': ''
+            })
+        world_obj = self.get_world_obj(example_path,
+                                       noplot=False,
+                                       quantiles=[10, 50, 90])
+        avg_dict = world_obj.simulate_worlds()
+
+        sdicts = list(world_obj.run_worlds(1, 0))
+        with open(osp.join(example_path, 'results', 'results.pickle'),
+                  'rb') as f:
+            results = pickle.load(f)
+        self.assertDictEqual(results['average'], avg_dict)
+        self.assertListEqual(list(results['percentiles']), [10, 50, 90])
+        for state in world_obj.model.individual_state_types:
+            histories = [sdict[state] for sdict in sdicts]
+            np.testing.assert_allclose(avg_dict[state],
+                                       np.mean(histories, axis=0))
+            for percentile, percentile_dict in results['percentiles'].items():
+                np.testing.assert_allclose(
+                    percentile_dict[state],
+                    np.percentile(histories, percentile, axis=0))